@@ -17,6 +17,8 @@ from app.models.trip import Trip, Day, Activity  # noqa: F401
 from app.models.destination import Destination  # noqa: F401
 from app.models.expense import Expense  # noqa: F401
 from app.models.chat_message import ChatMessage  # noqa: F401
+from app.models.chat_session import ChatSession  # noqa: F401
+from app.models.catalog_state import CatalogState  # noqa: F401
 
 # this is the Alembic Config object
 config = context.config
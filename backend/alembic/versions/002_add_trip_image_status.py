@@ -0,0 +1,30 @@
+"""add trip image status for background image enrichment
+
+Revision ID: 002_add_trip_image_status
+Revises: 001_add_trip_image_fields
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "002_add_trip_image_status"
+down_revision = "001_add_trip_image_fields"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Track whether the Pexels image for a trip has been fetched yet
+    op.add_column("trips", sa.Column("image_status", sa.String(), nullable=True))
+    op.execute(
+        "UPDATE trips SET image_status = "
+        "CASE WHEN image_url IS NOT NULL THEN 'ready' ELSE 'none' END"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("trips", "image_status")
@@ -0,0 +1,73 @@
+"""add chat_sessions index table with backfill
+
+Revision ID: 003_add_chat_sessions
+Revises: 002_add_trip_image_status
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "003_add_chat_sessions"
+down_revision = "002_add_trip_image_status"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_sessions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("session_id", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("last_activity", sa.DateTime(), nullable=False),
+        sa.Column("message_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("user_id", "session_id", name="uq_chat_sessions_user_session"),
+    )
+    op.create_index(
+        "ix_chat_sessions_user_activity",
+        "chat_sessions",
+        ["user_id", "last_activity", "id"],
+    )
+
+    # Backfill one row per existing session; the title is the first user message
+    op.execute(
+        """
+        INSERT INTO chat_sessions
+            (id, user_id, session_id, title, last_activity, message_count, created_at)
+        SELECT
+            gen_random_uuid(),
+            m.user_id,
+            m.session_id,
+            (
+                SELECT LEFT(first.content, 80)
+                FROM chat_messages first
+                WHERE first.user_id = m.user_id
+                  AND first.session_id = m.session_id
+                  AND first.role = 'user'
+                ORDER BY first.timestamp
+                LIMIT 1
+            ),
+            MAX(m.timestamp),
+            COUNT(*),
+            MIN(m.timestamp)
+        FROM chat_messages m
+        GROUP BY m.user_id, m.session_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_sessions_user_activity", table_name="chat_sessions")
+    op.drop_table("chat_sessions")
@@ -0,0 +1,37 @@
+"""add composite index for paginated chat history
+
+Revision ID: 004_add_chat_history_index
+Revises: 003_add_chat_sessions
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "004_add_chat_history_index"
+down_revision = "003_add_chat_sessions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves keyset pages of one session ordered by (timestamp, id); built without
+    # blocking writes to chat_messages
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_messages_user_session_ts",
+            "chat_messages",
+            ["user_id", "session_id", "timestamp", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_chat_messages_user_session_ts",
+            table_name="chat_messages",
+            postgresql_concurrently=True,
+        )
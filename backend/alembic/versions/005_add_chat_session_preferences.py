@@ -0,0 +1,27 @@
+"""add extracted travel preferences to chat_sessions
+
+Revision ID: 005_add_chat_session_preferences
+Revises: 004_add_chat_history_index
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "005_add_chat_session_preferences"
+down_revision = "004_add_chat_history_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable with no default: existing sessions are filled in from their messages the
+    # first time an itinerary is generated from them
+    op.add_column("chat_sessions", sa.Column("preferences", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("chat_sessions", "preferences")
@@ -0,0 +1,70 @@
+"""add full-text and trigram search indexes to destinations
+
+Revision ID: 006_add_destination_search
+Revises: 005_add_chat_session_preferences
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "006_add_destination_search"
+down_revision = "005_add_chat_session_preferences"
+branch_labels = None
+depends_on = None
+
+# Same expression as Destination.search_vector
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(country, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "destinations",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+
+    # Built without blocking catalog writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_destinations_search_vector",
+            "destinations",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_destinations_name_trgm",
+            "destinations",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_destinations_name_trgm", table_name="destinations", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_destinations_search_vector",
+            table_name="destinations",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("destinations", "search_vector")
+    # pg_trgm is left installed; other objects may depend on it
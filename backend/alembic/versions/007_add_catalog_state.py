@@ -0,0 +1,31 @@
+"""add catalog_state version row for destination catalog caches
+
+Revision ID: 007_add_catalog_state
+Revises: 006_add_destination_search
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "007_add_catalog_state"
+down_revision = "006_add_destination_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "catalog_state",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.execute("INSERT INTO catalog_state (id, version, updated_at) VALUES (1, 1, now())")
+
+
+def downgrade() -> None:
+    op.drop_table("catalog_state")
@@ -0,0 +1,52 @@
+"""add unique (name, country) key to destinations for idempotent imports
+
+Revision ID: 008_add_destination_natural_key
+Revises: 007_add_catalog_state
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "008_add_destination_natural_key"
+down_revision = "007_add_catalog_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the oldest row of any existing duplicates; trips refer to destinations by name,
+    # not by id, so nothing points at the removed rows
+    op.execute(
+        """
+        DELETE FROM destinations a
+        USING destinations b
+        WHERE a.name = b.name
+          AND coalesce(a.country, '') = coalesce(b.country, '')
+          AND (coalesce(a.created_at, 'infinity'), a.id)
+              > (coalesce(b.created_at, 'infinity'), b.id)
+        """
+    )
+    op.execute("UPDATE catalog_state SET version = version + 1, updated_at = now()")
+
+    # NULL countries would never conflict, so the key uses coalesce(country, '')
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_destinations_name_country",
+            "destinations",
+            ["name", sa.text("coalesce(country, '')")],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "uq_destinations_name_country",
+            table_name="destinations",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,29 @@
+"""add itinerary version to trips
+
+Revision ID: 009_add_trip_itinerary_version
+Revises: 008_add_destination_natural_key
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "009_add_trip_itinerary_version"
+down_revision = "008_add_destination_natural_key"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A constant server default: no table rewrite on Postgres 11+
+    op.add_column(
+        "trips",
+        sa.Column("itinerary_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("trips", "itinerary_version")
@@ -19,6 +19,8 @@ class Settings(BaseSettings):
 
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    REDIS_SOCKET_TIMEOUT: float = 0.5  # seconds
+    REDIS_RETRY_BACKOFF: float = 30.0  # seconds to skip Redis after a failure
 
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "")
@@ -31,13 +33,48 @@ class Settings(BaseSettings):
 
     # Google AI / Gemini
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
-    GEMINI_MODEL: str = "gemini-2.5-flash"
+    GEMINI_MODEL: str = "gemini-2.5-flash"  # used for any task without its own models
+
+    # Model routing: comma-separated candidates per task, preferred first
+    LLM_CHAT_MODELS: str = "gemini-2.5-flash-lite,gemini-2.5-flash"
+    LLM_ITINERARY_MODELS: str = "gemini-2.5-flash,gemini-2.0-flash"
+    LLM_SUMMARIZATION_MODELS: str = "gemini-2.5-flash-lite"
+    LLM_ROUTER_EWMA_ALPHA: float = 0.2  # weight of the newest call in latency/error averages
+    LLM_ROUTER_MAX_ERROR_RATE: float = 0.3  # models above this are skipped
+    LLM_ROUTER_SLOW_FACTOR: float = 2.0  # skip the preferred model when this much slower
+    LLM_ROUTER_RECOVERY_HALF_LIFE: float = 60.0  # seconds for a model's error rate to halve
+    LLM_ROUTER_LATENCY_MAX_AGE: float = 120.0  # older latencies are remeasured on the next pick
+
+    # Chat response cache (context-free or short-context prompts only)
+    CHAT_CACHE_ENABLED: bool = True
+    CHAT_CACHE_TTL: int = 21600  # 6 hours
+    CHAT_CACHE_MAX_ENTRIES: int = 2048
+    CHAT_CACHE_MAX_CONTEXT: int = 0  # prior messages allowed; 0 = first message only
+    CHAT_CACHE_MAX_PROMPT_CHARS: int = 300  # long prompts are too specific to reuse
+    CHAT_CACHE_SIMILARITY: float = 0.7  # cosine threshold for the semantic tier
+    CHAT_CACHE_EMBEDDING_DIM: int = 1024
 
     # Pexels API Configuration
     PEXELS_API_KEY: str = os.getenv("PEXELS_API_KEY", "")
     PEXELS_BASE_URL: str = "https://api.pexels.com/v1"
     PEXELS_PHOTOS_PER_PAGE: int = 1
     PEXELS_CACHE_TTL: int = 86400  # 24 hours
+    PEXELS_NEGATIVE_CACHE_TTL: int = 3600  # 1 hour for destinations without images
+    PEXELS_LOCAL_CACHE_SIZE: int = 1024
+    PEXELS_DISTRIBUTED_LOCK: bool = True  # coalesce lookups across workers via Redis
+    PEXELS_REQUESTS_PER_HOUR: int = 200  # local pacing per worker
+    PEXELS_BURST: int = 10
+    PEXELS_MAX_QUEUE_WAIT: float = 2.0  # seconds to wait for a token before falling back
+    PEXELS_QUOTA_RESERVE: int = 10  # stop calling when this few requests remain
+    PEXELS_BREAKER_FAILURE_THRESHOLD: int = 5
+    PEXELS_BREAKER_RECOVERY: float = 60.0  # seconds before a probe call
+    PEXELS_BREAKER_MAX_OPEN: float = 3600.0  # cap for quota-exhaustion pauses
+    PEXELS_CURATED_POOL_SIZE: int = 15
+    PEXELS_TIMEOUT: float = 10.0  # seconds
+    PEXELS_HTTP2: bool = True
+    PEXELS_MAX_CONNECTIONS: int = 20
+    PEXELS_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    PEXELS_KEEPALIVE_EXPIRY: float = 30.0  # seconds
 
     # CORS - Environment specific
     CORS_ORIGINS: List[str] = (
@@ -50,9 +87,62 @@ class Settings(BaseSettings):
         else os.getenv("CORS_ORIGINS", "").split(",")
     )
 
+    # Provider backends: the real APIs, or "fake" for deterministic local stand-ins
+    LLM_PROVIDER: str = "gemini"  # gemini | fake
+    PEXELS_PROVIDER: str = "pexels"  # pexels | fake
+    FAKE_LATENCY_MEDIAN: float = 0.2  # seconds; fake latencies are log-normal around this
+    FAKE_LATENCY_SIGMA: float = 0.5  # spread of the log-normal distribution
+    FAKE_ERROR_RATE: float = 0.0  # fraction of fake calls failing with a 503
+    FAKE_RATE_LIMIT_RATE: float = 0.0  # fraction of fake calls answered with a 429
+    FAKE_STREAM_CHUNKS: int = 8  # chunks per fake streamed chat reply
+    FAKE_PEXELS_QUOTA: int = 20000  # hourly quota reported by the fake Pexels API
+    FAKE_SEED: int = 42
+
+    # LLM bulkheads (per worker)
+    LLM_CHAT_CONCURRENCY: int = 8  # chat model calls in flight
+    LLM_ITINERARY_CONCURRENCY: int = 2  # itinerary generations in flight
+    LLM_CHAT_QUEUE_TIMEOUT: float = 10.0  # longest wait for a slot before a 503
+    LLM_ITINERARY_QUEUE_TIMEOUT: float = 30.0
+    LLM_MAX_QUEUE: int = 100  # waiting calls per pool
+
+    # LLM call deadlines, retries, hedging and circuit breaking
+    LLM_CHAT_BUDGET: float = 30.0  # seconds for a whole chat call, queueing included
+    LLM_ITINERARY_BUDGET: float = 90.0
+    LLM_CHAT_ATTEMPT_TIMEOUT: float = 15.0  # per attempt, capped by the remaining budget
+    LLM_ITINERARY_ATTEMPT_TIMEOUT: float = 60.0
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_RETRY_BASE_DELAY: float = 0.5
+    LLM_RETRY_MAX_DELAY: float = 4.0
+    LLM_CHAT_HEDGE: bool = False  # send a second chat request when the first is slow
+    LLM_CHAT_HEDGE_PERCENTILE: float = 0.95  # latency percentile that triggers the hedge
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RECOVERY: float = 30.0
+
+    # Destination catalog snapshot (itinerary drafts, autocomplete)
+    CATALOG_REFRESH_INTERVAL: float = 30.0  # seconds between catalog version checks
+    CATALOG_POPULARITY_REFRESH: float = 300.0  # seconds between trip count refreshes
+    CATALOG_INDEX_MAX_DESTINATIONS: int = 50_000  # most travelled destinations kept in memory
+    CATALOG_INDEX_ATTRACTIONS: int = 2_000  # of those, destinations with autocompleted attractions
+    CATALOG_PROFILE_CACHE_SIZE: int = 4096  # destination details cached for itinerary drafts
+    DESTINATIONS_CACHE_MAX_AGE: int = 300  # Cache-Control max-age of public destination data
+    DESTINATIONS_CACHE_TTL: float = 3600.0  # in-process copy; catalog bumps clear it sooner
+    DESTINATIONS_CACHE_MAX_ENTRIES: int = 1024
+
+    # WebSocket realtime channel
+    WS_HEARTBEAT_INTERVAL: float = 25.0  # seconds between server pings
+    WS_HEARTBEAT_TIMEOUT: float = 60.0  # close if the client is silent this long
+    WS_SEND_QUEUE_SIZE: int = 256  # outbound messages buffered per connection
+    WS_SEND_TIMEOUT: float = 10.0  # close slow consumers that can't drain in time
+    WS_MAX_CONCURRENT_TASKS: int = 4  # in-flight chat/itinerary requests per connection
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 100
 
+    # Prometheus /metrics: off outside development unless enabled; when a token is set,
+    # scrapers must send it as "Authorization: Bearer <token>"
+    METRICS_ENABLED: bool = ENVIRONMENT == "development"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Validate required fields in production
@@ -12,37 +12,42 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
 
+def authenticate_token(token: str, db: Session) -> User:
+    """Verify a Firebase ID token and return the local user, creating it on first login"""
+    # Verify token with Firebase
+    firebase_service = FirebaseService()
+    decoded_token = firebase_service.verify_token(token)
+
+    firebase_uid = decoded_token.get("uid")
+    if not firebase_uid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token",
+        )
+
+    # Get or create user in our local PostgreSQL database
+    user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
+    if not user:
+        # Create new user from Firebase data if they don't exist
+        user = User(
+            firebase_uid=firebase_uid,
+            email=decoded_token.get("email"),
+            display_name=decoded_token.get("name"),
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+
+    return user
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
 ) -> User:
     """Verify Firebase JWT token and return current user"""
     try:
-        # Verify token with Firebase
-        firebase_service = FirebaseService()
-        decoded_token = firebase_service.verify_token(credentials.credentials)
-
-        firebase_uid = decoded_token.get("uid")
-        if not firebase_uid:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-            )
-
-        # Get or create user in our local PostgreSQL database
-        user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
-        if not user:
-            # Create new user from Firebase data if they don't exist
-            user = User(
-                firebase_uid=firebase_uid,
-                email=decoded_token.get("email"),
-                display_name=decoded_token.get("name"),
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-
-        return user
+        return authenticate_token(credentials.credentials, db)
 
     except Exception as e:
         logger.error(f"Authentication error: {str(e)}")
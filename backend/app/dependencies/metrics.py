@@ -0,0 +1,13 @@
+from fastapi import Request
+
+from app.services.llm_metrics import current_route
+
+
+async def llm_route(request: Request) -> None:
+    """Label model calls made while serving this request with its route template"""
+    route = request.scope.get("route")
+    endpoint = request.scope.get("endpoint")
+    # Never the raw URL path: ids in it would explode metric cardinality
+    current_route.set(
+        getattr(route, "path", None) or getattr(endpoint, "__name__", None) or "unknown"
+    )
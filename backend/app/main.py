@@ -1,17 +1,30 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
+import hmac
 import logging
 import os
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from app.database import engine, Base
 
-from app.routes import auth, chat, trips, destinations, expenses
+from app.routes import auth, chat, trips, destinations, expenses, ws
 
+from app.dependencies.metrics import llm_route
 from app.middleware.error_handler import error_handler_middleware
 from app.middleware.request_id import request_id_middleware
 from app.middleware.rate_limit import rate_limit_middleware
 from app.config import settings
+from app.services.connection_manager import connection_manager
+from app.services.destination_catalog import destination_catalog
+from app.services.gemini_service import gemini_service
+from app.services.itinerary_service import itinerary_service
+from app.services.pexels_service import pexels_service
+from app.services.redis_service import redis_service
+from app.utils.exceptions import AppException, AuthenticationError, NotFoundError
+from app.utils.metrics import metrics
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 # Initialize Sentry for error tracking
 try:
@@ -53,9 +66,26 @@ async def lifespan(app: FastAPI):
     # This will create all tables defined in your models if they don't exist
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created/verified")
+    # Snapshot the destination catalog for itinerary drafts and autocomplete
+    await destination_catalog.start()
+    # Open pooled HTTP clients for external APIs
+    await pexels_service.startup()
+    # Build the LLM clients and chains once; every request shares them
+    try:
+        await gemini_service.startup()
+        await itinerary_service.startup()
+    except Exception as e:
+        logger.warning(f"LLM clients not initialized at startup, retrying on first use: {e}")
+    # Relay realtime events published by other workers
+    await connection_manager.start()
     yield
     # Shutdown
     logger.info("Shutting down WanderAI API...")
+    await connection_manager.stop()
+    await destination_catalog.stop()
+    await pexels_service.aclose()
+    await gemini_service.aclose()
+    await redis_service.aclose()
 
 
 # Initialize the FastAPI app with the lifespan hook
@@ -73,6 +103,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 logger.info(f"CORS Origins configured: {settings.CORS_ORIGINS}")
@@ -83,13 +114,41 @@ app.middleware("http")(request_id_middleware)
 app.middleware("http")(rate_limit_middleware)
 app.middleware("http")(error_handler_middleware)
 
+
+@app.exception_handler(AppException)
+async def app_exception_handler(request: Request, exc: AppException):
+    """Structured errors raised by services, in the same shape as unhandled errors"""
+    headers = {}
+    if "retry_after" in exc.details:
+        headers["Retry-After"] = str(exc.details["retry_after"])
+    return JSONResponse(
+        status_code=exc.status_code,
+        headers=headers,
+        content={
+            "error": {
+                "code": exc.code,
+                "message": exc.message,
+                "details": exc.details,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "request_id": getattr(request.state, "request_id", "unknown"),
+            }
+        },
+    )
+
+
 # Include routers (API Endpoints)
 # We use /v1 prefix for versioning
 app.include_router(auth.router, prefix="/v1/auth", tags=["Authentication"])
-app.include_router(chat.router, prefix="/v1/chat", tags=["Chat"])
-app.include_router(trips.router, prefix="/v1/trips", tags=["Trips"])
+# Routers that call the LLM label its metrics with the route
+app.include_router(
+    chat.router, prefix="/v1/chat", tags=["Chat"], dependencies=[Depends(llm_route)]
+)
+app.include_router(
+    trips.router, prefix="/v1/trips", tags=["Trips"], dependencies=[Depends(llm_route)]
+)
 app.include_router(destinations.router, prefix="/v1/destinations", tags=["Destinations"])
 app.include_router(expenses.router, prefix="/v1/expenses", tags=["Expenses"])
+app.include_router(ws.router, prefix="/v1", tags=["Realtime"])
 
 
 @app.get("/")
@@ -115,6 +174,19 @@ async def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint(request: Request):
+    """Prometheus metrics for this worker (METRICS_ENABLED, optionally METRICS_TOKEN)"""
+    if not settings.METRICS_ENABLED:
+        raise NotFoundError("Endpoint")
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        provided = request.headers.get("authorization", "")
+        if not hmac.compare_digest(provided.encode(), expected.encode()):
+            raise AuthenticationError("Invalid metrics token")
+    return metrics.render()
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
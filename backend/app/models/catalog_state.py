@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, Integer
+from datetime import datetime, timezone
+from app.database import Base
+
+
+class CatalogState(Base):
+    """Single row whose version is bumped whenever the destination catalog changes"""
+
+    __tablename__ = "catalog_state"
+
+    id = Column(Integer, primary_key=True)  # always 1
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,35 @@
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime, timezone
+import uuid
+from app.database import Base
+
+
+class ChatSession(Base):
+    """One row per chat session, maintained alongside chat_messages"""
+
+    __tablename__ = "chat_sessions"
+    __table_args__ = (
+        UniqueConstraint("user_id", "session_id", name="uq_chat_sessions_user_session"),
+        # Keyset pagination of a user's sessions, most recent first
+        Index("ix_chat_sessions_user_activity", "user_id", "last_activity", "id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    session_id = Column(String, nullable=False)
+    title = Column(String)  # start of the first user message
+    last_activity = Column(DateTime, nullable=False)
+    message_count = Column(Integer, nullable=False, default=0)
+    # Travel preferences extracted from the user's messages (see trip_preferences)
+    preferences = Column(JSON)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -1,5 +1,18 @@
-from sqlalchemy import Column, String, Text, DECIMAL, JSON, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    DDL,
+    DECIMAL,
+    JSON,
+    Column,
+    Computed,
+    DateTime,
+    Index,
+    String,
+    Text,
+    event,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 from datetime import datetime, timezone
 import uuid
 from app.database import Base
@@ -9,8 +22,32 @@ def utcnow():
     return datetime.now(timezone.utc)
 
 
+# Weighted document for full-text search: name beats country beats description. The
+# 'simple' config doesn't stem, so place names and prefix queries match as typed.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(country, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+
 class Destination(Base):
     __tablename__ = "destinations"
+    __table_args__ = (
+        # Natural key used by catalog imports to upsert; NULL countries compare equal
+        Index(
+            "uq_destinations_name_country", "name", text("coalesce(country, '')"), unique=True
+        ),
+        # Ranked full-text search
+        Index("ix_destinations_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram similarity on names, for typos and partial words
+        Index(
+            "ix_destinations_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False, index=True)
@@ -20,3 +57,13 @@ class Destination(Base):
     attractions = Column(JSON, default=[])
     image_url = Column(String)
     created_at = Column(DateTime, default=utcnow)
+    # Maintained by Postgres; only read inside search queries, so never loaded by default
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
+
+# The trigram index needs pg_trgm when the table is built with create_all
+event.listen(
+    Destination.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -29,11 +29,16 @@ class Trip(Base):
     end_date = Column(Date)
     budget = Column(DECIMAL(10, 2))
     status = Column(String, default="draft")
+    # Bumped whenever the days or activities change, so background itinerary refinement
+    # can tell whether the draft it replaces was edited in the meantime
+    itinerary_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Pexels image fields
     image_url = Column(Text, nullable=True)
     photographer = Column(String, nullable=True)
     photographer_url = Column(Text, nullable=True)
+    # Background image enrichment: none, pending, ready or unavailable
+    image_status = Column(String, default="none")
 
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timezone
+from typing import List, Optional
+from contextlib import aclosing
+import json
 import uuid
 
 from app.database import get_db
@@ -11,9 +14,12 @@ from app.schemas.chat import (
     ChatHistoryResponse,
 )
 from app.models.chat_message import ChatMessage
+from app.models.chat_session import ChatSession
 from app.models.user import User
 from app.dependencies.auth import get_current_user
-from app.services.gemini_service import GeminiService
+from app.services.chat_store import add_message, recent_context, stream_reply
+from app.services.gemini_service import gemini_service
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 router = APIRouter()
 
@@ -29,43 +35,22 @@ async def send_chat_message(
     session_id = request.session_id or str(uuid.uuid4())
 
     # 1. Save user message to the database
-    user_message = ChatMessage(
-        user_id=current_user.id,
-        session_id=session_id,
-        role="user",
-        content=request.message,
-        timestamp=datetime.now(timezone.utc),
-    )
-    db.add(user_message)
+    add_message(db, current_user.id, session_id, "user", request.message)
 
     # 2. Get recent chat history for context (up to last 10 messages)
     # The history is crucial for the AI to maintain context in the conversation
-    recent_messages = (
-        db.query(ChatMessage)
-        .filter(ChatMessage.user_id == current_user.id, ChatMessage.session_id == session_id)
-        .order_by(ChatMessage.timestamp.desc())
-        .limit(10)
-        .all()
-    )
-
-    # Reverse the order to feed chronological history to the AI service
-    context = [{"role": msg.role, "content": msg.content} for msg in reversed(recent_messages)]
+    context = recent_context(db, current_user.id, session_id)
+    user_id = current_user.id
+    # Commit now so no database connection is held while waiting on the model
+    db.commit()
 
     # 3. Generate AI response
-    gemini_service = GeminiService()
-    ai_response = await gemini_service.generate_response(request.message, context)
+    ai_response = await gemini_service.generate_response(request.message, context, user_id)
 
     # 4. Save AI response to the database
-    timestamp = datetime.now(timezone.utc)
-    assistant_message = ChatMessage(
-        user_id=current_user.id,
-        session_id=session_id,
-        role="assistant",
-        content=ai_response,
-        timestamp=timestamp,
-    )
-    db.add(assistant_message)
-    db.commit()  # Commit both user and assistant messages
+    assistant_message = add_message(db, user_id, session_id, "assistant", ai_response)
+    timestamp = assistant_message.timestamp
+    db.commit()
 
     return ChatMessageResponse(
         response=ai_response,
@@ -74,36 +59,131 @@ async def send_chat_message(
     )
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/stream")
+async def stream_chat_message(
+    request: ChatMessageRequest,
+    http_request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Send a message to AI and stream the response as Server-Sent Events
+
+    Events: `session` (session_id), `token` (text chunk), `done` (timestamp).
+    The assistant message is saved when the stream completes, or with the text
+    generated so far if the client disconnects.
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    user_id = current_user.id
+
+    # Commit the user message up front; the stream outlives this request's session
+    add_message(db, user_id, session_id, "user", request.message)
+    context = recent_context(db, user_id, session_id)
+    db.commit()
+
+    async def event_stream():
+        yield _sse("session", {"session_id": session_id})
+        reply = stream_reply(gemini_service, user_id, session_id, request.message, context)
+        async with aclosing(reply):
+            async for event, data in reply:
+                if await http_request.is_disconnected():
+                    break
+                yield _sse(event, data)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _parse_cursor(cursor: Optional[str]):
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
 @router.get("/history/{session_id}", response_model=List[ChatHistoryResponse])
 async def get_chat_history(
     session_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get chat history for a session"""
+    """
+    Get chat history for a session, one page at a time
+
+    The first page holds the latest messages. Each page is in chronological order;
+    when older messages exist, the X-Next-Cursor response header holds the `cursor`
+    value for the page before it.
+    """
+    query = db.query(ChatMessage).filter(
+        ChatMessage.user_id == current_user.id, ChatMessage.session_id == session_id
+    )
+    before = _parse_cursor(cursor)
+    if before:
+        query = query.filter(tuple_(ChatMessage.timestamp, ChatMessage.id) < tuple_(*before))
     messages = (
-        db.query(ChatMessage)
-        .filter(ChatMessage.user_id == current_user.id, ChatMessage.session_id == session_id)
-        .order_by(ChatMessage.timestamp.asc())
+        query.order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc())
+        .limit(limit + 1)
         .all()
     )
 
-    return messages
+    if len(messages) > limit:
+        messages = messages[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            messages[-1].timestamp, messages[-1].id  # type: ignore[arg-type]
+        )
+
+    return list(reversed(messages))
 
 
 @router.get("/sessions", response_model=List[dict])
 async def get_chat_sessions(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
-    """Get all chat sessions for current user (limited to 20 most recent)"""
-    # This query groups messages by session_id and takes the timestamp of the last message
+    """
+    Get the current user's chat sessions, most recent first
+
+    Keyset-paginated: when more sessions exist, the X-Next-Cursor response header
+    holds the `cursor` value for the next page.
+    """
+    query = db.query(ChatSession).filter(ChatSession.user_id == current_user.id)
+    after = _parse_cursor(cursor)
+    if after:
+        query = query.filter(tuple_(ChatSession.last_activity, ChatSession.id) < tuple_(*after))
     sessions = (
-        db.query(ChatMessage.session_id, ChatMessage.timestamp)
-        .filter(ChatMessage.user_id == current_user.id)
-        .group_by(ChatMessage.session_id, ChatMessage.timestamp)
-        .order_by(ChatMessage.timestamp.desc())
-        .limit(20)
+        query.order_by(ChatSession.last_activity.desc(), ChatSession.id.desc())
+        .limit(limit + 1)
         .all()
     )
 
-    return [{"session_id": s.session_id, "last_activity": s.timestamp} for s in sessions]
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            sessions[-1].last_activity, sessions[-1].id  # type: ignore[arg-type]
+        )
+
+    return [
+        {
+            "session_id": s.session_id,
+            "title": s.title,
+            "last_activity": s.last_activity,
+            "message_count": s.message_count,
+        }
+        for s in sessions
+    ]
@@ -1,45 +1,95 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from uuid import UUID
+import json
 
+from app.config import settings
 from app.database import get_db
 from app.models.destination import Destination
-from app.schemas.destination import DestinationResponse
+from app.schemas.destination import DestinationResponse, DestinationSuggestion
+from app.services.destination_catalog import destination_catalog
+from app.services.destination_search import ranked_search
+from app.utils.http_cache import VersionedResponseCache, cacheable_response
 
 router = APIRouter()
 
+# Public catalog data only changes with the catalog version, so responses are shared by
+# everyone and cleared on a version bump
+destination_responses = VersionedResponseCache(
+    "destinations",
+    maxsize=settings.DESTINATIONS_CACHE_MAX_ENTRIES,
+    ttl=settings.DESTINATIONS_CACHE_TTL,
+)
+
+
+def _serialize(data) -> bytes:
+    """Same compact JSON FastAPI would send"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
 
 @router.get("/", response_model=List[DestinationResponse])
 async def search_destinations(
+    request: Request,
     query: Optional[str] = Query(
         None, description="Search query for name, country, or description"
     ),
     limit: int = Query(20, le=100),
     db: Session = Depends(get_db),
 ):
-    """Search and filter destinations"""
-    destinations_query = db.query(Destination)
-
-    # Apply case-insensitive search filter if a query is provided
-    if query:
-        # Use SQL LIKE operator for flexible text search
-        search_filter = f"%{query}%"
-        destinations_query = destinations_query.filter(
-            (Destination.name.ilike(search_filter))
-            | (Destination.country.ilike(search_filter))
-            | (Destination.description.ilike(search_filter))
+    """Search destinations, most relevant first (cacheable; supports If-None-Match)"""
+    query = query.strip() if query else ""
+    # Read before querying, so a concurrent bump can't leave new data cached as old
+    version = destination_catalog.version
+    key = ("search", query.casefold(), limit)
+
+    cached = destination_responses.get(version, key)
+    if cached is None:
+        if query:
+            destinations = ranked_search(db, query, limit)
+        else:
+            destinations = db.query(Destination).limit(limit).all()
+        body = _serialize(
+            [DestinationResponse.model_validate(d).model_dump(mode="json") for d in destinations]
         )
+        cached = destination_responses.put(version, key, body)
+
+    return cacheable_response(request, cached, settings.DESTINATIONS_CACHE_MAX_AGE)
 
-    destinations = destinations_query.limit(limit).all()
-    return destinations
+
+@router.get("/suggest", response_model=List[DestinationSuggestion])
+async def suggest_destinations(
+    q: str = Query(..., min_length=1, max_length=100, description="What the user typed so far"),
+    limit: int = Query(10, ge=1, le=20),
+):
+    """Search-as-you-type suggestions, most travelled first; served from memory"""
+    return [
+        DestinationSuggestion(
+            text=suggestion.text,
+            type=suggestion.kind,
+            destination_id=suggestion.destination_id,
+            destination=suggestion.destination,
+        )
+        for suggestion in destination_catalog.suggestions.suggest(q, limit)
+    ]
 
 
 @router.get("/{destination_id}", response_model=DestinationResponse)
-async def get_destination(destination_id: str, db: Session = Depends(get_db)):
-    """Get specific destination details by ID"""
-    destination = db.query(Destination).filter(Destination.id == destination_id).first()
+async def get_destination(destination_id: UUID, request: Request, db: Session = Depends(get_db)):
+    """Get specific destination details by ID (cacheable; supports If-None-Match)"""
+    version = destination_catalog.version
+    key = ("detail", destination_id)
+
+    cached = destination_responses.get(version, key)
+    if cached is None:
+        destination = db.query(Destination).filter(Destination.id == destination_id).first()
+
+        if not destination:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found"
+            )
 
-    if not destination:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found")
+        body = _serialize(DestinationResponse.model_validate(destination).model_dump(mode="json"))
+        cached = destination_responses.put(version, key, body)
 
-    return destination
+    return cacheable_response(request, cached, settings.DESTINATIONS_CACHE_MAX_AGE)
@@ -1,8 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
-from datetime import timedelta
 import logging
 
 from app.database import get_db
@@ -16,11 +15,19 @@ from app.schemas.trip import (
     ActivityResponse,
 )
 from app.models.trip import Trip, Day, Activity
-from app.models.chat_message import ChatMessage
 from app.models.user import User
 from app.dependencies.auth import get_current_user
-from app.services.itinerary_service import ItineraryService
-from app.services.pexels_service import PexelsService
+from app.services.connection_manager import connection_manager
+from app.services.trip_itinerary import (
+    bump_itinerary_version,
+    refine_trip_itinerary,
+    save_draft_itinerary,
+)
+from app.services.trip_image_service import (
+    IMAGE_STATUS_NONE,
+    IMAGE_STATUS_PENDING,
+    enrich_trip_image,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -36,10 +43,11 @@ async def get_trips(current_user: User = Depends(get_current_user), db: Session
 @router.post("/", response_model=TripResponse, status_code=status.HTTP_201_CREATED)
 async def create_trip(
     trip: TripCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Create a new trip with destination image from Pexels"""
+    """Create a new trip; the destination image from Pexels is fetched in the background"""
     db_trip = Trip(
         user_id=current_user.id,
         title=trip.title,
@@ -48,28 +56,22 @@ async def create_trip(
         end_date=trip.end_date,
         budget=trip.budget,
         status=trip.status,
+        image_status=IMAGE_STATUS_PENDING if trip.destination else IMAGE_STATUS_NONE,
     )
 
-    # Fetch image from Pexels if destination is provided
-    if trip.destination:
-        try:
-            pexels_service = PexelsService()
-            image_data = await pexels_service.get_destination_image(trip.destination)
-
-            if image_data:
-                db_trip.image_url = image_data["image_url"]  # type: ignore
-                db_trip.photographer = image_data["photographer"]  # type: ignore
-                db_trip.photographer_url = image_data["photographer_url"]  # type: ignore
-                logger.info(f"Fetched image for destination: {trip.destination}")
-            else:
-                logger.warning(f"No image found for destination: {trip.destination}")
-        except Exception as e:
-            # Don't fail trip creation if image fetch fails
-            logger.error(f"Error fetching Pexels image: {e}")
-
     db.add(db_trip)
     db.commit()
     db.refresh(db_trip)
+
+    # Clients poll image_status or listen for trip.updated on the WebSocket
+    if trip.destination:
+        background_tasks.add_task(
+            enrich_trip_image, db_trip.id, trip.destination, current_user.id
+        )
+
+    await connection_manager.publish(
+        current_user.id, {"type": "trip.created", "trip_id": str(db_trip.id)}
+    )
     return db_trip
 
 
@@ -92,6 +94,7 @@ async def get_trip(
 async def update_trip(
     trip_id: UUID,
     trip_update: TripUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -104,25 +107,35 @@ async def update_trip(
     # Update fields only if they are provided in the request
     update_data = trip_update.model_dump(exclude_unset=True)
 
-    # If destination changed, fetch new image
-    if "destination" in update_data and update_data["destination"] != trip.destination:
-        try:
-            pexels_service = PexelsService()
-            image_data = await pexels_service.get_destination_image(update_data["destination"])
-
-            if image_data:
-                update_data["image_url"] = image_data["image_url"]
-                update_data["photographer"] = image_data["photographer"]
-                update_data["photographer_url"] = image_data["photographer_url"]
-                logger.info(f"Updated image for destination: {update_data['destination']}")
-        except Exception as e:
-            logger.error(f"Error fetching Pexels image on update: {e}")
+    # If destination changed, fetch new image in the background
+    destination_changed = (
+        "destination" in update_data and update_data["destination"] != trip.destination
+    )
+    if destination_changed:
+        if update_data["destination"]:
+            update_data["image_status"] = IMAGE_STATUS_PENDING
+        else:
+            update_data.update(
+                image_url=None,
+                photographer=None,
+                photographer_url=None,
+                image_status=IMAGE_STATUS_NONE,
+            )
 
     for field, value in update_data.items():
         setattr(trip, field, value)
 
     db.commit()
     db.refresh(trip)
+
+    if destination_changed and update_data["destination"]:
+        background_tasks.add_task(
+            enrich_trip_image, trip.id, update_data["destination"], current_user.id
+        )
+
+    await connection_manager.publish(
+        current_user.id, {"type": "trip.updated", "trip_id": str(trip.id)}
+    )
     return trip
 
 
@@ -140,25 +153,15 @@ async def delete_trip(
 
     db.delete(trip)
     db.commit()
+    await connection_manager.publish(
+        current_user.id, {"type": "trip.deleted", "trip_id": str(trip_id)}
+    )
     return None
 
 
-@router.get("/{trip_id}/itinerary", response_model=dict)
-async def get_trip_itinerary(
-    trip_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    """Get trip itinerary with days and activities"""
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
-
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-
-    # Get all days and activities related to the trip
-    days = db.query(Day).filter(Day.trip_id == trip_id).order_by(Day.order).all()
-
-    # Manually serialize the complex structure for the API response
+def _serialize_itinerary(db: Session, trip: Trip) -> dict:
+    """A trip's days and activities, as returned by the itinerary endpoints"""
+    days = db.query(Day).filter(Day.trip_id == trip.id).order_by(Day.order).all()
     return {
         "trip_id": str(trip.id),
         "days": [
@@ -186,76 +189,60 @@ async def get_trip_itinerary(
     }
 
 
+@router.get("/{trip_id}/itinerary", response_model=dict)
+async def get_trip_itinerary(
+    trip_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get trip itinerary with days and activities"""
+    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
+
+    if not trip:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
+
+    return _serialize_itinerary(db, trip)
+
+
 @router.post("/{trip_id}/itinerary", status_code=status.HTTP_201_CREATED)
 async def generate_itinerary(
     trip_id: UUID,
     request: ItineraryGenerateRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Generate itinerary from chat context, save to database, and return status"""
+    """
+    Save an instant draft itinerary from the destination catalog, then generate the real
+    one from the chat context in the background
+
+    The response carries the saved draft days (same shape as GET /itinerary) with
+    "refining": true. Clients show the draft right away and reload on the
+    trip.itinerary_ready WebSocket event; trip.itinerary_failed means the draft stays.
+    """
     trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
 
     if not trip:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
 
-    # 1. Get chat context for detailed AI instructions
-    chat_messages = (
-        db.query(ChatMessage)
-        .filter(
-            ChatMessage.user_id == current_user.id,
-            ChatMessage.session_id == request.chat_session_id,
-        )
-        .order_by(ChatMessage.timestamp.asc())
-        .all()
+    draft_version = save_draft_itinerary(db, trip, current_user)
+    background_tasks.add_task(
+        refine_trip_itinerary,
+        trip.id,
+        current_user.id,
+        request.chat_session_id,
+        draft_version,
     )
-
-    # Concatenate all messages into a single context string
-    chat_context = " ".join([msg.content for msg in chat_messages])  # type: ignore
-
-    # 2. Extract user preferences from profile
-    interests = current_user.preferences.get("interests", [])  # type: ignore
-
-    # 3. Generate structured itinerary using the service
-    itinerary_service = ItineraryService()
-    itinerary_data = await itinerary_service.generate_itinerary(
-        destination=trip.destination or "Unknown",  # type: ignore
-        start_date=trip.start_date.isoformat() if trip.start_date else None,  # type: ignore
-        end_date=trip.end_date.isoformat() if trip.end_date else None,  # type: ignore
-        budget=float(trip.budget) if trip.budget else 1000.0,  # type: ignore
-        interests=interests,
-        chat_context=chat_context,
+    await connection_manager.publish(
+        current_user.id, {"type": "trip.itinerary_draft", "trip_id": str(trip.id)}
     )
 
-    # 4. Save generated itinerary to database
-    current_date = trip.start_date
-    for order, day_data in enumerate(itinerary_data["days"], start=1):
-        # Create Day object
-        day = Day(trip_id=trip.id, date=current_date, title=day_data["title"], order=order)
-        db.add(day)
-        db.flush()  # Ensures the Day object gets its UUID for the foreign key
-
-        # Add activities for the day
-        for activity_data in day_data["activities"]:
-            activity = Activity(
-                day_id=day.id,
-                title=activity_data["title"],
-                description=activity_data["description"],
-                time=activity_data.get("time"),
-                duration=activity_data.get("duration"),
-                cost=activity_data.get("cost"),
-                category=activity_data.get("category"),
-                location=activity_data.get("location"),
-            )
-            db.add(activity)
-
-        # Move to next day (important for multi-day trips)
-        if current_date:  # type: ignore
-            current_date += timedelta(days=1)
-
-    db.commit()
-
-    return {"message": "Itinerary generated successfully", "trip_id": str(trip.id)}
+    return {
+        "message": "Itinerary generated successfully",
+        **_serialize_itinerary(db, trip),
+        "status": "draft",
+        "refining": True,
+    }
 
 
 @router.get("/{trip_id}/activities", response_model=List[ActivityResponse])
@@ -308,6 +295,7 @@ async def create_activity(
         location=activity.location,
     )
     db.add(db_activity)
+    bump_itinerary_version(db, trip_id)
     db.commit()
     db.refresh(db_activity)
     return db_activity
@@ -342,6 +330,7 @@ async def update_activity(
     for field, value in update_data.items():
         setattr(activity, field, value)
 
+    bump_itinerary_version(db, trip_id)
     db.commit()
     db.refresh(activity)
     return activity
@@ -371,5 +360,6 @@ async def delete_activity(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
 
     db.delete(activity)
+    bump_itinerary_version(db, trip_id)
     db.commit()
     return {"message": "Activity deleted successfully"}
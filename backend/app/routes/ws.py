@@ -0,0 +1,202 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from contextlib import aclosing
+from typing import Optional, Set
+from uuid import UUID
+import asyncio
+import logging
+import uuid
+
+from app.config import settings
+from app.database import SessionLocal
+from app.dependencies.auth import authenticate_token
+from app.services.chat_store import add_message, recent_context, stream_reply
+from app.services.connection_manager import WebSocketConnection, connection_manager
+from app.services.gemini_service import gemini_service
+from app.services.llm_metrics import current_route
+from app.services.trip_itinerary import generate_trip_itinerary
+from app.utils.exceptions import NotFoundError, ServiceUnavailableError
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _extract_token(websocket: WebSocket) -> Optional[str]:
+    """Bearer token from the Authorization header, or the ?token= query parameter"""
+    authorization = websocket.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        return authorization[7:]
+    return websocket.query_params.get("token")
+
+
+async def _handle_chat(connection: WebSocketConnection, message: dict) -> None:
+    """Stream a chat reply as chat.token events, then chat.done"""
+    request_id = message.get("request_id")
+    prompt = message.get("message")
+    if not prompt:
+        await connection.send(
+            {"type": "error", "request_id": request_id, "detail": "message is required"}
+        )
+        return
+    session_id = message.get("session_id") or str(uuid.uuid4())
+    user_id = UUID(connection.user_id)
+
+    db = SessionLocal()
+    try:
+        add_message(db, user_id, session_id, "user", prompt)
+        context = recent_context(db, user_id, session_id)
+        db.commit()
+    finally:
+        db.close()
+
+    await connection.send(
+        {"type": "chat.started", "request_id": request_id, "session_id": session_id}
+    )
+    reply = stream_reply(gemini_service, user_id, session_id, prompt, context)
+    async with aclosing(reply):
+        async for event, data in reply:
+            sent = await connection.send(
+                {"type": f"chat.{event}", "request_id": request_id, **data}
+            )
+            if not sent:
+                break
+
+
+async def _handle_itinerary(connection: WebSocketConnection, message: dict) -> None:
+    """Generate a trip itinerary, reporting itinerary.progress events along the way"""
+    request_id = message.get("request_id")
+    try:
+        trip_id = UUID(str(message.get("trip_id")))
+    except ValueError:
+        await connection.send(
+            {"type": "error", "request_id": request_id, "detail": "Invalid trip_id"}
+        )
+        return
+
+    async def progress(stage: str, details: dict) -> None:
+        await connection.send(
+            {
+                "type": "itinerary.progress",
+                "request_id": request_id,
+                "trip_id": str(trip_id),
+                "stage": stage,
+                **details,
+            }
+        )
+
+    try:
+        days = await generate_trip_itinerary(
+            trip_id,
+            UUID(connection.user_id),
+            message.get("chat_session_id", ""),
+            on_progress=progress,
+        )
+    except NotFoundError:
+        await connection.send(
+            {"type": "error", "request_id": request_id, "detail": "Trip not found"}
+        )
+        return
+
+    await connection.send(
+        {
+            "type": "itinerary.done",
+            "request_id": request_id,
+            "trip_id": str(trip_id),
+            "days": days,
+        }
+    )
+    await connection_manager.publish(
+        connection.user_id, {"type": "trip.itinerary_ready", "trip_id": str(trip_id)}
+    )
+
+
+HANDLERS = {
+    "chat": _handle_chat,
+    "itinerary.generate": _handle_itinerary,
+}
+
+
+async def _run_handler(connection: WebSocketConnection, message: dict) -> None:
+    # Each handler runs in its own task, so this only labels this message's model calls
+    current_route.set(f"ws:{message['type']}")
+    try:
+        await HANDLERS[message["type"]](connection, message)
+    except ServiceUnavailableError as e:
+        await connection.send(
+            {
+                "type": "error",
+                "request_id": message.get("request_id"),
+                "detail": e.message,
+                "retry_after": e.retry_after,
+            }
+        )
+    except Exception as e:
+        logger.error(f"WebSocket handler '{message['type']}' failed: {e}")
+        await connection.send(
+            {"type": "error", "request_id": message.get("request_id"), "detail": "Request failed"}
+        )
+
+
+@router.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket):
+    """
+    Realtime channel for one authenticated device
+
+    Client messages: `chat`, `itinerary.generate`, `pong`.
+    Server messages: `chat.*`, `itinerary.*`, `trip.*` notifications, `ping` and `error`.
+    """
+    token = _extract_token(websocket)
+    if not token:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    # Verify the token and load the user once per connection, not per message
+    db = SessionLocal()
+    try:
+        user_id = authenticate_token(token, db).id
+    except Exception as e:
+        logger.error(f"WebSocket authentication error: {str(e)}")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    finally:
+        db.close()
+
+    await websocket.accept()
+    connection = connection_manager.connect(websocket, user_id)
+    writer = asyncio.create_task(connection.writer())
+    heartbeat = asyncio.create_task(connection.heartbeat())
+    tasks: Set[asyncio.Task] = set()
+
+    try:
+        while True:
+            message = await websocket.receive_json()
+            connection.touch()
+
+            message_type = message.get("type") if isinstance(message, dict) else None
+            if message_type == "pong":
+                continue
+            if message_type not in HANDLERS:
+                connection.offer({"type": "error", "detail": f"Unknown type: {message_type}"})
+                continue
+            if len(tasks) >= settings.WS_MAX_CONCURRENT_TASKS:
+                connection.offer(
+                    {
+                        "type": "error",
+                        "request_id": message.get("request_id"),
+                        "detail": "Too many requests in flight",
+                    }
+                )
+                continue
+
+            task = asyncio.create_task(_run_handler(connection, message))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        # Malformed frames or a socket closed by the heartbeat / slow-consumer check
+        logger.info(f"WebSocket for user {user_id} closed: {e}")
+    finally:
+        for task in (*tasks, writer, heartbeat):
+            task.cancel()
+        connection_manager.disconnect(connection)
+        await connection.close()
@@ -16,3 +16,10 @@ class DestinationResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class DestinationSuggestion(BaseModel):
+    text: str
+    type: str  # destination, country or attraction
+    destination_id: Optional[UUID] = None
+    destination: Optional[str] = None  # the destination an attraction belongs to
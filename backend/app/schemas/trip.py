@@ -87,6 +87,7 @@ class TripResponse(TripBase):
     image_url: Optional[str] = None
     photographer: Optional[str] = None
     photographer_url: Optional[str] = None
+    image_status: Optional[str] = None
 
     days: List[DayResponse] = []
 
@@ -0,0 +1,326 @@
+"""
+Catalog Import
+Streaming JSONL/CSV destination catalogs into Postgres with batched COPY + upsert
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+from dataclasses import asdict, dataclass
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import IO, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+FORMATS = ("jsonl", "csv")
+MAX_BUDGET = Decimal("99999999.99")  # destinations.budget is DECIMAL(10, 2)
+ATTRACTION_SEPARATOR = "|"  # CSV cells list attractions as "A|B|C" or a JSON array
+
+
+class InvalidRecord(ValueError):
+    """A catalog record that can't be imported; the import skips it and carries on"""
+
+
+@dataclass
+class ImportStats:
+    records: int = 0  # read from the input, valid or not
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0  # identical to the stored row, or merged into another in the batch
+    invalid: int = 0
+
+    def add(self, other: "ImportStats") -> None:
+        for name, value in asdict(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+
+def detect_format(path: Path) -> str:
+    suffixes = [s.lower() for s in path.suffixes if s.lower() != ".gz"]
+    suffix = suffixes[-1] if suffixes else ""
+    if suffix in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if suffix == ".csv":
+        return "csv"
+    raise ValueError(f"Can't tell the format of {path.name}; pass it explicitly ({FORMATS})")
+
+
+def open_catalog(path: Path) -> Tuple[IO[str], BinaryIO]:
+    """
+    Text stream over a (possibly gzipped) catalog, plus the raw file whose position
+    tracks progress through the input in bytes
+    """
+    raw = open(path, "rb")
+    stream = gzip.GzipFile(fileobj=raw) if path.suffix.lower() == ".gz" else raw
+    return io.TextIOWrapper(stream, encoding="utf-8", newline=""), raw
+
+
+def iter_rows(stream: IO[str], fmt: str) -> Iterator[Union[dict, InvalidRecord]]:
+    """
+    Raw records in input order
+
+    Unparseable records are yielded as InvalidRecord instead of raised, so one bad line
+    doesn't end the import and record numbers (used for resuming) stay stable.
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            if None in row:
+                yield InvalidRecord("more cells than header columns")
+            else:
+                yield row
+        return
+    if fmt != "jsonl":
+        raise ValueError(f"Unknown catalog format {fmt!r}; expected one of {FORMATS}")
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield InvalidRecord(f"invalid JSON: {e.msg}")
+            continue
+        yield record if isinstance(record, dict) else InvalidRecord("not a JSON object")
+
+
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    if "\x00" in value:
+        raise InvalidRecord("NUL character in text")
+    return value or None
+
+
+def _budget(value) -> Optional[Decimal]:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, bool):
+        raise InvalidRecord(f"invalid budget {value!r}")
+    try:
+        budget = Decimal(str(value).strip()).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise InvalidRecord(f"invalid budget {value!r}")
+    if not budget.is_finite() or budget < 0 or budget > MAX_BUDGET:
+        raise InvalidRecord(f"budget out of range: {value!r}")
+    return budget
+
+
+def _attractions(value) -> Optional[List[str]]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        if value.startswith("["):
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError:
+                raise InvalidRecord("attractions is not a valid JSON array")
+        else:
+            value = value.split(ATTRACTION_SEPARATOR)
+    if not isinstance(value, list):
+        raise InvalidRecord("attractions must be a list")
+    attractions: List[str] = []
+    for item in value:
+        name = _clean(item) if isinstance(item, (str, int, float)) else None
+        if name and name not in attractions:
+            attractions.append(name)
+    return attractions or None
+
+
+def normalize_record(raw: dict) -> dict:
+    """
+    Validated row for the destinations table; unknown keys are ignored
+
+    Missing or empty fields come back as None, which leaves the stored value alone when
+    the destination already exists.
+    """
+    name = _clean(raw.get("name"))
+    if not name:
+        raise InvalidRecord("missing name")
+    return {
+        "name": name,
+        "country": _clean(raw.get("country")),
+        "description": _clean(raw.get("description")),
+        "budget": _budget(raw.get("budget")),
+        "image_url": _clean(raw.get("image_url")),
+        "attractions": _attractions(raw.get("attractions")),
+    }
+
+
+def merge_duplicates(records: Iterable[dict]) -> List[dict]:
+    """
+    One record per (name, country), merged field by field in input order
+
+    A later record's fields override earlier ones, but its missing (None) fields keep
+    the earlier values: the same rule the upsert applies against stored rows, so the
+    result doesn't depend on whether duplicates land in one batch or in several.
+    """
+    merged: Dict[Tuple[str, str], dict] = {}
+    for record in records:
+        key = (record["name"], record["country"] or "")
+        if key in merged:
+            previous = merged[key]
+            merged[key] = {
+                field: previous[field] if value is None else value
+                for field, value in record.items()
+            }
+        else:
+            merged[key] = record
+    return list(merged.values())
+
+
+STAGING_DDL = text(
+    """
+    CREATE TEMP TABLE IF NOT EXISTS destination_import (
+        seq integer NOT NULL,
+        name text NOT NULL,
+        country text,
+        description text,
+        budget numeric(10, 2),
+        image_url text,
+        attractions json
+    ) ON COMMIT DELETE ROWS
+    """
+)
+
+STAGING_COPY = (
+    "COPY destination_import (seq, name, country, description, budget, image_url, attractions) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+# Batches are merged per key beforehand (merge_duplicates); DISTINCT ON only guards
+# against a key reaching ON CONFLICT twice. Missing fields keep what's stored, and rows
+# whose values wouldn't change are skipped instead of rewritten.
+# (xmax = 0) is true only for rows this statement inserted.
+UPSERT_SQL = text(
+    """
+    WITH upserted AS (
+        INSERT INTO destinations
+            (id, name, country, description, budget, image_url, attractions, created_at)
+        SELECT DISTINCT ON (name, coalesce(country, ''))
+            gen_random_uuid(), name, country, description, budget, image_url,
+            coalesce(attractions, '[]'::json), now() AT TIME ZONE 'utc'
+        FROM destination_import
+        ORDER BY name, coalesce(country, ''), seq DESC
+        ON CONFLICT (name, coalesce(country, '')) DO UPDATE SET
+            description = coalesce(EXCLUDED.description, destinations.description),
+            budget = coalesce(EXCLUDED.budget, destinations.budget),
+            image_url = coalesce(EXCLUDED.image_url, destinations.image_url),
+            attractions = CASE WHEN json_array_length(EXCLUDED.attractions) > 0
+                THEN EXCLUDED.attractions ELSE destinations.attractions END
+        WHERE (
+            destinations.description,
+            destinations.budget,
+            destinations.image_url,
+            destinations.attractions::jsonb
+        ) IS DISTINCT FROM (
+            coalesce(EXCLUDED.description, destinations.description),
+            coalesce(EXCLUDED.budget, destinations.budget),
+            coalesce(EXCLUDED.image_url, destinations.image_url),
+            (CASE WHEN json_array_length(EXCLUDED.attractions) > 0
+                THEN EXCLUDED.attractions ELSE destinations.attractions END)::jsonb
+        )
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT
+        count(*) FILTER (WHERE inserted) AS inserted,
+        count(*) FILTER (WHERE NOT inserted) AS updated
+    FROM upserted
+    """
+)
+
+
+def _copy_rows(records: Iterable[dict]) -> io.StringIO:
+    # In COPY's CSV format an unquoted empty cell is NULL; normalize_record never
+    # produces empty strings, so None can be written as an empty cell
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for seq, record in enumerate(records):
+        attractions = record["attractions"]
+        writer.writerow(
+            [
+                seq,
+                record["name"],
+                record["country"],
+                record["description"],
+                record["budget"],
+                record["image_url"],
+                json.dumps(attractions) if attractions is not None else None,
+            ]
+        )
+    buffer.seek(0)
+    return buffer
+
+
+def upsert_destinations(conn: Connection, records: List[dict]) -> ImportStats:
+    """
+    Upsert normalized records keyed on (name, country) in the caller's transaction
+
+    Rows are COPY'd into a temporary staging table and merged with one INSERT ... ON
+    CONFLICT, so a batch costs a few round trips whatever its size. The caller commits
+    (and bumps the catalog version once the whole import is done).
+    """
+    if not records:
+        return ImportStats()
+    conn.execute(STAGING_DDL)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(STAGING_COPY, _copy_rows(merge_duplicates(records)))
+    finally:
+        cursor.close()
+    inserted, updated = conn.execute(UPSERT_SQL).one()
+    # ON COMMIT DELETE ROWS only fires at commit; clear it for callers batching in one
+    # transaction
+    conn.execute(text("TRUNCATE destination_import"))
+    return ImportStats(
+        records=len(records),
+        inserted=inserted,
+        updated=updated,
+        unchanged=len(records) - inserted - updated,
+    )
+
+
+@dataclass
+class Checkpoint:
+    """How far an import of one particular input file got; committed batches only"""
+
+    input: str
+    size: int
+    mtime_ns: int
+    stats: ImportStats
+
+    @classmethod
+    def start(cls, input_path: Path) -> "Checkpoint":
+        stat = input_path.stat()
+        return cls(str(input_path.resolve()), stat.st_size, stat.st_mtime_ns, ImportStats())
+
+    def matches(self, input_path: Path) -> bool:
+        """A changed input file invalidates the record offsets"""
+        stat = input_path.stat()
+        return (self.input, self.size, self.mtime_ns) == (
+            str(input_path.resolve()),
+            stat.st_size,
+            stat.st_mtime_ns,
+        )
+
+    def save(self, path: Path) -> None:
+        # Write-then-rename, so a crash never leaves a torn checkpoint behind
+        tmp = path.with_name(path.name + ".tmp")
+        data = {"input": self.input, "size": self.size, "mtime_ns": self.mtime_ns}
+        tmp.write_text(json.dumps({**data, "stats": asdict(self.stats)}))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["Checkpoint"]:
+        try:
+            data = json.loads(path.read_text())
+            return cls(data["input"], data["size"], data["mtime_ns"], ImportStats(**data["stats"]))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            return None  # unreadable checkpoints are ignored; re-importing is idempotent
@@ -0,0 +1,194 @@
+"""
+Chat Response Cache
+Exact and semantic caching of assistant replies to context-free travel questions
+"""
+
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional
+
+import numpy as np
+from cachetools import TTLCache
+
+from app.config import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+cache_requests = metrics.counter(
+    "chat_cache_requests_total", "Chat response cache lookups by tier and result"
+)
+
+STOPWORDS = frozenset(
+    "a an and are as at be can could do does for from how i in is it its me my of on or "
+    "please s should that the there this to us we what whats when where which who why will "
+    "with would you your".split()
+)
+
+# Words that don't change the answer; two prompts may differ only in these
+GENERIC_WORDS = frozenset(
+    "best good great top ideal recommended recommend suggest suggestions tips tell know "
+    "go going visit visiting travel traveling travelling trip time period season".split()
+)
+
+
+def normalize_prompt(text: str) -> str:
+    """Case-fold, drop punctuation and collapse whitespace"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def content_tokens(normalized: str) -> FrozenSet[str]:
+    return frozenset(t for t in normalized.split() if t not in STOPWORDS)
+
+
+def embed(tokens: FrozenSet[str], dim: int) -> np.ndarray:
+    """Signed feature-hashing embedding of a token set, L2-normalized"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in tokens:
+        h = zlib.crc32(token.encode())
+        vector[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@dataclass
+class _Entry:
+    tokens: FrozenSet[str]
+    response: str
+    expires_at: float
+
+
+class SemanticCache:
+    """Fixed-capacity vector store with TTL and LRU eviction"""
+
+    def __init__(self, maxsize: int, ttl: float, threshold: float, dim: int):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.dim = dim
+        self._vectors = np.zeros((maxsize, dim), dtype=np.float32)
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()  # slot -> entry, LRU order
+        self._slots: Dict[FrozenSet[str], int] = {}  # tokens -> slot, for exact lookups
+        self._free: List[int] = list(range(maxsize))
+
+    def _evict(self, slot: int) -> None:
+        entry = self._entries.pop(slot)
+        del self._slots[entry.tokens]
+        self._vectors[slot] = 0.0
+        self._free.append(slot)
+
+    def touch(self, tokens: FrozenSet[str]) -> None:
+        """Mark the entry for exactly these tokens as recently used"""
+        slot = self._slots.get(tokens)
+        if slot is not None:
+            self._entries.move_to_end(slot)
+
+    def get(self, tokens: FrozenSet[str]) -> Optional[str]:
+        if not self._entries or not tokens:
+            return None
+
+        # Empty slots are zero vectors, so they never reach the threshold
+        scores = self._vectors @ embed(tokens, self.dim)
+        for slot in np.argsort(scores)[::-1][:5]:
+            if scores[slot] < self.threshold:
+                break
+            entry = self._entries.get(int(slot))
+            if entry is None:
+                continue
+            if entry.expires_at <= time.monotonic():
+                self._evict(int(slot))
+                continue
+            # Similar wording is not enough if e.g. the destination differs
+            if not (entry.tokens ^ tokens) <= GENERIC_WORDS:
+                continue
+            self._entries.move_to_end(int(slot))
+            return entry.response
+        return None
+
+    def put(self, tokens: FrozenSet[str], response: str) -> None:
+        if not tokens:
+            return
+        slot = self._slots.get(tokens)
+        if slot is None:
+            if not self._free:
+                self._evict(next(iter(self._entries)))  # least recently used
+            slot = self._free.pop()
+        else:
+            self._entries.move_to_end(slot)
+        self._vectors[slot] = embed(tokens, self.dim)
+        self._entries[slot] = _Entry(tokens, response, time.monotonic() + self.ttl)
+        self._slots[tokens] = slot
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ChatResponseCache:
+    """
+    Exact tier on the normalized prompt (plus short context), semantic tier for
+    context-free prompts
+    """
+
+    def __init__(
+        self,
+        maxsize: int = settings.CHAT_CACHE_MAX_ENTRIES,
+        ttl: float = settings.CHAT_CACHE_TTL,
+        threshold: float = settings.CHAT_CACHE_SIMILARITY,
+        dim: int = settings.CHAT_CACHE_EMBEDDING_DIM,
+    ):
+        self._exact: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._semantic = SemanticCache(maxsize, ttl, threshold, dim)
+
+    @staticmethod
+    def is_cacheable(prompt: str, context: Optional[list]) -> bool:
+        return (
+            settings.CHAT_CACHE_ENABLED
+            and len(prompt) <= settings.CHAT_CACHE_MAX_PROMPT_CHARS
+            and len(context or []) <= settings.CHAT_CACHE_MAX_CONTEXT
+        )
+
+    @staticmethod
+    def _exact_key(normalized: str, context: Optional[list]) -> str:
+        parts = [f"{m['role']}:{normalize_prompt(m['content'])}" for m in context or []]
+        parts.append(normalized)
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def get(self, prompt: str, context: Optional[list] = None) -> Optional[str]:
+        if not self.is_cacheable(prompt, context):
+            return None
+
+        normalized = normalize_prompt(prompt)
+        response = self._exact.get(self._exact_key(normalized, context))
+        if response is not None:
+            cache_requests.inc(tier="exact", result="hit")
+            if not context:
+                # Keep both tiers in the same LRU order, so they evict the same prompts
+                self._semantic.touch(content_tokens(normalized))
+            return response
+        cache_requests.inc(tier="exact", result="miss")
+
+        # Only context-free prompts can share answers by meaning
+        if context:
+            return None
+        response = self._semantic.get(content_tokens(normalized))
+        cache_requests.inc(tier="semantic", result="hit" if response is not None else "miss")
+        return response
+
+    def put(self, prompt: str, context: Optional[list], response: str) -> None:
+        if not self.is_cacheable(prompt, context):
+            return
+
+        normalized = normalize_prompt(prompt)
+        self._exact[self._exact_key(normalized, context)] = response
+        if not context:
+            self._semantic.put(content_tokens(normalized), response)
+
+
+chat_response_cache = ChatResponseCache()
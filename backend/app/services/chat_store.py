@@ -0,0 +1,172 @@
+"""
+Chat Store
+Persistence helpers shared by the HTTP, SSE and WebSocket chat paths
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.chat_message import ChatMessage
+from app.models.chat_session import ChatSession
+from app.services.gemini_service import GeminiService
+from app.services.trip_preferences import extract_preferences, merge_preferences
+from app.utils.exceptions import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# Number of recent messages sent to the model as conversation context
+CONTEXT_MESSAGES = 10
+
+# Characters of the first user message kept as the session title
+SESSION_TITLE_LENGTH = 80
+
+
+def add_message(
+    db: Session,
+    user_id,
+    session_id: str,
+    role: str,
+    content: str,
+    extra_metadata: Optional[dict] = None,
+) -> ChatMessage:
+    """
+    Add a chat message to the session (the caller commits)
+
+    The session's chat_sessions row is created or updated in the same transaction,
+    including the travel preferences stated in user messages.
+    """
+    message = ChatMessage(
+        user_id=user_id,
+        session_id=session_id,
+        role=role,
+        content=content,
+        timestamp=datetime.now(timezone.utc),
+        extra_metadata=extra_metadata,
+    )
+    db.add(message)
+    _touch_session(db, user_id, session_id, role, content, message.timestamp)  # type: ignore
+    if role == "user":
+        _update_preferences(db, user_id, session_id, content)
+    return message
+
+
+def _touch_session(
+    db: Session, user_id, session_id: str, role: str, content: str, timestamp: datetime
+) -> None:
+    """Upsert the session index row; concurrent writers to one session can't lose counts"""
+    title = content.strip()[:SESSION_TITLE_LENGTH] if role == "user" else None
+    stmt = insert(ChatSession).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        session_id=session_id,
+        title=title,
+        last_activity=timestamp,
+        message_count=1,
+        created_at=timestamp,
+        # Empty rather than NULL: NULL marks sessions that predate preference extraction
+        preferences={},
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_chat_sessions_user_session",
+        set_={
+            "last_activity": func.greatest(ChatSession.last_activity, stmt.excluded.last_activity),
+            "message_count": ChatSession.message_count + 1,
+            "title": func.coalesce(ChatSession.title, stmt.excluded.title),
+        },
+    )
+    db.execute(stmt)
+
+
+def _update_preferences(db: Session, user_id, session_id: str, content: str) -> None:
+    """Merge this message's preferences into the session row, if it states any"""
+    update = extract_preferences(content)
+    if not update:
+        return
+    # Locked until the caller commits, so concurrent messages can't drop each other's updates
+    session = (
+        db.query(ChatSession)
+        .filter(ChatSession.user_id == user_id, ChatSession.session_id == session_id)
+        .with_for_update()
+        .populate_existing()
+        .one()
+    )
+    session.preferences = merge_preferences(session.preferences, update)  # type: ignore
+
+
+def recent_context(db: Session, user_id, session_id: str) -> List[dict]:
+    """Most recent committed messages of a session, oldest first, in model context format"""
+    recent_messages = (
+        db.query(ChatMessage)
+        .filter(ChatMessage.user_id == user_id, ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.timestamp.desc())
+        .limit(CONTEXT_MESSAGES)
+        .all()
+    )
+    return [{"role": msg.role, "content": msg.content} for msg in reversed(recent_messages)]
+
+
+def save_assistant_message(
+    user_id, session_id: str, content: str, partial: bool = False
+) -> datetime:
+    """
+    Persist a (possibly partial) streamed assistant reply in its own session
+
+    Streaming responses outlive the request's database session, so they commit
+    through a fresh one. Returns the message timestamp.
+    """
+    db = SessionLocal()
+    try:
+        message = add_message(
+            db,
+            user_id,
+            session_id,
+            "assistant",
+            content,
+            extra_metadata={"partial": True} if partial else None,
+        )
+        timestamp = message.timestamp
+        db.commit()
+        return timestamp  # type: ignore[return-value]
+    finally:
+        db.close()
+
+
+async def stream_reply(
+    gemini_service: GeminiService,
+    user_id,
+    session_id: str,
+    prompt: str,
+    context: List[dict],
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream an assistant reply as ("token", ...) events followed by ("done", ...)
+
+    If the model is overloaded, a single ("error", ...) event carrying retry_after
+    is produced instead. The reply is saved once the stream completes. If the consumer stops early
+    (client disconnect; close the generator, e.g. with contextlib.aclosing), the
+    text produced so far is saved as a partial message.
+    """
+    chunks: List[str] = []
+    completed = False
+    try:
+        try:
+            async for chunk in gemini_service.stream_response(prompt, context, user_id):
+                chunks.append(chunk)
+                yield "token", {"text": chunk}
+        except ServiceUnavailableError as e:
+            yield "error", {"detail": e.message, "retry_after": e.retry_after}
+            return
+        completed = True
+        timestamp = save_assistant_message(user_id, session_id, "".join(chunks))
+        yield "done", {"session_id": session_id, "timestamp": timestamp}
+    finally:
+        if not completed and chunks:
+            logger.info(f"Chat stream for session {session_id} ended early, saving partial")
+            save_assistant_message(user_id, session_id, "".join(chunks), partial=True)
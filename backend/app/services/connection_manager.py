@@ -0,0 +1,188 @@
+"""
+WebSocket Connection Manager
+Tracks realtime connections per user and fans events out across workers via Redis
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional, Set
+
+from fastapi import WebSocket, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.services.redis_service import redis_service
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "ws:events"
+WORKER_LABEL = str(os.getpid())
+
+# Custom close code: the client stopped answering heartbeats
+WS_CLOSE_HEARTBEAT_TIMEOUT = 4408
+
+ws_connections = metrics.gauge("websocket_connections", "Open WebSocket connections per worker")
+ws_dropped = metrics.counter(
+    "websocket_messages_dropped_total", "Droppable WebSocket events discarded for slow clients"
+)
+ws_slow_disconnects = metrics.counter(
+    "websocket_slow_consumer_disconnects_total", "Connections closed because the client lagged"
+)
+
+
+class WebSocketConnection:
+    """One authenticated device connection with a bounded outbound queue"""
+
+    def __init__(self, websocket: WebSocket, user_id):
+        self.websocket = websocket
+        self.user_id = str(user_id)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.last_seen = time.monotonic()
+        self.closed = False
+
+    def touch(self) -> None:
+        """Record inbound activity (any message counts as a heartbeat reply)"""
+        self.last_seen = time.monotonic()
+
+    async def send(self, message: Dict[str, Any]) -> bool:
+        """
+        Queue a message that must not be lost, waiting for room in the queue
+
+        Waiting here pushes back on the producer (e.g. a token stream). A client that
+        can't drain its queue within WS_SEND_TIMEOUT is disconnected.
+        """
+        if self.closed:
+            return False
+        try:
+            await asyncio.wait_for(self.queue.put(message), timeout=settings.WS_SEND_TIMEOUT)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Closing slow WebSocket consumer for user {self.user_id}")
+            ws_slow_disconnects.inc(worker=WORKER_LABEL)
+            await self.close(status.WS_1013_TRY_AGAIN_LATER)
+            return False
+
+    def offer(self, message: Dict[str, Any]) -> bool:
+        """Queue a droppable message (notification, ping) without waiting"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            ws_dropped.inc(worker=WORKER_LABEL, type=message.get("type", "unknown"))
+            return False
+
+    async def writer(self) -> None:
+        """Drain the outbound queue to the socket"""
+        while True:
+            message = await self.queue.get()
+            await self.websocket.send_json(message)
+
+    async def heartbeat(self) -> None:
+        """Ping the client periodically and close it if it stops answering"""
+        while not self.closed:
+            await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL)
+            if time.monotonic() - self.last_seen > settings.WS_HEARTBEAT_TIMEOUT:
+                logger.info(f"WebSocket heartbeat timeout for user {self.user_id}")
+                await self.close(WS_CLOSE_HEARTBEAT_TIMEOUT)
+                return
+            self.offer({"type": "ping"})
+
+    async def close(self, code: int = status.WS_1000_NORMAL_CLOSURE) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            # Already closed by the client or the server
+            pass
+
+
+class ConnectionManager:
+    """Per-worker registry of connections, keyed by user"""
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self._connections: Dict[str, Set[WebSocketConnection]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    def connect(self, websocket: WebSocket, user_id) -> WebSocketConnection:
+        connection = WebSocketConnection(websocket, user_id)
+        self._connections.setdefault(connection.user_id, set()).add(connection)
+        ws_connections.inc(worker=WORKER_LABEL)
+        return connection
+
+    def disconnect(self, connection: WebSocketConnection) -> None:
+        connections = self._connections.get(connection.user_id)
+        if connections and connection in connections:
+            connections.discard(connection)
+            if not connections:
+                del self._connections[connection.user_id]
+            ws_connections.dec(worker=WORKER_LABEL)
+
+    def connection_count(self) -> int:
+        return sum(len(c) for c in self._connections.values())
+
+    def _deliver_local(self, user_id: str, event: Dict[str, Any]) -> None:
+        for connection in list(self._connections.get(user_id, ())):
+            connection.offer(event)
+
+    async def publish(self, user_id, event: Dict[str, Any]) -> None:
+        """Send an event to every device of a user, on this and other workers"""
+        user_id = str(user_id)
+        self._deliver_local(user_id, event)
+
+        client = redis_service.client
+        if client is None:
+            return
+        payload = json.dumps(
+            {"origin": self.worker_id, "user_id": user_id, "event": event}, default=str
+        )
+        try:
+            await client.publish(EVENTS_CHANNEL, payload)
+        except (RedisError, OSError) as e:
+            redis_service.report_failure(e)
+
+    async def start(self) -> None:
+        """Start relaying events published by other workers (called from the lifespan)"""
+        if settings.REDIS_URL and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            # Dedicated connection without a read timeout; pub/sub reads block while idle
+            client = Redis.from_url(
+                settings.REDIS_URL,
+                decode_responses=True,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            )
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(EVENTS_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        payload = json.loads(message["data"])
+                        if payload["origin"] != self.worker_id:
+                            self._deliver_local(payload["user_id"], payload["event"])
+            except (RedisError, OSError) as e:
+                logger.warning(f"WebSocket event relay lost Redis, retrying: {e}")
+                await asyncio.sleep(settings.REDIS_RETRY_BACKOFF)
+            finally:
+                await client.aclose()
+
+
+connection_manager = ConnectionManager()
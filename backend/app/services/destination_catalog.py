@@ -0,0 +1,239 @@
+"""
+Destination Catalog
+In-memory snapshot of the most travelled destinations, for autocomplete and itinerary
+drafts without a search query
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from cachetools import LRUCache
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.catalog_state import CatalogState
+from app.models.destination import Destination
+from app.models.trip import Trip
+from app.services.destination_suggest import SuggestIndex, build_suggestions, fold
+
+logger = logging.getLogger(__name__)
+
+MAX_NAME_WORDS = 5  # longest destination name looked for inside free text
+LOAD_CHUNK = 5000  # rows fetched per round trip while loading
+
+
+@dataclass(frozen=True)
+class DestinationProfile:
+    name: str
+    country: Optional[str] = None
+    description: Optional[str] = None
+    daily_budget: Optional[float] = None  # catalog budget is per traveller per day
+    attractions: List[str] = field(default_factory=list)
+
+
+def get_catalog_version(db: Session) -> int:
+    return db.query(CatalogState.version).filter(CatalogState.id == 1).scalar() or 0
+
+
+def bump_catalog_version(db: Session) -> None:
+    """
+    Mark the catalog as changed (the caller commits)
+
+    Every worker reloads its snapshot within CATALOG_REFRESH_INTERVAL.
+    """
+    stmt = insert(CatalogState).values(id=1, version=1, updated_at=datetime.now(timezone.utc))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CatalogState.id],
+        set_={"version": CatalogState.version + 1, "updated_at": stmt.excluded.updated_at},
+    )
+    db.execute(stmt)
+
+
+def _attach_attractions(db: Session, rows: List[dict]) -> None:
+    """Add the attractions of these catalog rows, for autocomplete"""
+    by_id = {row["id"]: row for row in rows}
+    ids = list(by_id)
+    for start in range(0, len(ids), LOAD_CHUNK):
+        chunk = ids[start : start + LOAD_CHUNK]
+        query = db.query(Destination.id, Destination.attractions)
+        for destination_id, attractions in query.filter(Destination.id.in_(chunk)):
+            by_id[destination_id]["attractions"] = attractions
+
+
+def trip_counts(db: Session) -> Dict[str, int]:
+    """Trips per destination, keyed by folded name ("Rome, Italy" counts for "rome")"""
+    name = func.lower(func.trim(func.split_part(Trip.destination, ",", 1)))
+    rows = (
+        db.query(name, func.count(Trip.id))
+        .filter(Trip.destination.isnot(None))
+        .group_by(name)
+        .all()
+    )
+    counts: Dict[str, int] = {}
+    for destination, count in rows:
+        key = fold(destination)
+        counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+class DestinationCatalog:
+    """
+    The most travelled destinations by normalized name, plus the autocomplete index
+
+    Only id, name and country are read for the whole table, streamed, and just the
+    CATALOG_INDEX_MAX_DESTINATIONS most travelled rows are kept; attractions are loaded
+    for the top CATALOG_INDEX_ATTRACTIONS of those, and the details used by itinerary
+    drafts are fetched by id on first use. Memory per worker is therefore bounded by
+    the caps, not by the size of the catalog.
+
+    Reloaded when the catalog version changes; trip counts for ranking are refreshed
+    every CATALOG_POPULARITY_REFRESH seconds.
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.size = 0  # destinations in the table, indexed or not
+        self.suggestions = SuggestIndex([])
+        self._ids_by_name: Dict[str, Any] = {}
+        self._rows: List[dict] = []
+        self._profiles: LRUCache = LRUCache(maxsize=settings.CATALOG_PROFILE_CACHE_SIZE)
+        self._popularity_at = 0.0
+        self._watcher: Optional[asyncio.Task] = None
+
+    def load(self, db: Optional[Session] = None) -> None:
+        """(Re)load the snapshot; opens its own session when none is given"""
+        session = db or SessionLocal()
+        try:
+            version = get_catalog_version(session)
+            counts = trip_counts(session)
+            size = 0
+
+            def stream():
+                nonlocal size
+                query = session.query(Destination.id, Destination.name, Destination.country)
+                for row in query.yield_per(LOAD_CHUNK):
+                    size += 1
+                    yield row._asdict()
+
+            rows = heapq.nlargest(
+                settings.CATALOG_INDEX_MAX_DESTINATIONS,
+                stream(),
+                key=lambda row: counts.get(fold(row["name"]), 0),
+            )
+            _attach_attractions(session, rows[: settings.CATALOG_INDEX_ATTRACTIONS])
+        finally:
+            if db is None:
+                session.close()
+
+        # Swapped in whole, so requests keep reading a consistent old snapshot meanwhile
+        self._ids_by_name = {fold(row["name"]): row["id"] for row in reversed(rows)}
+        self._rows = rows
+        self._profiles = LRUCache(maxsize=settings.CATALOG_PROFILE_CACHE_SIZE)
+        self.suggestions = build_suggestions(rows, counts)
+        self._popularity_at = time.monotonic()
+        self.size = size
+        self.version = version
+        logger.info(
+            f"Destination catalog v{version} loaded: {len(rows)} of {size} destinations indexed"
+        )
+
+    def refresh(self) -> None:
+        """Reload if the catalog version changed, else re-rank if trip counts are stale"""
+        db = SessionLocal()
+        try:
+            if get_catalog_version(db) != self.version:
+                self.load(db)
+            elif time.monotonic() - self._popularity_at >= settings.CATALOG_POPULARITY_REFRESH:
+                self.suggestions = build_suggestions(self._rows, trip_counts(db))
+                self._popularity_at = time.monotonic()
+        finally:
+            db.close()
+
+    async def start(self) -> None:
+        """Load the snapshot and keep it fresh (called from the lifespan)"""
+        try:
+            await asyncio.to_thread(self.load)
+        except Exception as e:
+            logger.warning(f"Destination catalog not loaded, retrying in the background: {e}")
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(settings.CATALOG_REFRESH_INTERVAL)
+            try:
+                # Blocking queries and index builds stay off the event loop
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.warning(f"Destination catalog refresh failed: {e}")
+
+    def find(self, destination: Optional[str]) -> Optional[DestinationProfile]:
+        """Match a free-text trip destination such as "Rome", "rome, Italy" or "Rome trip" """
+        if not destination:
+            return None
+        destination_id = self._match(fold(destination))
+        if destination_id is None:
+            return None
+        if destination_id not in self._profiles:
+            self._profiles[destination_id] = self._fetch_profile(destination_id)
+        return self._profiles[destination_id]
+
+    def _match(self, text: str) -> Optional[Any]:
+        destination_id = self._ids_by_name.get(text) or self._ids_by_name.get(
+            text.split(",")[0].strip()
+        )
+        if destination_id is not None:
+            return destination_id
+        # Longest run of words naming a destination, e.g. "a week in mexico city"
+        words = text.replace(",", " ").split()
+        for size in range(min(len(words), MAX_NAME_WORDS), 0, -1):
+            for start in range(len(words) - size + 1):
+                destination_id = self._ids_by_name.get(" ".join(words[start : start + size]))
+                if destination_id is not None:
+                    return destination_id
+        return None
+
+    def _fetch_profile(self, destination_id) -> Optional[DestinationProfile]:
+        db = SessionLocal()
+        try:
+            row = (
+                db.query(
+                    Destination.name,
+                    Destination.country,
+                    Destination.description,
+                    Destination.budget,
+                    Destination.attractions,
+                )
+                .filter(Destination.id == destination_id)
+                .first()
+            )
+        finally:
+            db.close()
+        if row is None:
+            return None  # deleted since the snapshot was loaded
+        return DestinationProfile(
+            name=row.name,
+            country=row.country,
+            description=row.description,
+            daily_budget=float(row.budget) if row.budget is not None else None,
+            attractions=[a for a in row.attractions or [] if isinstance(a, str)],
+        )
+
+    def __len__(self) -> int:
+        return len(self._ids_by_name)
+
+
+destination_catalog = DestinationCatalog()
@@ -0,0 +1,47 @@
+"""
+Destination Search
+Ranked full-text search over the catalog, with trigram matching for typos
+"""
+
+import re
+from typing import List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.models.destination import Destination
+
+WORD = re.compile(r"\w+")
+MAX_TERMS = 8  # longer queries are cut; nobody types more into a search box
+
+
+def prefix_tsquery(text: str) -> Optional[str]:
+    """to_tsquery text matching every word as a prefix: "new yo" -> "new:* & yo:*" """
+    terms = WORD.findall(text.casefold())[:MAX_TERMS]
+    return " & ".join(f"{term}:*" for term in terms) or None
+
+
+def ranked_search(db: Session, query: str, limit: int) -> List[Destination]:
+    """
+    Destinations matching the query, most relevant first
+
+    A destination matches when all words prefix-match its name, country or description
+    (GIN tsvector index), or when its name is trigram-similar to the query (GIN trigram
+    index), which catches typos like "barcelna". Rank combines both scores.
+    """
+    rank = func.similarity(Destination.name, query)
+    conditions = [Destination.name.op("%")(query)]
+
+    tsquery_text = prefix_tsquery(query)
+    if tsquery_text:
+        tsquery = func.to_tsquery("simple", tsquery_text)
+        conditions.append(Destination.search_vector.op("@@")(tsquery))
+        rank = rank + func.ts_rank_cd(Destination.search_vector, tsquery)
+
+    return (
+        db.query(Destination)
+        .filter(or_(*conditions))
+        .order_by(rank.desc(), Destination.name)
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,115 @@
+"""
+Destination Suggest
+In-process prefix index for search-as-you-type over destination names, countries and
+attractions, ranked by how many trips go there
+"""
+
+import heapq
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+KIND_DESTINATION = "destination"
+KIND_COUNTRY = "country"
+KIND_ATTRACTION = "attraction"
+KIND_ORDER = {KIND_DESTINATION: 0, KIND_COUNTRY: 1, KIND_ATTRACTION: 2}
+
+# Prefixes up to this length match so much of the index that their top results are
+# precomputed instead of scanned per keystroke
+SHORT_PREFIX = 2
+MAX_RESULTS = 20
+
+
+def fold(text: str) -> str:
+    """Case- and accent-insensitive form: "Park Güell" -> "park guell" """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    text: str
+    kind: str
+    popularity: int = 0
+    destination_id: Optional[str] = None
+    destination: Optional[str] = None  # the destination an attraction belongs to
+
+
+class SuggestIndex:
+    """
+    Sorted array of keys searched with bisect; immutable, so a rebuilt index can be
+    swapped in while requests keep reading the old one
+
+    Every word of a suggestion starts a key, so "quarter" finds "Gothic Quarter".
+    """
+
+    def __init__(self, suggestions: Iterable[Suggestion]):
+        # Position in this list is the rank: most popular first
+        self._items: List[Suggestion] = sorted(
+            suggestions,
+            key=lambda s: (-s.popularity, KIND_ORDER.get(s.kind, 9), len(s.text), s.text),
+        )
+
+        entries: List[Tuple[str, int]] = []
+        for rank, item in enumerate(self._items):
+            words = fold(item.text).split()
+            for start in range(len(words)):
+                entries.append((" ".join(words[start:]), rank))
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._ranks = [rank for _, rank in entries]
+
+        short: Dict[str, List[int]] = {}
+        for key, rank in entries:
+            for length in range(1, min(len(key), SHORT_PREFIX) + 1):
+                short.setdefault(key[:length], []).append(rank)
+        self._short = {
+            prefix: sorted(set(ranks))[:MAX_RESULTS] for prefix, ranks in short.items()
+        }
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Suggestion]:
+        key = fold(prefix)
+        if not key:
+            return []
+        limit = min(limit, MAX_RESULTS)
+        if len(key) <= SHORT_PREFIX:
+            ranks = self._short.get(key, [])[:limit]
+        else:
+            lo = bisect_left(self._keys, key)
+            hi = bisect_left(self._keys, key + "\uffff", lo)
+            ranks = heapq.nsmallest(limit, set(self._ranks[lo:hi]))
+        return [self._items[rank] for rank in ranks]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def build_suggestions(
+    destinations: Iterable[dict], trip_counts: Dict[str, int]
+) -> SuggestIndex:
+    """
+    Index rows of {"id", "name", "country", "attractions"}; trip_counts is keyed by
+    folded destination name
+    """
+    suggestions: List[Suggestion] = []
+    countries: Dict[str, List] = {}  # folded name -> [display name, trips]
+    for row in destinations:
+        trips = trip_counts.get(fold(row["name"]), 0)
+        destination_id = str(row["id"])
+        suggestions.append(Suggestion(row["name"], KIND_DESTINATION, trips, destination_id))
+        for attraction in row.get("attractions") or []:
+            if isinstance(attraction, str) and attraction.strip():
+                suggestions.append(
+                    Suggestion(
+                        attraction.strip(), KIND_ATTRACTION, trips, destination_id, row["name"]
+                    )
+                )
+        if row.get("country"):
+            country = countries.setdefault(fold(row["country"]), [row["country"], 0])
+            country[1] += trips
+
+    for name, trips in countries.values():
+        suggestions.append(Suggestion(name, KIND_COUNTRY, trips))
+    return SuggestIndex(suggestions)
@@ -0,0 +1,304 @@
+"""
+Fake Providers
+Deterministic local stand-ins for Gemini, the itinerary chain and Pexels
+
+Selected with LLM_PROVIDER=fake and PEXELS_PROVIDER=fake. Outputs depend only on the
+input, so runs are comparable; latency, errors and 429s are injected from a seeded
+random stream configured by the FAKE_* settings.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.config import settings
+from app.services.itinerary_service import ActivityPlan, DayPlan, ItineraryPlan
+
+logger = logging.getLogger(__name__)
+
+
+class FakeProviderError(Exception):
+    """Injected upstream failure; `code` makes it look like an HTTP error to retry logic"""
+
+    def __init__(self, code: int):
+        super().__init__(f"Injected fake provider error (HTTP {code})")
+        self.code = code
+
+
+class FaultInjector:
+    """Seeded latency and failure source shared by the fakes of one process"""
+
+    def __init__(self, seed: int = settings.FAKE_SEED):
+        self.random = random.Random(seed)
+
+    def latency(self) -> float:
+        """Log-normal latency around FAKE_LATENCY_MEDIAN seconds"""
+        if settings.FAKE_LATENCY_MEDIAN <= 0:
+            return 0.0
+        return self.random.lognormvariate(
+            math.log(settings.FAKE_LATENCY_MEDIAN), settings.FAKE_LATENCY_SIGMA
+        )
+
+    def fault(self) -> Optional[int]:
+        """HTTP status of an injected failure, or None"""
+        roll = self.random.random()
+        if roll < settings.FAKE_RATE_LIMIT_RATE:
+            return 429
+        if roll < settings.FAKE_RATE_LIMIT_RATE + settings.FAKE_ERROR_RATE:
+            return 503
+        return None
+
+    async def call(self) -> None:
+        """Wait out one call's latency, then maybe fail it"""
+        await asyncio.sleep(self.latency())
+        code = self.fault()
+        if code is not None:
+            raise FakeProviderError(code)
+
+
+faults = FaultInjector()
+
+
+def _digest(text: str) -> int:
+    return zlib.crc32(text.encode())
+
+
+def _count_tokens(text: str) -> int:
+    # Roughly 4 characters per token, like English text through Gemini's tokenizer
+    return max(1, len(text) // 4)
+
+
+# ==================== Gemini ====================
+
+REPLY_TEMPLATES = [
+    "Great question! For \"{topic}\", I'd start with the local highlights, book popular "
+    "spots a few days ahead, and leave one afternoon free to wander.",
+    "Here's a quick take on \"{topic}\": travel light, use public transport where you "
+    "can, and try at least one market or street-food stall.",
+    "When planning around \"{topic}\", check the season first, then balance museums and "
+    "outdoor time so no single day is too packed.",
+]
+
+
+def fake_reply(prompt: str) -> str:
+    """Deterministic chat reply for a prompt"""
+    topic = " ".join(prompt.split())[:60]
+    return REPLY_TEMPLATES[_digest(prompt) % len(REPLY_TEMPLATES)].format(topic=topic)
+
+
+@dataclass
+class FakeUsage:
+    prompt_token_count: int
+    candidates_token_count: int
+
+
+@dataclass
+class FakeResponse:
+    text: Optional[str]
+    usage_metadata: Optional[FakeUsage]
+
+
+def _prompt_text(contents: Any) -> str:
+    """All text parts of the request, in order"""
+    return " ".join(part.text or "" for content in contents for part in content.parts or [])
+
+
+class _FakeModels:
+    async def generate_content(self, model: str, contents: Any, **kwargs) -> FakeResponse:
+        await faults.call()
+        prompt = _prompt_text(contents)
+        text = fake_reply(contents[-1].parts[0].text)
+        return FakeResponse(text, FakeUsage(_count_tokens(prompt), _count_tokens(text)))
+
+    async def generate_content_stream(
+        self, model: str, contents: Any, **kwargs
+    ) -> AsyncIterator[FakeResponse]:
+        # Failures and time-to-first-token happen when the stream is opened
+        await faults.call()
+        prompt = _prompt_text(contents)
+        text = fake_reply(contents[-1].parts[0].text)
+        return self._stream(prompt, text)
+
+    async def _stream(self, prompt: str, text: str) -> AsyncIterator[FakeResponse]:
+        words = text.split(" ")
+        size = max(1, math.ceil(len(words) / settings.FAKE_STREAM_CHUNKS))
+        chunks = [" ".join(words[i : i + size]) for i in range(0, len(words), size)]
+        for i, chunk in enumerate(chunks):
+            last = i == len(chunks) - 1
+            await asyncio.sleep(faults.latency() / len(chunks))
+            yield FakeResponse(
+                chunk if last else chunk + " ",
+                FakeUsage(_count_tokens(prompt), _count_tokens(text)) if last else None,
+            )
+
+
+class _FakeAio:
+    def __init__(self):
+        self.models = _FakeModels()
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakeGenaiClient:
+    """Implements the part of google.genai.Client used by GeminiService"""
+
+    def __init__(self):
+        self.aio = _FakeAio()
+
+
+# ==================== Itinerary ====================
+
+DAY_SLOTS = [
+    ("08:00", 60, "food", "Breakfast at {place}", 0.10),
+    ("10:00", 150, "sightseeing", "Morning walk through {place}", 0.20),
+    ("13:00", 75, "food", "Lunch near {place}", 0.15),
+    ("15:00", 150, "culture", "Afternoon visit to {place}", 0.25),
+    ("19:00", 90, "food", "Dinner in {place}", 0.30),
+]
+
+
+def _trip_days(start: Optional[str], end: Optional[str]) -> int:
+    try:
+        days = (date.fromisoformat(end) - date.fromisoformat(start)).days + 1  # type: ignore
+    except (TypeError, ValueError):
+        return 3
+    return min(max(days, 1), 14)
+
+
+def fake_itinerary(inputs: Dict[str, Any]) -> ItineraryPlan:
+    """A schema-valid itinerary that covers the trip dates and stays within budget"""
+    destination = inputs.get("destination") or "the city"
+    days = _trip_days(inputs.get("start_date"), inputs.get("end_date"))
+    daily_budget = float(inputs.get("budget") or 1000.0) / days * 0.9
+    start = None
+    if inputs.get("start_date"):
+        start = date.fromisoformat(inputs["start_date"])
+
+    plan_days: List[DayPlan] = []
+    for n in range(days):
+        label = (start + timedelta(days=n)).isoformat() if start else f"Day {n + 1}"
+        place = f"{destination} district {_digest(f'{destination}{n}') % 9 + 1}"
+        plan_days.append(
+            DayPlan(
+                title=f"Day {n + 1}: Exploring {destination} ({label})",
+                activities=[
+                    ActivityPlan(
+                        title=title.format(place=place),
+                        description=f"{title.format(place=place)}, planned for {label}",
+                        time=time_of_day,
+                        duration=duration,
+                        cost=round(daily_budget * share, 2),
+                        category=category,
+                        location=place,
+                    )
+                    for time_of_day, duration, category, title, share in DAY_SLOTS
+                ],
+            )
+        )
+    return ItineraryPlan(days=plan_days)
+
+
+class FakeItineraryChain:
+    """Stands in for prompt | structured LLM (with include_raw=True)"""
+
+    def __init__(self, model: str):
+        self.model = model
+
+    async def ainvoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        await faults.call()
+        plan = fake_itinerary(inputs)
+        usage = {
+            "input_tokens": _count_tokens(json.dumps(inputs, default=str)),
+            "output_tokens": _count_tokens(plan.model_dump_json()),
+        }
+        return {
+            "raw": SimpleNamespace(usage_metadata=usage),
+            "parsed": plan,
+            "parsing_error": None,
+        }
+
+
+# ==================== Pexels ====================
+
+
+def fake_photo(seed: str, index: int) -> Dict[str, Any]:
+    """A photo object shaped like the Pexels API's"""
+    photo_id = _digest(f"{seed}:{index}") % 9_000_000 + 1_000_000
+    base = f"https://images.pexels.com/photos/{photo_id}/pexels-photo-{photo_id}.jpeg"
+    photographer_id = photo_id % 5000
+    return {
+        "id": photo_id,
+        "width": 4000,
+        "height": 2667,
+        "url": f"https://www.pexels.com/photo/{photo_id}/",
+        "photographer": f"Fake Photographer {photographer_id}",
+        "photographer_url": f"https://www.pexels.com/@fake-{photographer_id}",
+        "photographer_id": photographer_id,
+        "avg_color": f"#{photo_id % 0xFFFFFF:06X}",
+        "src": {
+            size: f"{base}?auto=compress&cs=tinysrgb&{params}"
+            for size, params in (
+                ("original", "w=4000"),
+                ("large2x", "dpr=2&h=650&w=940"),
+                ("large", "h=650&w=940"),
+                ("medium", "h=350"),
+                ("small", "h=130"),
+                ("portrait", "fit=crop&h=1200&w=800"),
+                ("landscape", "fit=crop&h=627&w=1200"),
+                ("tiny", "dpr=1&fit=crop&h=200&w=280"),
+            )
+        },
+        "liked": False,
+        "alt": seed,
+    }
+
+
+def fake_pexels_transport() -> httpx.MockTransport:
+    """Transport answering /search and /curated like Pexels, with rate-limit headers"""
+    quota = {"remaining": settings.FAKE_PEXELS_QUOTA, "reset": int(time.time()) + 3600}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(faults.latency())
+        if time.time() >= quota["reset"]:
+            quota.update(remaining=settings.FAKE_PEXELS_QUOTA, reset=int(time.time()) + 3600)
+
+        code = faults.fault()
+        if code == 429:
+            quota["remaining"] = 0
+        elif code is None:
+            quota["remaining"] = max(0, quota["remaining"] - 1)
+        headers = {
+            "X-Ratelimit-Limit": str(settings.FAKE_PEXELS_QUOTA),
+            "X-Ratelimit-Remaining": str(quota["remaining"]),
+            "X-Ratelimit-Reset": str(quota["reset"]),
+        }
+        if code is not None:
+            return httpx.Response(code, headers=headers, json={"error": "Injected failure"})
+
+        per_page = int(request.url.params.get("per_page", 1))
+        if request.url.path.endswith("/search"):
+            seed = request.url.params.get("query", "")
+        elif request.url.path.endswith("/curated"):
+            seed = "curated"
+        else:
+            return httpx.Response(404, headers=headers, json={"error": "Not found"})
+
+        photos = [fake_photo(seed, i) for i in range(per_page)]
+        return httpx.Response(
+            200,
+            headers=headers,
+            json={"page": 1, "per_page": per_page, "photos": photos, "total_results": 8000},
+        )
+
+    return httpx.MockTransport(handler)
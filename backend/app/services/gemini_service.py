@@ -1,49 +1,265 @@
 from google import genai
 from google.genai import types
 from app.config import settings
+from app.services.chat_cache import ChatResponseCache, chat_response_cache
+from app.services.llm_metrics import instrument
+from app.services.llm_scheduler import FairScheduler, chat_scheduler
+from app.services.model_router import TASK_CHAT, ModelRouter, model_router
+from app.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Deadline,
+    LatencyTracker,
+    hedged,
+    is_transient_error,
+    retry_async,
+)
+import asyncio
 import logging
-from typing import Optional
+import time
+from typing import AsyncIterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
+FALLBACK_RESPONSE = (
+    "I apologize, but I'm having trouble processing your request right now. Please try again."
+)
+
 
 class GeminiService:
-    def __init__(self):
-        # Initialize the client with API key
-        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
-
-    async def generate_response(self, prompt: str, context: Optional[list] = None) -> str:
-        """Generate AI response for travel queries"""
-        try:
-            # Build conversation contents
-            contents = []
-            if context:
-                for msg in context:
-                    # Map 'assistant' role to 'model' for Gemini API
-                    gemini_role = "model" if msg["role"] == "assistant" else msg["role"]
-                    contents.append(
-                        types.Content(
-                            role=gemini_role,
-                            parts=[types.Part(text=msg["content"])],
-                        )
+    def __init__(
+        self,
+        cache: ChatResponseCache = chat_response_cache,
+        scheduler: FairScheduler = chat_scheduler,
+        router: ModelRouter = model_router,
+    ):
+        self._client: Optional[genai.Client] = None
+        self.cache = cache
+        self.scheduler = scheduler
+        self.router = router
+        self.breaker = CircuitBreaker(
+            "gemini_chat",
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.LLM_BREAKER_RECOVERY,
+        )
+        self.latency = LatencyTracker()
+
+    @property
+    def client(self) -> genai.Client:
+        """Process-wide Gemini client; its HTTP connection pool is shared by all requests"""
+        if self._client is None:
+            if settings.LLM_PROVIDER == "fake":
+                from app.services.fake_providers import FakeGenaiClient
+
+                self._client = FakeGenaiClient()  # type: ignore[assignment]
+            else:
+                # Initialize the client with API key
+                self._client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        return self._client  # type: ignore[return-value]
+
+    async def startup(self) -> None:
+        """Create the client up front (called from the app lifespan)"""
+        _ = self.client
+
+    async def aclose(self) -> None:
+        """Close the client's async connection pool"""
+        if self._client is not None:
+            await self._client.aio.aclose()
+            self._client = None
+
+    def _build_contents(self, prompt: str, context: Optional[list] = None) -> List[types.Content]:
+        """Build Gemini conversation contents from chat history plus the new prompt"""
+        contents = []
+        if context:
+            for msg in context:
+                # Map 'assistant' role to 'model' for Gemini API
+                gemini_role = "model" if msg["role"] == "assistant" else msg["role"]
+                contents.append(
+                    types.Content(
+                        role=gemini_role,
+                        parts=[types.Part(text=msg["content"])],
                     )
-            # Add the current prompt
-            contents.append(
-                types.Content(
-                    role="user",
-                    parts=[types.Part(text=prompt)],
                 )
+        # Add the current prompt
+        contents.append(
+            types.Content(
+                role="user",
+                parts=[types.Part(text=prompt)],
             )
+        )
+        return contents
+
+    def _record_outcome(self, error: Optional[BaseException] = None) -> None:
+        """Only outages and overload count against the breaker, not e.g. bad requests"""
+        if error is not None and is_transient_error(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not settings.LLM_CHAT_HEDGE:
+            return None
+        return self.latency.percentile(settings.LLM_CHAT_HEDGE_PERCENTILE)
+
+    async def generate_response(
+        self, prompt: str, context: Optional[list] = None, user_id=None
+    ) -> str:
+        """
+        Generate AI response for travel queries
+
+        The call is bounded by LLM_CHAT_BUDGET (queueing, retries and hedges
+        included). Returns the fallback text right away while the breaker is open.
+        Raises ServiceUnavailableError if no model slot frees up in time.
+        """
+        cached = self.cache.get(prompt, context)
+        if cached is not None:
+            return cached
+
+        deadline = Deadline(settings.LLM_CHAT_BUDGET)
+        with instrument(TASK_CHAT) as metrics_call:
+            if self.breaker.state == CircuitBreaker.OPEN:
+                metrics_call.fallback("circuit_open")
+                return FALLBACK_RESPONSE
+
+            async with self.scheduler.slot(user_id):
+                try:
+                    if not self.breaker.allow():
+                        raise CircuitOpenError("Gemini chat circuit is open")
+                    contents = self._build_contents(prompt, context)
+
+                    async def call():
+                        # Picked per attempt, so a retry can move to a healthier model
+                        model = self.router.pick(TASK_CHAT)
+                        metrics_call.model = model
+                        with self.router.observe(model):
+                            return await self.client.aio.models.generate_content(
+                                model=model, contents=contents
+                            )
+
+                    started = time.monotonic()
+                    try:
+                        # Generate response
+                        response = await retry_async(
+                            "gemini_chat",
+                            lambda: hedged("gemini_chat", call, self._hedge_delay()),
+                            deadline,
+                            attempts=settings.LLM_MAX_ATTEMPTS,
+                            attempt_timeout=settings.LLM_CHAT_ATTEMPT_TIMEOUT,
+                            base_delay=settings.LLM_RETRY_BASE_DELAY,
+                            max_delay=settings.LLM_RETRY_MAX_DELAY,
+                        )
+                    except Exception as e:
+                        self._record_outcome(e)
+                        raise
+                    except BaseException:
+                        # Cancelled: says nothing about Gemini, but free a half-open probe
+                        self.breaker.release_probe()
+                        raise
+                    self._record_outcome()
+                    self.latency.observe(time.monotonic() - started)
+                    metrics_call.genai_usage(response.usage_metadata)
+
+                    if not response.text:
+                        metrics_call.fallback("empty")
+                        return FALLBACK_RESPONSE
+                    self.cache.put(prompt, context, response.text)
+                    return response.text
+
+                except Exception as e:
+                    logger.error(f"Gemini API error: {str(e)}")
+                    metrics_call.fallback(type(e).__name__)
+                    return FALLBACK_RESPONSE
+
+    async def stream_response(
+        self, prompt: str, context: Optional[list] = None, user_id=None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the AI response as text chunks as soon as Gemini produces them
+
+        Opening the stream is retried like generate_response; the whole stream must
+        finish within LLM_CHAT_BUDGET. The model slot is held until the stream ends.
+        Raises ServiceUnavailableError before the first chunk if no slot frees up in
+        time.
+        """
+        cached = self.cache.get(prompt, context)
+        if cached is not None:
+            yield cached
+            return
+
+        deadline = Deadline(settings.LLM_CHAT_BUDGET)
+        chunks: List[str] = []
+        produced = False
+        with instrument(TASK_CHAT) as metrics_call:
+            if self.breaker.state == CircuitBreaker.OPEN:
+                metrics_call.fallback("circuit_open")
+            else:
+                async with self.scheduler.slot(user_id):
+                    try:
+                        if not self.breaker.allow():
+                            raise CircuitOpenError("Gemini chat circuit is open")
+                        contents = self._build_contents(prompt, context)
+
+                        async def open_stream():
+                            model = self.router.pick(TASK_CHAT)
+                            metrics_call.model = model
+                            # Opening a stream says little about its total latency
+                            with self.router.observe(model, track_latency=False):
+                                return await self.client.aio.models.generate_content_stream(
+                                    model=model, contents=contents
+                                )
+
+                        outcome_recorded = False
+                        try:
+                            stream = await retry_async(
+                                "gemini_chat_stream",
+                                open_stream,
+                                deadline,
+                                attempts=settings.LLM_MAX_ATTEMPTS,
+                                attempt_timeout=settings.LLM_CHAT_ATTEMPT_TIMEOUT,
+                                base_delay=settings.LLM_RETRY_BASE_DELAY,
+                                max_delay=settings.LLM_RETRY_MAX_DELAY,
+                            )
+                            iterator = stream.__aiter__()
+                            usage_metadata = None
+                            while True:
+                                try:
+                                    chunk = await asyncio.wait_for(
+                                        iterator.__anext__(), timeout=deadline.remaining()
+                                    )
+                                except StopAsyncIteration:
+                                    break
+                                # Usage is reported on the final chunk
+                                usage_metadata = chunk.usage_metadata or usage_metadata
+                                if chunk.text:
+                                    produced = True
+                                    metrics_call.first_token()
+                                    chunks.append(chunk.text)
+                                    yield chunk.text
+                            metrics_call.genai_usage(usage_metadata)
+                        except Exception as e:
+                            outcome_recorded = True
+                            self._record_outcome(e)
+                            raise
+                        finally:
+                            # Completed, or closed early by the consumer: upstream was healthy
+                            if not outcome_recorded:
+                                self._record_outcome()
+
+                        # Only complete replies are cached; an interrupted stream never
+                        # gets here
+                        if produced:
+                            self.cache.put(prompt, context, "".join(chunks))
+
+                    except Exception as e:
+                        logger.error(f"Gemini streaming error: {str(e)}")
+                        if not produced:
+                            metrics_call.fallback(type(e).__name__)
+
+            # Keep the old contract: the user always gets some reply
+            if not produced:
+                metrics_call.fallback(metrics_call.fallback_reason or "empty")
+                yield FALLBACK_RESPONSE
 
-            # Generate response
-            response = await self.client.aio.models.generate_content(
-                model=settings.GEMINI_MODEL, contents=contents
-            )
-            return (
-                response.text
-                or "I apologize, but I'm having trouble processing your request right now. Please try again."
-            )
 
-        except Exception as e:
-            logger.error(f"Gemini API error: {str(e)}")
-            return "I apologize, but I'm having trouble processing your request right now. Please try again."
+# Process-wide instance, created at startup and shared across requests
+gemini_service = GeminiService()
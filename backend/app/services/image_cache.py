@@ -0,0 +1,188 @@
+"""
+Destination Image Cache
+Two-tier cache (in-process LRU in front of Redis) for Pexels destination images
+"""
+
+import asyncio
+import json
+import logging
+import re
+import secrets
+import unicodedata
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from cachetools import TLRUCache
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.services.redis_service import RedisService, redis_service
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ImageData = Optional[Dict[str, Any]]
+
+# Sentinel distinguishing "not cached" from a cached negative (None) result
+MISS = object()
+
+# Delete the lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+cache_requests = metrics.counter(
+    "pexels_image_cache_requests_total", "Destination image cache lookups by tier and result"
+)
+cache_hit_ratio = metrics.gauge(
+    "pexels_image_cache_hit_ratio", "Destination image cache hit ratio by tier"
+)
+
+
+def normalize_destination(destination: str) -> str:
+    """Normalize a destination so 'Paris, France' and ' paris  france' share a key"""
+    text = unicodedata.normalize("NFKC", destination).casefold()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class DestinationImageCache:
+    """In-process LRU in front of Redis; negative results expire sooner than hits"""
+
+    def __init__(
+        self,
+        maxsize: int = settings.PEXELS_LOCAL_CACHE_SIZE,
+        ttl: int = settings.PEXELS_CACHE_TTL,
+        negative_ttl: int = settings.PEXELS_NEGATIVE_CACHE_TTL,
+        redis: Optional[RedisService] = redis_service,
+        prefix: str = "pexels:destination:",
+        lock_prefix: str = "pexels:lock:",
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.redis = redis
+        self.prefix = prefix
+        self.lock_prefix = lock_prefix
+        self._local: TLRUCache = TLRUCache(maxsize=maxsize, ttu=self._expires_at)
+
+    def _expires_at(self, key: str, value: ImageData, now: float) -> float:
+        return now + (self.ttl if value is not None else self.negative_ttl)
+
+    def _record(self, tier: str, result: str) -> None:
+        cache_requests.inc(tier=tier, result=result)
+        hits = cache_requests.value(tier=tier, result="hit")
+        total = hits + cache_requests.value(tier=tier, result="miss")
+        cache_hit_ratio.set(hits / total, tier=tier)
+
+    async def get(self, destination: str) -> Tuple[str, Any]:
+        """
+        Look up a destination image
+
+        Returns:
+            (normalized key, cached image data / None for a cached negative / MISS)
+        """
+        key = normalize_destination(destination)
+
+        value = self._local.get(key, MISS)
+        if value is not MISS:
+            self._record("local", "hit")
+            return key, value
+        self._record("local", "miss")
+
+        value = await self._get_remote(key)
+        if value is not MISS:
+            self._record("redis", "hit")
+            self._local[key] = value
+        elif self.redis and self.redis.client is not None:
+            self._record("redis", "miss")
+        return key, value
+
+    async def _get_remote(self, key: str) -> Any:
+        client = self.redis.client if self.redis else None
+        if client is None:
+            return MISS
+
+        try:
+            raw = await client.get(self.prefix + key)
+        except (RedisError, OSError) as e:
+            self.redis.report_failure(e)  # type: ignore[union-attr]
+            return MISS
+
+        return MISS if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: ImageData) -> None:
+        """Store an image (or None for 'no image') under a normalized key"""
+        self._local[key] = value
+
+        client = self.redis.client if self.redis else None
+        if client is None:
+            return
+
+        ttl = self.ttl if value is not None else self.negative_ttl
+        try:
+            await client.set(self.prefix + key, json.dumps(value), ex=ttl)
+        except (RedisError, OSError) as e:
+            self.redis.report_failure(e)  # type: ignore[union-attr]
+
+    @asynccontextmanager
+    async def fill_lock(self, key: str, ttl: float) -> AsyncIterator[bool]:
+        """
+        Cross-worker lock around filling one key
+
+        Yields True if this worker should fetch the value (lock taken, or Redis is
+        unavailable), False if another worker is already fetching it.
+        """
+        client = self.redis.client if self.redis else None
+        if client is None:
+            yield True
+            return
+
+        lock_key = self.lock_prefix + key
+        token = secrets.token_hex(8)
+        try:
+            acquired = bool(await client.set(lock_key, token, nx=True, px=int(ttl * 1000)))
+        except (RedisError, OSError) as e:
+            self.redis.report_failure(e)  # type: ignore[union-attr]
+            yield True
+            return
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    await client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except (RedisError, OSError) as e:
+                    logger.warning(f"Failed to release image cache lock for '{key}': {e}")
+
+    async def wait_for(self, key: str, timeout: float, interval: float = 0.1) -> Any:
+        """Poll Redis for a value another worker is filling; MISS if it doesn't arrive"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            await asyncio.sleep(interval)
+            value = await self._get_remote(key)
+            if value is not MISS:
+                self._local[key] = value
+                return value
+        return MISS
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Hit/miss counts and hit rate per tier"""
+        result = {}
+        for tier in ("local", "redis"):
+            hits = cache_requests.value(tier=tier, result="hit")
+            misses = cache_requests.value(tier=tier, result="miss")
+            total = hits + misses
+            result[tier] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / total if total else 0.0,
+            }
+        return result
+
+
+destination_image_cache = DestinationImageCache()
@@ -0,0 +1,152 @@
+"""
+Itinerary Drafts
+Instant template-based itineraries built from the destination catalog, shown while the
+LLM works on the real plan (or instead of it when the LLM is unavailable)
+"""
+
+from datetime import date
+from typing import Iterator, List, Optional
+
+from app.services.destination_catalog import DestinationProfile
+from app.services.itinerary_repair import repair_itinerary
+
+DEFAULT_DAILY_BUDGET = 100.0
+DEFAULT_DAYS = 3
+
+# Share of the daily spend per slot; the rest is left as slack
+MEAL_SHARE = {"Breakfast": 0.08, "Lunch": 0.12, "Dinner": 0.2}
+ATTRACTION_SHARE = 0.2
+
+
+def _day_count(start_date: Optional[str], end_date: Optional[str]) -> int:
+    try:
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)  # type: ignore
+    except (TypeError, ValueError):
+        return DEFAULT_DAYS
+    return max((end - start).days + 1, 1)
+
+
+def _activity(
+    title: str,
+    description: str,
+    time: str,
+    duration: int,
+    cost: float,
+    category: str,
+    location: str,
+) -> dict:
+    return {
+        "title": title,
+        "description": description,
+        "time": time,
+        "duration": duration,
+        "cost": round(cost, 2),
+        "category": category,
+        "location": location,
+    }
+
+
+def _sights(
+    name: str, profile: Optional[DestinationProfile], interests: List[str]
+) -> Iterator[tuple]:
+    """(title, description, location) for each sightseeing slot, best first"""
+    for attraction in profile.attractions if profile else []:
+        yield (
+            attraction,
+            f"Visit {attraction}, one of {name}'s highlights",
+            f"{attraction}, {name}",
+        )
+    for interest in interests:
+        yield (
+            f"{interest.strip().capitalize()} in {name}",
+            f"Time set aside for {interest.strip()}",
+            name,
+        )
+    while True:
+        yield f"Explore {name}", "Free time to wander and discover the city", name
+
+
+def draft_itinerary(
+    destination: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    budget: Optional[float] = None,
+    interests: Optional[List[str]] = None,
+    profile: Optional[DestinationProfile] = None,
+) -> dict:
+    """
+    Day-by-day skeleton: meals plus the catalog's attractions, then the user's interests
+
+    Pure and deterministic; returns the ItineraryPlan shape used by ItineraryService.
+    """
+    name = profile.name if profile else destination
+    days = _day_count(start_date, end_date)
+    daily = profile.daily_budget if profile and profile.daily_budget else DEFAULT_DAILY_BUDGET
+    if budget:
+        daily = min(daily, budget / days)
+
+    sights = _sights(name, profile, [i for i in interests or [] if i and i.strip()])
+
+    def meal(meal_name: str, time: str, duration: int) -> dict:
+        return _activity(
+            meal_name,
+            f"{meal_name} at a local spot",
+            time,
+            duration,
+            daily * MEAL_SHARE[meal_name],
+            "food",
+            name,
+        )
+
+    def sight(time: str, duration: int) -> dict:
+        title, description, location = next(sights)
+        return _activity(
+            title, description, time, duration, daily * ATTRACTION_SHARE, "sightseeing", location
+        )
+
+    plan = []
+    for number in range(1, days + 1):
+        if number == 1 and days > 1:
+            activities = [
+                _activity(
+                    "Check in and settle",
+                    "Drop your bags and freshen up",
+                    "15:00",
+                    60,
+                    0.0,
+                    "accommodation",
+                    name,
+                ),
+                _activity(
+                    "Orientation walk",
+                    (profile.description if profile else None) or f"Get your bearings in {name}",
+                    "16:30",
+                    120,
+                    0.0,
+                    "sightseeing",
+                    f"{name} city center",
+                ),
+                meal("Dinner", "19:30", 90),
+            ]
+            title = f"Day 1: Arrival in {name}"
+        elif number == days and days > 1:
+            activities = [
+                meal("Breakfast", "08:00", 60),
+                sight("09:30", 120),
+                _activity(
+                    "Departure", f"Head out from {name}", "12:30", 60, 0.0, "transport", name
+                ),
+            ]
+            title = f"Day {number}: {activities[1]['title']} & Departure"
+        else:
+            activities = [
+                meal("Breakfast", "08:00", 60),
+                sight("09:30", 150),
+                meal("Lunch", "12:30", 75),
+                sight("14:30", 150),
+                meal("Dinner", "19:30", 90),
+            ]
+            title = f"Day {number}: {activities[1]['title']} & {activities[3]['title']}"
+        plan.append({"title": title, "activities": activities})
+
+    return repair_itinerary({"days": plan}, start_date, end_date, budget)
@@ -0,0 +1,211 @@
+"""
+Itinerary Repair
+Deterministic validation and repair of generated itineraries: day count, chronological
+order, overlapping activities and the trip budget
+"""
+
+import logging
+import math
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+repairs = metrics.counter("itinerary_repairs_total", "Itinerary repairs applied by kind")
+
+DAY_END = 24 * 60  # activities must finish by midnight
+DEFAULT_DURATION = 60
+# Budget selection works in at most this many cost units, whatever the budget
+BUDGET_RESOLUTION = 2000
+# Meals, transport and lodging are worth more per minute than optional sightseeing
+ESSENTIAL_CATEGORIES = frozenset({"food", "transport", "accommodation"})
+
+TIME_PATTERN = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)?\s*$", re.IGNORECASE)
+
+
+def parse_time(value) -> Optional[int]:
+    """Minutes after midnight for "HH:MM", "9:30" or "7 pm"; None if unreadable"""
+    match = TIME_PATTERN.match(str(value or ""))
+    if not match:
+        return None
+    hours, minutes = int(match.group(1)), int(match.group(2) or 0)
+    meridiem = (match.group(3) or "").lower()
+    if meridiem:
+        if not 1 <= hours <= 12:
+            return None
+        hours = hours % 12 + (12 if meridiem.startswith("p") else 0)
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
+
+def format_time(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _to_number(value, default: float) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return number if math.isfinite(number) and number >= 0 else default
+
+
+def _trip_days(start_date: Optional[str], end_date: Optional[str]) -> Optional[int]:
+    try:
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)  # type: ignore
+    except (TypeError, ValueError):
+        return None
+    days = (end - start).days + 1
+    return days if days >= 1 else None
+
+
+def _fit_day_count(days: List[dict], expected: int) -> List[dict]:
+    if len(days) > expected:
+        repairs.inc(kind="day_removed", amount=len(days) - expected)
+        return days[:expected]
+    for number in range(len(days) + 1, expected + 1):
+        repairs.inc(kind="day_added")
+        days.append({"title": f"Day {number}: Free day", "activities": []})
+    return days
+
+
+def _schedule(activities: List[dict]) -> List[dict]:
+    """Sort by start time and push overlapping activities later; drop what no longer fits"""
+    # Untimed activities keep their relative order after the timed ones
+    ordered = sorted(
+        enumerate(activities),
+        key=lambda item: (item[1]["_start"] is None, item[1]["_start"] or 0, item[0]),
+    )
+    if [index for index, _ in ordered] != list(range(len(activities))):
+        repairs.inc(kind="reordered")
+
+    scheduled = []
+    cursor = None  # end of the previous activity
+    for _, activity in ordered:
+        start = activity["_start"]
+        if start is None:
+            start = cursor if cursor is not None else 9 * 60
+            repairs.inc(kind="time_assigned")
+        elif cursor is not None and start < cursor:
+            start = cursor
+            repairs.inc(kind="overlap_shifted")
+        if start >= DAY_END:
+            repairs.inc(kind="dropped_no_time")
+            continue
+        if start + activity["duration"] > DAY_END:
+            activity["duration"] = DAY_END - start
+            repairs.inc(kind="duration_trimmed")
+        activity["time"] = format_time(start)
+        cursor = start + activity["duration"]
+        scheduled.append(activity)
+    return scheduled
+
+
+def _value(activity: dict) -> float:
+    weight = 2.0 if activity.get("category") in ESSENTIAL_CATEGORIES else 1.0
+    return weight * max(activity["duration"], 1)
+
+
+def select_within_budget(costs: List[float], values: List[float], budget: float) -> List[int]:
+    """
+    0/1 knapsack: indices of the most valuable items whose total cost fits the budget
+
+    Costs are rounded up to units of budget / BUDGET_RESOLUTION, so the table stays small
+    and the chosen items never exceed the real budget.
+    """
+    if budget <= 0:
+        return [i for i, cost in enumerate(costs) if cost == 0]
+    unit = budget / BUDGET_RESOLUTION
+    capacity = BUDGET_RESOLUTION
+    weights = [math.ceil(cost / unit - 1e-9) for cost in costs]
+
+    best = [0.0] * (capacity + 1)
+    keep = [[False] * (capacity + 1) for _ in costs]
+    for i, (weight, value) in enumerate(zip(weights, values)):
+        for c in range(capacity, weight - 1, -1):
+            candidate = best[c - weight] + value
+            if candidate > best[c]:
+                best[c] = candidate
+                keep[i][c] = True
+
+    chosen = []
+    c = capacity
+    for i in range(len(costs) - 1, -1, -1):
+        if keep[i][c]:
+            chosen.append(i)
+            c -= weights[i]
+    return sorted(chosen)
+
+
+def _enforce_budget(days: List[dict], budget: float) -> None:
+    items: List[Tuple[int, dict]] = [
+        (d, activity) for d, day in enumerate(days) for activity in day["activities"]
+    ]
+    total = sum(activity["cost"] for _, activity in items)
+    if total <= budget:
+        return
+
+    chosen = set(
+        select_within_budget(
+            [activity["cost"] for _, activity in items],
+            [_value(activity) for _, activity in items],
+            budget,
+        )
+    )
+    repairs.inc(kind="dropped_over_budget", amount=len(items) - len(chosen))
+    logger.info(
+        f"Itinerary cost {total:.2f} over budget {budget:.2f}; "
+        f"dropped {len(items) - len(chosen)} of {len(items)} activities"
+    )
+    for day in days:
+        day["activities"] = []
+    for index, (d, activity) in enumerate(items):
+        if index in chosen:
+            days[d]["activities"].append(activity)
+
+
+def repair_itinerary(
+    plan: dict,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    budget: Optional[float] = None,
+) -> dict:
+    """
+    Return a valid copy of an itinerary plan ({"days": [{"title", "activities"}]})
+
+    - the number of days matches the trip dates (trailing days dropped, free days added)
+    - activities are in chronological order, with "HH:MM" times and no overlaps
+    - the total cost fits the budget, keeping the most valuable set of activities
+
+    Dates and budget are optional; checks that need them are skipped without them.
+    """
+    days = []
+    for number, day in enumerate(plan.get("days") or [], start=1):
+        activities = []
+        for activity in day.get("activities") or []:
+            activity = dict(activity)
+            activity["_start"] = parse_time(activity.get("time"))
+            activity["duration"] = int(_to_number(activity.get("duration"), DEFAULT_DURATION))
+            activity["cost"] = _to_number(activity.get("cost"), 0.0)
+            activities.append(activity)
+        title = day.get("title") or f"Day {number}"
+        days.append({**day, "title": title, "activities": activities})
+
+    expected_days = _trip_days(start_date, end_date)
+    if expected_days is not None:
+        days = _fit_day_count(days, expected_days)
+
+    for day in days:
+        day["activities"] = _schedule(day["activities"])
+
+    if budget is not None:
+        _enforce_budget(days, budget)
+
+    for day in days:
+        for activity in day["activities"]:
+            del activity["_start"]
+    return {**plan, "days": days}
@@ -1,8 +1,22 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Optional
 from app.config import settings
+from app.services.llm_metrics import instrument
+from app.services.destination_catalog import destination_catalog
+from app.services.itinerary_draft import draft_itinerary
+from app.services.itinerary_repair import repair_itinerary
+from app.services.llm_scheduler import FairScheduler, itinerary_scheduler
+from app.services.model_router import TASK_ITINERARY, ModelRouter, model_router
+from app.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Deadline,
+    is_transient_error,
+    retry_async,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,12 +42,78 @@ class ItineraryPlan(BaseModel):
     days: List[DayPlan] = Field(description="List of days")
 
 
+ITINERARY_PROMPT = """You are an expert travel planner. Create a detailed day-by-day itinerary.
+
+Destination: {destination}
+Dates: {start_date} to {end_date}
+Budget: ${budget}
+Interests: {interests}
+Additional Context: {chat_context}
+
+Create a realistic itinerary with specific activities, times, costs, and locations.
+Include breakfast, lunch, dinner, and activities.
+Ensure the total cost stays within budget.
+Ensure the total cost of all activities stays within the budget."""
+
+
 class ItineraryService:
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash", google_api_key=settings.GEMINI_API_KEY, temperature=0.7
+    def __init__(
+        self,
+        scheduler: FairScheduler = itinerary_scheduler,
+        router: ModelRouter = model_router,
+    ):
+        self._chains: Dict[str, Runnable] = {}
+        self.scheduler = scheduler
+        self.router = router
+        self.breaker = CircuitBreaker(
+            "gemini_itinerary",
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.LLM_BREAKER_RECOVERY,
         )
 
+    def _build_chain(self, model: Optional[str] = None) -> Runnable:
+        """Build the prompt | structured LLM chain (done once per process and model)"""
+        model = model or self.router.candidates(TASK_ITINERARY)[0]
+        if settings.LLM_PROVIDER == "fake":
+            # Imported here: the fakes build on this module's schemas
+            from app.services.fake_providers import FakeItineraryChain
+
+            return FakeItineraryChain(model)  # type: ignore[return-value]
+
+        llm = ChatGoogleGenerativeAI(
+            model=model,
+            google_api_key=settings.GEMINI_API_KEY,
+            temperature=0.7,
+            # A single attempt per call; generate_itinerary applies its own retry policy
+            max_retries=1,
+        )
+
+        # Use the modern with_structured_output() method for better type safety; the raw
+        # message is kept for its token usage
+        structured_llm = llm.with_structured_output(ItineraryPlan, include_raw=True)
+
+        # Define the prompt template for the AI
+        prompt = ChatPromptTemplate.from_template(ITINERARY_PROMPT)
+
+        # Create the LangChain chain using LCEL (LangChain Expression Language)
+        return prompt | structured_llm
+
+    def chain_for(self, model: str) -> Runnable:
+        """Shared chain for a model; reused across requests instead of rebuilt per call"""
+        if model not in self._chains:
+            self._chains[model] = self._build_chain(model)
+        return self._chains[model]
+
+    @property
+    def chain(self) -> Runnable:
+        """Chain for the preferred itinerary model"""
+        return self.chain_for(self.router.candidates(TASK_ITINERARY)[0])
+
+    async def startup(self) -> None:
+        """Build the chains up front (called from the app lifespan)"""
+        for model in self.router.candidates(TASK_ITINERARY):
+            self.chain_for(model)
+
     async def generate_itinerary(
         self,
         destination: str,
@@ -42,80 +122,108 @@ class ItineraryService:
         budget: float,
         interests: List[str],
         chat_context: str = "",
+        user_id=None,
+        fallback_to_draft: bool = True,
     ) -> dict:
-        """Generate detailed itinerary based on parameters"""
-        try:
-            # Use the modern with_structured_output() method for better type safety
-            structured_llm = self.llm.with_structured_output(ItineraryPlan)
-
-            # Define the prompt template for the AI
-            prompt = ChatPromptTemplate.from_template(
-                """You are an expert travel planner. Create a detailed day-by-day itinerary.
+        """
+        Generate detailed itinerary based on parameters
+
+        The call is bounded by LLM_ITINERARY_BUDGET, retries included. Returns the
+        catalog draft right away while the breaker is open, and when generation fails;
+        with fallback_to_draft=False those cases raise instead (CircuitOpenError or the
+        generation error), for callers that already have the draft.
+        Raises ServiceUnavailableError if no model slot frees up in time.
+        """
+        deadline = Deadline(settings.LLM_ITINERARY_BUDGET)
+        with instrument(TASK_ITINERARY) as metrics_call:
+            if self.breaker.state == CircuitBreaker.OPEN:
+                if not fallback_to_draft:
+                    raise CircuitOpenError("Gemini itinerary circuit is open")
+                metrics_call.fallback("circuit_open")
+                return self.draft(destination, start_date, end_date, budget, interests)
+
+            async with self.scheduler.slot(user_id):
+                try:
+                    if not self.breaker.allow():
+                        raise CircuitOpenError("Gemini itinerary circuit is open")
+
+                    inputs = {
+                        "destination": destination,
+                        "start_date": start_date,
+                        "end_date": end_date,
+                        "budget": budget,
+                        "interests": (
+                            ", ".join(interests) if interests else "general sightseeing"
+                        ),
+                        "chat_context": chat_context or "No additional preferences",
+                    }
+
+                    async def call():
+                        # Picked per attempt, so a retry can move to a healthier model
+                        model = self.router.pick(TASK_ITINERARY)
+                        metrics_call.model = model
+                        with self.router.observe(model):
+                            # Use ainvoke() instead of invoke() for async operations
+                            output = await self.chain_for(model).ainvoke(inputs)
+                        usage = getattr(output["raw"], "usage_metadata", None) or {}
+                        metrics_call.usage(usage.get("input_tokens"), usage.get("output_tokens"))
+                        if output["parsed"] is None:
+                            raise ValueError(f"Unparseable itinerary: {output['parsing_error']}")
+                        return output["parsed"]
+
+                    try:
+                        result = await retry_async(
+                            "gemini_itinerary",
+                            call,
+                            deadline,
+                            attempts=settings.LLM_MAX_ATTEMPTS,
+                            attempt_timeout=settings.LLM_ITINERARY_ATTEMPT_TIMEOUT,
+                            base_delay=settings.LLM_RETRY_BASE_DELAY,
+                            max_delay=settings.LLM_RETRY_MAX_DELAY,
+                        )
+                    except Exception as e:
+                        if is_transient_error(e):
+                            self.breaker.record_failure()
+                        else:
+                            self.breaker.record_success()
+                        raise
+                    except BaseException:
+                        # Cancelled: says nothing about Gemini, but free a half-open probe
+                        self.breaker.release_probe()
+                        raise
+                    self.breaker.record_success()
+
+                    # Result is an ItineraryPlan Pydantic model, convert to dict
+                    plan = result if isinstance(result, dict) else result.model_dump()
+                    # Fix budget, overlaps and day count locally instead of regenerating
+                    return repair_itinerary(plan, start_date, end_date, budget)
+
+                except Exception as e:
+                    logger.error(f"Itinerary generation error: {str(e)}")
+                    if not fallback_to_draft:
+                        raise
+                    metrics_call.fallback(type(e).__name__)
+                    # The catalog draft is the fallback itinerary
+                    return self.draft(destination, start_date, end_date, budget, interests)
+
+    def draft(
+        self,
+        destination: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        budget: Optional[float],
+        interests: Optional[List[str]] = None,
+    ) -> dict:
+        """Instant multi-day itinerary from the destination catalog; no LLM involved"""
+        return draft_itinerary(
+            destination,
+            start_date,
+            end_date,
+            budget,
+            interests,
+            profile=destination_catalog.find(destination),
+        )
 
-Destination: {destination}
-Dates: {start_date} to {end_date}
-Budget: ${budget}
-Interests: {interests}
-Additional Context: {chat_context}
 
-Create a realistic itinerary with specific activities, times, costs, and locations.
-Include breakfast, lunch, dinner, and activities.
-Ensure the total cost stays within budget.
-Ensure the total cost of all activities stays within the budget."""
-            )
-
-            # Create the LangChain chain using LCEL (LangChain Expression Language)
-            chain = prompt | structured_llm
-
-            # Use ainvoke() instead of invoke() for async operations
-            result = await chain.ainvoke(
-                {
-                    "destination": destination,
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "budget": budget,
-                    "interests": (", ".join(interests) if interests else "general sightseeing"),
-                    "chat_context": chat_context or "No additional preferences",
-                }
-            )
-
-            # Result is an ItineraryPlan Pydantic model, convert to dict
-            if isinstance(result, dict):
-                return result
-            else:
-                return result.model_dump()
-
-        except Exception as e:
-            logger.error(f"Itinerary generation error: {str(e)}")
-            # Return a basic fallback itinerary
-            return self._generate_fallback_itinerary(destination)
-
-    def _generate_fallback_itinerary(self, destination: str) -> dict:
-        """Generate a simple fallback itinerary"""
-        return {
-            "days": [
-                {
-                    "title": "Day 1: Arrival & Exploration",
-                    "activities": [
-                        {
-                            "title": "Breakfast at hotel",
-                            "description": "Start your day with a hearty meal",
-                            "time": "08:00",
-                            "duration": 60,
-                            "cost": 15.0,
-                            "category": "food",
-                            "location": "Hotel",
-                        },
-                        {
-                            "title": f"City tour of {destination}",
-                            "description": "Explore the main attractions",
-                            "time": "10:00",
-                            "duration": 240,
-                            "cost": 50.0,
-                            "category": "sightseeing",
-                            "location": f"{destination} City Center",
-                        },
-                    ],
-                }
-            ]
-        }
+# Process-wide instance, created at startup and shared across requests
+itinerary_service = ItineraryService()
@@ -0,0 +1,93 @@
+"""
+LLM Call Instrumentation
+Latency, time-to-first-token, token usage and fallback rates per route, task and model
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from app.utils.exceptions import ServiceUnavailableError
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Route template of the request making the model call; set by the llm_route dependency
+current_route: ContextVar[str] = ContextVar("llm_route", default="unknown")
+
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+
+llm_latency = metrics.histogram(
+    "llm_request_duration_seconds", "Model call latency, retries included", LLM_BUCKETS
+)
+llm_ttft = metrics.histogram(
+    "llm_time_to_first_token_seconds", "Time until the first streamed chunk", LLM_BUCKETS
+)
+llm_calls = metrics.counter(
+    "llm_calls_total", "Model calls by outcome (ok, fallback, rejected, error)"
+)
+llm_fallbacks = metrics.counter(
+    "llm_fallbacks_total", "Canned fallback replies returned instead of model output, by reason"
+)
+llm_tokens = metrics.counter("llm_tokens_total", "Prompt and completion tokens by model")
+
+
+class LLMCall:
+    """Measurements for one logical model call, exported when it ends"""
+
+    def __init__(self, task: str):
+        self.task = task
+        self.route = current_route.get()
+        self.model = "none"
+        self.started = time.monotonic()
+        self.fallback_reason: Optional[str] = None
+        self._first_token_seen = False
+
+    def first_token(self) -> None:
+        if not self._first_token_seen:
+            self._first_token_seen = True
+            llm_ttft.observe(
+                time.monotonic() - self.started, route=self.route, model=self.model
+            )
+
+    def usage(self, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+        for kind, count in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+            if count:
+                llm_tokens.inc(count, route=self.route, model=self.model, kind=kind)
+
+    def genai_usage(self, usage_metadata: Any) -> None:
+        """Token counts from a google-genai response or final stream chunk"""
+        if usage_metadata is not None:
+            self.usage(
+                getattr(usage_metadata, "prompt_token_count", None),
+                getattr(usage_metadata, "candidates_token_count", None),
+            )
+
+    def fallback(self, reason: str) -> None:
+        """Mark that the canned fallback is being returned instead of model output"""
+        self.fallback_reason = reason
+
+    def _finish(self, outcome: str) -> None:
+        labels = {"route": self.route, "task": self.task, "model": self.model}
+        llm_latency.observe(time.monotonic() - self.started, outcome=outcome, **labels)
+        llm_calls.inc(outcome=outcome, **labels)
+        if self.fallback_reason is not None:
+            llm_fallbacks.inc(reason=self.fallback_reason, **labels)
+
+
+@contextmanager
+def instrument(task: str) -> Iterator[LLMCall]:
+    """Measure one model call; outcome is derived from fallbacks and exceptions"""
+    call = LLMCall(task)
+    try:
+        yield call
+    except ServiceUnavailableError:
+        call._finish("rejected")
+        raise
+    except BaseException:
+        # Includes a consumer closing a stream early
+        call._finish("error")
+        raise
+    call._finish("fallback" if call.fallback_reason is not None else "ok")
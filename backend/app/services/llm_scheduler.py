@@ -0,0 +1,159 @@
+"""
+LLM Scheduler
+Per-worker bulkheads around model calls, with round-robin fairness across users
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional
+
+from app.config import settings
+from app.utils.exceptions import ServiceUnavailableError
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+llm_inflight = metrics.gauge("llm_inflight", "Model calls running per pool")
+llm_queued = metrics.gauge("llm_queue_depth", "Model calls waiting for a slot per pool")
+llm_queue_wait = metrics.histogram("llm_queue_wait_seconds", "Time spent waiting for a slot")
+llm_rejected = metrics.counter(
+    "llm_rejected_total", "Model calls refused with 503 by pool and reason"
+)
+
+# Queue key for calls that aren't tied to a user
+ANONYMOUS = "anonymous"
+
+
+class FairScheduler:
+    """
+    Caps concurrent calls and hands free slots to waiting users in turn
+
+    Each user has their own FIFO queue; slots rotate across users, so one user's
+    burst of requests can't starve everyone else. A request that would wait longer
+    than `max_wait` is refused up front with ServiceUnavailableError.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_wait: float, max_queue: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._active = 0
+        self._waiting = 0
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        # Smoothed call duration, used to estimate queueing time
+        self._avg_duration = 1.0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def _estimated_wait(self) -> float:
+        return (self._waiting + 1) / self.max_concurrency * self._avg_duration
+
+    def _reject(self, reason: str, retry_after: float) -> ServiceUnavailableError:
+        llm_rejected.inc(pool=self.name, reason=reason)
+        return ServiceUnavailableError(
+            "The assistant is busy right now, please try again shortly",
+            retry_after=max(1, math.ceil(retry_after)),
+        )
+
+    def _update_gauges(self) -> None:
+        llm_inflight.set(self._active, pool=self.name)
+        llm_queued.set(self._waiting, pool=self.name)
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the next waiting user, round-robin"""
+        while self._active < self.max_concurrency and self._queues:
+            user_key, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            if queue:
+                self._queues.move_to_end(user_key)
+            else:
+                del self._queues[user_key]
+            self._waiting -= 1
+            if future.done():
+                # Caller timed out or was cancelled before its turn
+                continue
+            self._active += 1
+            future.set_result(None)
+        self._update_gauges()
+
+    def _forget(self, user_key: str, future: asyncio.Future) -> None:
+        queue = self._queues.get(user_key)
+        if queue is not None and future in queue:
+            queue.remove(future)
+            self._waiting -= 1
+            if not queue:
+                del self._queues[user_key]
+        self._update_gauges()
+
+    async def acquire(self, user_key: str) -> None:
+        if self._active < self.max_concurrency and not self._waiting:
+            self._active += 1
+            self._update_gauges()
+            llm_queue_wait.observe(0.0, pool=self.name)
+            return
+
+        estimate = self._estimated_wait()
+        if self._waiting >= self.max_queue or estimate > self.max_wait:
+            raise self._reject("queue_full", estimate)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(user_key, deque()).append(future)
+        self._waiting += 1
+        self._update_gauges()
+
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self._forget(user_key, future)
+            raise self._reject("timeout", self._avg_duration)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # A slot was handed over just as the caller went away
+                self.release()
+            else:
+                self._forget(user_key, future)
+            raise
+        llm_queue_wait.observe(time.monotonic() - started, pool=self.name)
+
+    def release(self, duration: Optional[float] = None) -> None:
+        self._active -= 1
+        if duration is not None:
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, user_id=None) -> AsyncIterator[None]:
+        """Hold one slot for the duration of a model call"""
+        await self.acquire(str(user_id) if user_id is not None else ANONYMOUS)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+
+# Separate pools so a burst of itinerary generations can't starve chat
+chat_scheduler = FairScheduler(
+    "chat",
+    max_concurrency=settings.LLM_CHAT_CONCURRENCY,
+    max_wait=settings.LLM_CHAT_QUEUE_TIMEOUT,
+    max_queue=settings.LLM_MAX_QUEUE,
+)
+itinerary_scheduler = FairScheduler(
+    "itinerary",
+    max_concurrency=settings.LLM_ITINERARY_CONCURRENCY,
+    max_wait=settings.LLM_ITINERARY_QUEUE_TIMEOUT,
+    max_queue=settings.LLM_MAX_QUEUE,
+)
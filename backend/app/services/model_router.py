@@ -0,0 +1,131 @@
+"""
+Model Router
+Picks a Gemini model per task and shifts traffic away from slow or failing models
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from app.config import settings
+from app.utils.metrics import metrics
+from app.utils.resilience import is_transient_error
+
+logger = logging.getLogger(__name__)
+
+TASK_CHAT = "chat"
+TASK_ITINERARY = "itinerary"
+TASK_SUMMARIZATION = "summarization"
+
+model_selected = metrics.counter("llm_model_selected_total", "Model picks by task and model")
+model_latency = metrics.gauge("llm_model_latency_seconds", "Smoothed call latency per model")
+model_error_rate = metrics.gauge("llm_model_error_rate", "Smoothed transient error rate per model")
+
+
+@dataclass
+class ModelStats:
+    """Exponentially weighted latency and error rate of one model"""
+
+    latency: Optional[float] = None
+    error_rate: float = 0.0
+    updated: float = field(default_factory=time.monotonic)
+    latency_updated: float = field(default_factory=time.monotonic)
+
+    def current_error_rate(self) -> float:
+        """Error rate decayed since the last call, so a sidelined model gets retried"""
+        elapsed = time.monotonic() - self.updated
+        return self.error_rate * 0.5 ** (elapsed / settings.LLM_ROUTER_RECOVERY_HALF_LIFE)
+
+    def current_latency(self) -> Optional[float]:
+        """
+        Latency, or None once it's older than LLM_ROUTER_LATENCY_MAX_AGE
+
+        A model sidelined for being slow gets no calls to update its latency; letting
+        it expire sends the next call its way to measure it again.
+        """
+        if time.monotonic() - self.latency_updated > settings.LLM_ROUTER_LATENCY_MAX_AGE:
+            return None
+        return self.latency
+
+
+class ModelRouter:
+    def __init__(self):
+        self._stats: Dict[str, ModelStats] = {}
+
+    @staticmethod
+    def candidates(task: str) -> List[str]:
+        """Configured models for a task, preferred first"""
+        configured = {
+            TASK_CHAT: settings.LLM_CHAT_MODELS,
+            TASK_ITINERARY: settings.LLM_ITINERARY_MODELS,
+            TASK_SUMMARIZATION: settings.LLM_SUMMARIZATION_MODELS,
+        }.get(task, "")
+        models = [m.strip() for m in configured.split(",") if m.strip()]
+        return models or [settings.GEMINI_MODEL]
+
+    def stats(self, model: str) -> ModelStats:
+        return self._stats.setdefault(model, ModelStats())
+
+    def pick(self, task: str) -> str:
+        """
+        The preferred healthy model for a task
+
+        Models over LLM_ROUTER_MAX_ERROR_RATE are skipped. The preferred model is also
+        passed over when it is LLM_ROUTER_SLOW_FACTOR times slower than another
+        healthy candidate, until its latency is old enough to be measured again. If
+        every candidate is degraded, the preferred one is used.
+        """
+        models = self.candidates(task)
+        healthy = [
+            m
+            for m in models
+            if self.stats(m).current_error_rate() <= settings.LLM_ROUTER_MAX_ERROR_RATE
+        ]
+        choice = healthy[0] if healthy else models[0]
+
+        latencies = {m: self.stats(m).current_latency() for m in healthy}
+        timed = {m: latency for m, latency in latencies.items() if latency is not None}
+        if choice in timed:
+            fastest = min(timed, key=timed.__getitem__)
+            if timed[choice] > settings.LLM_ROUTER_SLOW_FACTOR * timed[fastest]:
+                choice = fastest
+
+        model_selected.inc(task=task, model=choice)
+        return choice
+
+    def record(self, model: str, latency: Optional[float] = None, error: bool = False) -> None:
+        alpha = settings.LLM_ROUTER_EWMA_ALPHA
+        stats = self.stats(model)
+        stats.error_rate = (1 - alpha) * stats.current_error_rate() + alpha * float(error)
+        stats.updated = time.monotonic()
+        if latency is not None:
+            previous = stats.current_latency()
+            # An expired latency is replaced, so one fast call brings a recovered model back
+            stats.latency = (
+                latency if previous is None else (1 - alpha) * previous + alpha * latency
+            )
+            stats.latency_updated = stats.updated
+            model_latency.set(stats.latency, model=model)
+        model_error_rate.set(stats.error_rate, model=model)
+
+    @contextmanager
+    def observe(self, model: str, track_latency: bool = True) -> Iterator[None]:
+        """
+        Record the outcome of one call to `model`
+
+        Transient errors count against the model. Other errors (bad requests,
+        unparseable output) and cancellations (e.g. a losing hedge) are not recorded.
+        """
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            if is_transient_error(e):
+                self.record(model, error=True)
+            raise
+        self.record(model, latency=time.monotonic() - started if track_latency else None)
+
+
+model_router = ModelRouter()
@@ -0,0 +1,105 @@
+"""
+Pexels Quota Tracking
+Rate-limit headers from normal Pexels responses, shared across workers through Redis
+"""
+
+import logging
+import time
+from typing import Dict, Mapping, Optional
+
+from redis.exceptions import RedisError
+
+from app.services.redis_service import RedisService, redis_service
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ratelimit_remaining = metrics.gauge(
+    "pexels_ratelimit_remaining", "Pexels requests remaining in the current quota period"
+)
+
+
+class PexelsQuota:
+    """Last seen X-Ratelimit-* values"""
+
+    def __init__(self, redis: Optional[RedisService] = redis_service, key: str = "pexels:quota"):
+        self.redis = redis
+        self.key = key
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset: Optional[int] = None  # UNIX timestamp when the quota resets
+        self.updated_at = 0.0
+
+    async def update(self, headers: Mapping[str, str]) -> None:
+        """Record the rate-limit headers of a Pexels response, if present"""
+        if "X-Ratelimit-Remaining" not in headers:
+            return
+
+        try:
+            self.limit = int(headers.get("X-Ratelimit-Limit", 0))
+            self.remaining = int(headers["X-Ratelimit-Remaining"])
+            self.reset = int(headers.get("X-Ratelimit-Reset", 0))
+        except ValueError:
+            logger.warning("Malformed Pexels rate-limit headers")
+            return
+        self.updated_at = time.time()
+        ratelimit_remaining.set(self.remaining)
+        logger.debug(f"Pexels API requests remaining: {self.remaining}")
+
+        client = self.redis.client if self.redis else None
+        if client is None:
+            return
+        try:
+            await client.hset(self.key, mapping=self._as_dict())
+            if self.reset:
+                await client.expireat(self.key, self.reset)
+        except (RedisError, OSError) as e:
+            self.redis.report_failure(e)  # type: ignore[union-attr]
+
+    def _as_dict(self) -> Dict[str, float]:
+        return {
+            "limit": self.limit or 0,
+            "remaining": self.remaining or 0,
+            "reset": self.reset or 0,
+            "updated_at": self.updated_at,
+        }
+
+    async def refresh(self) -> None:
+        """Adopt the values another worker saw, if they are newer than ours"""
+        client = self.redis.client if self.redis else None
+        if client is None:
+            return
+        try:
+            shared = await client.hgetall(self.key)
+        except (RedisError, OSError) as e:
+            self.redis.report_failure(e)  # type: ignore[union-attr]
+            return
+
+        if shared and float(shared.get("updated_at", 0)) > self.updated_at:
+            self.limit = int(shared["limit"])
+            self.remaining = int(shared["remaining"])
+            self.reset = int(shared["reset"])
+            self.updated_at = float(shared["updated_at"])
+
+    def is_low(self, reserve: int) -> bool:
+        """Whether the quota is down to the reserve kept for interactive traffic"""
+        if self.remaining is None:
+            return False
+        if self.reset and time.time() >= self.reset:
+            return False
+        return self.remaining <= reserve
+
+    def seconds_until_reset(self) -> Optional[float]:
+        if not self.reset:
+            return None
+        return max(0.0, self.reset - time.time())
+
+    def status(self) -> Optional[Dict[str, int]]:
+        """limit / remaining / reset, or None if no response has been seen yet"""
+        if self.remaining is None:
+            return None
+        return {
+            "limit": self.limit or 0,
+            "remaining": self.remaining,
+            "reset": self.reset or 0,
+        }
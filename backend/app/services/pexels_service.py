@@ -3,22 +3,156 @@ Pexels API Service
 Handles interaction with Pexels API for fetching destination images
 """
 
+import asyncio
 import httpx
 import logging
-from typing import Optional, Dict, Any
+import zlib
+from typing import Optional, Dict, Any, List, Tuple
 from app.config import settings
+from app.services.image_cache import MISS, DestinationImageCache, destination_image_cache
+from app.services.pexels_quota import PexelsQuota
+from app.utils.resilience import CircuitBreaker, TokenBucket
+from app.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
+class PexelsUnavailableError(Exception):
+    """Raised instead of calling Pexels when the breaker is open or the local quota is spent"""
+
+
 class PexelsService:
     """Service for interacting with Pexels API"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[DestinationImageCache] = destination_image_cache,
+    ):
         self.api_key = settings.PEXELS_API_KEY
         self.base_url = settings.PEXELS_BASE_URL
         self.per_page = settings.PEXELS_PHOTOS_PER_PAGE
         self.headers = {"Authorization": self.api_key}
+        self._client = client
+        self.cache = cache
+        self._inflight = SingleFlight("pexels_destination_image")
+
+        # Quota awareness: pace calls locally and stop calling when Pexels is unhealthy
+        self.quota = PexelsQuota()
+        self.bucket = TokenBucket(
+            rate=settings.PEXELS_REQUESTS_PER_HOUR / 3600, capacity=settings.PEXELS_BURST
+        )
+        self.breaker = CircuitBreaker(
+            "pexels",
+            failure_threshold=settings.PEXELS_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.PEXELS_BREAKER_RECOVERY,
+        )
+        self._curated_pool: List[Dict[str, Any]] = []
+        self._curated_task: Optional[asyncio.Task] = None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create the pooled client shared by every call to the Pexels API"""
+        if settings.PEXELS_PROVIDER == "fake":
+            from app.services.fake_providers import fake_pexels_transport
+
+            return httpx.AsyncClient(
+                headers=self.headers,
+                transport=fake_pexels_transport(),
+                timeout=settings.PEXELS_TIMEOUT,
+            )
+        return httpx.AsyncClient(
+            headers=self.headers,
+            http2=settings.PEXELS_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.PEXELS_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PEXELS_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.PEXELS_KEEPALIVE_EXPIRY,
+            ),
+            timeout=settings.PEXELS_TIMEOUT,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created lazily if startup() was not called"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    async def startup(self) -> None:
+        """Open the pooled client (called from the app lifespan)"""
+        _ = self.client
+        logger.info(
+            f"Pexels client ready (http2={settings.PEXELS_HTTP2}, "
+            f"max_connections={settings.PEXELS_MAX_CONNECTIONS})"
+        )
+        if self.api_key or settings.PEXELS_PROVIDER == "fake":
+            # Don't hold up startup on Pexels; the pool is only needed once it fails
+            self._curated_task = asyncio.create_task(self.refresh_curated_pool())
+
+    async def aclose(self) -> None:
+        """Close the pooled client and release its connections"""
+        if self._curated_task is not None:
+            self._curated_task.cancel()
+            self._curated_task = None
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> httpx.Response:
+        """
+        Send a GET to the Pexels API through the breaker and token bucket
+
+        Rate-limit headers from every response are tracked, and the breaker opens on
+        repeated failures, on 429 responses and when the remaining quota runs low.
+
+        Raises:
+            PexelsUnavailableError: if the call was short-circuited locally
+            httpx.HTTPError: if the request itself failed
+        """
+        if self.breaker.state == CircuitBreaker.OPEN:
+            raise PexelsUnavailableError(
+                f"circuit open, retry in {self.breaker.retry_after():.0f}s"
+            )
+        if not await self.bucket.acquire(timeout=settings.PEXELS_MAX_QUEUE_WAIT):
+            raise PexelsUnavailableError("local request budget exhausted")
+        # Only after the token wait, so a half-open probe is taken just when a request goes out
+        if not self.breaker.allow():
+            raise PexelsUnavailableError(
+                f"circuit open, retry in {self.breaker.retry_after():.0f}s"
+            )
+
+        try:
+            response = await self.client.get(f"{self.base_url}{path}", params=params)
+            await self.quota.update(response.headers)
+        except httpx.HTTPError:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled or failed locally: says nothing about Pexels, but free the probe
+            self.breaker.release_probe()
+            raise
+
+        until_reset = self.quota.seconds_until_reset()
+
+        if response.status_code == 429:
+            self.breaker.trip(self._open_duration(until_reset))
+        elif response.status_code >= 500:
+            self.breaker.record_failure()
+        elif self.quota.is_low(settings.PEXELS_QUOTA_RESERVE):
+            logger.warning(f"Pexels quota low ({self.quota.remaining} left), pausing calls")
+            self.breaker.trip(self._open_duration(until_reset))
+        else:
+            self.breaker.record_success()
+        return response
+
+    @staticmethod
+    def _open_duration(until_reset: Optional[float]) -> float:
+        """Keep the breaker open until the quota resets, within sane bounds"""
+        if until_reset is None:
+            return settings.PEXELS_BREAKER_RECOVERY
+        return min(
+            max(until_reset, settings.PEXELS_BREAKER_RECOVERY), settings.PEXELS_BREAKER_MAX_OPEN
+        )
 
     async def search_photos(
         self, query: str, orientation: Optional[str] = "landscape", per_page: Optional[int] = None
@@ -41,29 +175,22 @@ class PexelsService:
         per_page = per_page or self.per_page
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/search",
-                    headers=self.headers,
-                    params={"query": query, "per_page": per_page, "orientation": orientation},
-                    timeout=10.0,  # 10 second timeout
-                )
+            response = await self._get(
+                "/search",
+                {"query": query, "per_page": per_page, "orientation": orientation},
+            )
 
-                # Check for rate limiting
-                if response.status_code == 429:
-                    logger.error("Pexels API rate limit exceeded")
-                    return None
+            # Check for rate limiting
+            if response.status_code == 429:
+                logger.error("Pexels API rate limit exceeded")
+                return None
 
-                response.raise_for_status()
-                data = response.json()
-
-                # Log rate limit info
-                if "X-Ratelimit-Remaining" in response.headers:
-                    remaining = response.headers.get("X-Ratelimit-Remaining")
-                    logger.info(f"Pexels API requests remaining: {remaining}")
-
-                return data
+            response.raise_for_status()
+            return response.json()
 
+        except PexelsUnavailableError as e:
+            logger.warning(f"Skipping Pexels search for '{query}': {e}")
+            return None
         except httpx.TimeoutException:
             logger.error(f"Timeout while searching Pexels for '{query}'")
             return None
@@ -88,28 +215,104 @@ class PexelsService:
             Dictionary with image_url, photographer, and photographer_url
             or None if no image found
         """
+        if self.cache is None:
+            image, _ = await self._fetch_destination_image(destination, fallback_query)
+            return image
+
+        key, cached = await self.cache.get(destination)
+        if cached is not MISS:
+            return cached
+
+        # Concurrent misses for the same destination share one upstream lookup
+        return await self._inflight.do(
+            key, lambda: self._load_destination_image(key, destination, fallback_query)
+        )
+
+    async def _load_destination_image(
+        self, key: str, destination: str, fallback_query: str
+    ) -> Optional[Dict[str, str]]:
+        """Fill the cache for one key, deferring to another worker already filling it"""
+        assert self.cache is not None
+
+        if settings.PEXELS_DISTRIBUTED_LOCK:
+            # Long enough to cover the destination search plus the fallback query
+            lock_ttl = settings.PEXELS_TIMEOUT * 2 + 1
+            async with self.cache.fill_lock(key, ttl=lock_ttl) as owner:
+                if not owner:
+                    cached = await self.cache.wait_for(key, timeout=lock_ttl)
+                    if cached is not MISS:
+                        return cached
+                return await self._fetch_and_cache(key, destination, fallback_query)
+
+        return await self._fetch_and_cache(key, destination, fallback_query)
+
+    async def _fetch_and_cache(
+        self, key: str, destination: str, fallback_query: str
+    ) -> Optional[Dict[str, str]]:
+        assert self.cache is not None
+        image, cacheable = await self._fetch_destination_image(destination, fallback_query)
+        if cacheable:
+            await self.cache.set(key, image)
+        return image
+
+    async def _fetch_destination_image(
+        self, destination: str, fallback_query: str
+    ) -> Tuple[Optional[Dict[str, str]], bool]:
+        """
+        Fetch a destination image from Pexels
+
+        Returns:
+            (image data or None, whether the result is safe to cache). Results are not
+            cached when the destination search itself failed, so transient errors and
+            generic fallback photos don't stick to a destination.
+        """
+        # While Pexels is unhealthy or out of quota, don't spend two failing calls
+        if self.breaker.state == CircuitBreaker.OPEN:
+            return self._curated_fallback(destination), False
+
         # Try with destination first
         data = await self.search_photos(destination, orientation="landscape")
+        cacheable = data is not None
 
         # If no results, try with fallback query
-        if not data or not data.get("photos"):
+        if (not data or not data.get("photos")) and self.breaker.state != CircuitBreaker.OPEN:
             logger.info(f"No photos found for '{destination}', trying fallback query")
             data = await self.search_photos(fallback_query, orientation="landscape")
+            cacheable = cacheable and data is not None
 
         # Extract first photo
         if data and data.get("photos") and len(data["photos"]) > 0:
-            photo = data["photos"][0]
+            return self._photo_to_image(data["photos"][0]), cacheable
 
-            return {
-                "image_url": photo["src"]["large"],  # Use 'large' size (650px height)
-                "photographer": photo["photographer"],
-                "photographer_url": photo["photographer_url"],
-                "pexels_url": photo["url"],  # Link to photo on Pexels
-                "avg_color": photo.get("avg_color"),  # Useful for placeholder
-            }
+        if not cacheable:
+            return self._curated_fallback(destination), False
 
         logger.warning(f"No images found for destination '{destination}'")
-        return None
+        return None, cacheable
+
+    @staticmethod
+    def _photo_to_image(photo: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            "image_url": photo["src"]["large"],  # Use 'large' size (650px height)
+            "photographer": photo["photographer"],
+            "photographer_url": photo["photographer_url"],
+            "pexels_url": photo["url"],  # Link to photo on Pexels
+            "avg_color": photo.get("avg_color"),  # Useful for placeholder
+        }
+
+    async def refresh_curated_pool(self) -> None:
+        """Load the curated photos served while Pexels is unavailable"""
+        data = await self.get_curated_photos(per_page=settings.PEXELS_CURATED_POOL_SIZE)
+        if data and data.get("photos"):
+            self._curated_pool = data["photos"]
+            logger.info(f"Loaded {len(self._curated_pool)} curated fallback photos")
+
+    def _curated_fallback(self, destination: str) -> Optional[Dict[str, str]]:
+        """Pick a curated photo, stable per destination, or None if none are loaded"""
+        if not self._curated_pool:
+            return None
+        index = zlib.crc32(destination.encode()) % len(self._curated_pool)
+        return self._photo_to_image(self._curated_pool[index])
 
     async def get_curated_photos(self, per_page: int = 15) -> Optional[Dict[str, Any]]:
         """
@@ -122,34 +325,34 @@ class PexelsService:
             Dictionary with curated photos data
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/curated",
-                    headers=self.headers,
-                    params={"per_page": per_page},
-                    timeout=10.0,
-                )
+            response = await self._get("/curated", {"per_page": per_page})
 
-                response.raise_for_status()
-                return response.json()
+            response.raise_for_status()
+            return response.json()
 
         except Exception as e:
             logger.error(f"Error fetching curated photos: {e}")
             return None
 
     async def get_rate_limit_status(self) -> Optional[Dict[str, int]]:
-        """Get current rate limit status"""
+        """
+        Get current rate limit status
+
+        Served from the headers of earlier responses (from any worker, via Redis). A real
+        request is only spent if no response has been seen yet.
+        """
+        await self.quota.refresh()
+        status = self.quota.status()
+        if status is not None:
+            return status
+
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/curated", headers=self.headers, params={"per_page": 1}
-                )
-
-                return {
-                    "limit": int(response.headers.get("X-Ratelimit-Limit", 0)),
-                    "remaining": int(response.headers.get("X-Ratelimit-Remaining", 0)),
-                    "reset": int(response.headers.get("X-Ratelimit-Reset", 0)),
-                }
+            await self._get("/curated", {"per_page": 1})
         except Exception as e:
             logger.error(f"Error checking rate limit: {e}")
             return None
+        return self.quota.status()
+
+
+# Process-wide instance; its pooled client is opened and closed by the app lifespan
+pexels_service = PexelsService()
@@ -0,0 +1,52 @@
+"""
+Redis Service
+Lazily connected shared Redis client; callers degrade gracefully when Redis is down
+"""
+
+import logging
+import time
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisService:
+    """Holds the process-wide async Redis client"""
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = settings.REDIS_URL if url is None else url
+        self._client: Optional[Redis] = None
+        self._retry_at = 0.0
+
+    @property
+    def client(self) -> Optional[Redis]:
+        """Redis client, or None if Redis is disabled or recently failed"""
+        if not self.url or time.monotonic() < self._retry_at:
+            return None
+        if self._client is None:
+            self._client = Redis.from_url(
+                self.url,
+                decode_responses=True,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            )
+        return self._client
+
+    def report_failure(self, error: Exception) -> None:
+        """Skip Redis for a while so a dead server doesn't add latency to every call"""
+        logger.warning(
+            f"Redis unavailable, retrying in {settings.REDIS_RETRY_BACKOFF:.0f}s: {error}"
+        )
+        self._retry_at = time.monotonic() + settings.REDIS_RETRY_BACKOFF
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+redis_service = RedisService()
@@ -0,0 +1,71 @@
+"""
+Trip Image Service
+Enriches trips with Pexels destination images after the trip has been committed
+"""
+
+import logging
+from uuid import UUID
+
+from app.database import SessionLocal
+from app.models.trip import Trip
+from app.services.connection_manager import connection_manager
+from app.services.pexels_service import pexels_service
+
+logger = logging.getLogger(__name__)
+
+# Values of Trip.image_status
+IMAGE_STATUS_NONE = "none"  # trip has no destination
+IMAGE_STATUS_PENDING = "pending"  # enrichment queued
+IMAGE_STATUS_READY = "ready"  # image fields are set
+IMAGE_STATUS_UNAVAILABLE = "unavailable"  # no image could be found
+
+
+async def enrich_trip_image(trip_id: UUID, destination: str, user_id=None) -> None:
+    """
+    Fetch the destination image and store it on the trip
+
+    Runs as a background task after the response has been sent, so it uses its own
+    database session. If the trip was deleted or its destination changed in the
+    meantime, the result is discarded. When user_id is given, the user's devices get
+    a trip.updated event once the image status is final.
+    """
+    try:
+        image_data = await pexels_service.get_destination_image(destination)
+    except Exception as e:
+        logger.error(f"Error fetching Pexels image for trip {trip_id}: {e}")
+        image_data = None
+
+    db = SessionLocal()
+    try:
+        trip = db.query(Trip).filter(Trip.id == trip_id).first()
+        if not trip or trip.destination != destination:
+            logger.info(f"Skipping stale image enrichment for trip {trip_id}")
+            return
+
+        if image_data:
+            trip.image_url = image_data["image_url"]  # type: ignore
+            trip.photographer = image_data["photographer"]  # type: ignore
+            trip.photographer_url = image_data["photographer_url"]  # type: ignore
+            trip.image_status = IMAGE_STATUS_READY  # type: ignore
+            logger.info(f"Fetched image for destination: {destination}")
+        else:
+            trip.image_url = None  # type: ignore
+            trip.photographer = None  # type: ignore
+            trip.photographer_url = None  # type: ignore
+            trip.image_status = IMAGE_STATUS_UNAVAILABLE  # type: ignore
+            logger.warning(f"No image found for destination: {destination}")
+
+        image_status = trip.image_status
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error saving image for trip {trip_id}: {e}")
+        return
+    finally:
+        db.close()
+
+    if user_id is not None:
+        await connection_manager.publish(
+            user_id,
+            {"type": "trip.updated", "trip_id": str(trip_id), "image_status": image_status},
+        )
@@ -0,0 +1,246 @@
+"""
+Trip Itinerary Workflow
+Generates an itinerary for a trip from its planning chat and saves it as days and activities
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.chat_message import ChatMessage
+from app.models.chat_session import ChatSession
+from app.models.trip import Activity, Day, Trip
+from app.models.user import User
+from app.services.connection_manager import connection_manager
+from app.services.itinerary_service import itinerary_service
+from app.services.trip_preferences import format_preferences, preferences_from_messages
+from app.utils.exceptions import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+# Receives a stage name and extra details, e.g. to push progress over a WebSocket
+ProgressCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+# User messages read when backfilling preferences for a session that predates them
+BACKFILL_MESSAGES = 200
+
+
+def session_preferences(db: Session, user: User, chat_session_id: str) -> dict:
+    """
+    Preferences extracted from a chat session as its messages arrived
+
+    Sessions from before extraction existed are extracted once from their messages here.
+    """
+    session = (
+        db.query(ChatSession)
+        .filter(ChatSession.user_id == user.id, ChatSession.session_id == chat_session_id)
+        .first()
+    )
+    if session is None:
+        return {}
+    if session.preferences is not None:
+        return session.preferences  # type: ignore[return-value]
+
+    messages = (
+        db.query(ChatMessage.content)
+        .filter(
+            ChatMessage.user_id == user.id,
+            ChatMessage.session_id == chat_session_id,
+            ChatMessage.role == "user",
+        )
+        .order_by(ChatMessage.timestamp.asc())
+        .limit(BACKFILL_MESSAGES)
+        .all()
+    )
+    preferences = preferences_from_messages(content for (content,) in messages)
+    session.preferences = preferences  # type: ignore[assignment]
+    return preferences
+
+
+def _itinerary_request(db: Session, trip: Trip, user: User, chat_session_id: str) -> dict:
+    """Arguments for the itinerary service, from the trip, profile and planning chat"""
+    interests = (user.preferences or {}).get("interests", [])  # type: ignore
+    return dict(
+        destination=trip.destination or "Unknown",  # type: ignore
+        start_date=trip.start_date.isoformat() if trip.start_date else None,  # type: ignore
+        end_date=trip.end_date.isoformat() if trip.end_date else None,  # type: ignore
+        budget=float(trip.budget) if trip.budget else 1000.0,  # type: ignore
+        interests=interests,
+        chat_context=format_preferences(session_preferences(db, user, chat_session_id)),
+        user_id=user.id,
+    )
+
+
+async def generate_trip_itinerary(
+    trip_id: UUID,
+    user_id: UUID,
+    chat_session_id: str,
+    on_progress: Optional[ProgressCallback] = None,
+    expected_version: Optional[int] = None,
+    fallback_to_draft: bool = True,
+) -> Optional[int]:
+    """
+    Generate and save a trip itinerary
+
+    Reports the stages context, generating and saving through on_progress. No database
+    connection is held while the model works: the request is read in one short session
+    and the result saved in another. Returns the number of days saved, or None if
+    expected_version was given and the itinerary changed in the meantime (nothing saved).
+
+    Raises:
+        NotFoundError: if the user has no such trip
+        Exception: generation failures, when fallback_to_draft is off (see
+            ItineraryService.generate_itinerary)
+    """
+
+    async def report(stage: str, **details: Any) -> None:
+        if on_progress is not None:
+            await on_progress(stage, details)
+
+    # 1. Read the trip, profile interests and the preferences from the planning chat
+    await report("context")
+    db = SessionLocal()
+    try:
+        trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user_id).first()
+        user = db.query(User).filter(User.id == user_id).first()
+        if not trip or not user:
+            raise NotFoundError("Trip")
+        request = _itinerary_request(db, trip, user, chat_session_id)
+        db.commit()  # keeps preferences backfilled for an older session
+    finally:
+        db.close()
+
+    # 2. Generate structured itinerary using the service
+    await report("generating")
+    itinerary_data = await itinerary_service.generate_itinerary(
+        **request, fallback_to_draft=fallback_to_draft
+    )
+
+    # 3. Save generated itinerary to database, replacing any draft
+    await report("saving", days=len(itinerary_data["days"]))
+    db = SessionLocal()
+    try:
+        trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user_id).first()
+        if not trip:
+            raise NotFoundError("Trip")  # deleted while the model was working
+        if save_itinerary(db, trip, itinerary_data, expected_version) is None:
+            return None
+        return len(itinerary_data["days"])
+    finally:
+        db.close()
+
+
+def bump_itinerary_version(
+    db: Session, trip_id: UUID, expected: Optional[int] = None
+) -> Optional[int]:
+    """
+    Record a change to a trip's days or activities (the caller commits)
+
+    Returns the new version, or None if the trip is no longer at the expected version.
+    The row stays locked until commit, so concurrent changes are applied one at a time.
+    """
+    stmt = update(Trip).where(Trip.id == trip_id)
+    if expected is not None:
+        stmt = stmt.where(Trip.itinerary_version == expected)
+    stmt = stmt.values(itinerary_version=Trip.itinerary_version + 1).returning(
+        Trip.itinerary_version
+    )
+    return db.execute(stmt.execution_options(synchronize_session=False)).scalar()
+
+
+def save_itinerary(
+    db: Session, trip: Trip, itinerary_data: dict, expected_version: Optional[int] = None
+) -> Optional[int]:
+    """
+    Replace the trip's days and activities with a plan and commit
+
+    Returns the trip's new itinerary version. With expected_version, nothing is saved
+    (and None returned) if the itinerary was changed since that version was read.
+    """
+    version = bump_itinerary_version(db, trip.id, expected_version)  # type: ignore[arg-type]
+    if version is None:
+        db.rollback()
+        return None
+    db.query(Day).filter(Day.trip_id == trip.id).delete(synchronize_session=False)
+
+    current_date = trip.start_date or date.today()
+    for order, day_data in enumerate(itinerary_data["days"], start=1):
+        # Create Day object
+        day = Day(trip_id=trip.id, date=current_date, title=day_data["title"], order=order)
+        db.add(day)
+        db.flush()  # Ensures the Day object gets its UUID for the foreign key
+
+        # Add activities for the day
+        for activity_data in day_data["activities"]:
+            activity = Activity(
+                day_id=day.id,
+                title=activity_data["title"],
+                description=activity_data["description"],
+                time=activity_data.get("time"),
+                duration=activity_data.get("duration"),
+                cost=activity_data.get("cost"),
+                category=activity_data.get("category"),
+                location=activity_data.get("location"),
+            )
+            db.add(activity)
+
+        # Move to next day (important for multi-day trips)
+        current_date += timedelta(days=1)
+
+    db.commit()
+    return version
+
+
+def save_draft_itinerary(db: Session, trip: Trip, user: User) -> int:
+    """Save the instant catalog draft for a trip; returns its itinerary version"""
+    interests = (user.preferences or {}).get("interests", [])  # type: ignore
+    draft = itinerary_service.draft(
+        trip.destination or "Unknown",  # type: ignore
+        trip.start_date.isoformat() if trip.start_date else None,  # type: ignore
+        trip.end_date.isoformat() if trip.end_date else None,  # type: ignore
+        float(trip.budget) if trip.budget else None,  # type: ignore
+        interests,
+    )
+    return save_itinerary(db, trip, draft)  # type: ignore[return-value]
+
+
+async def refine_trip_itinerary(
+    trip_id: UUID, user_id: UUID, chat_session_id: str, draft_version: int
+) -> None:
+    """
+    Replace a trip's draft with the generated itinerary
+
+    Runs as a background task after the response has been sent. The user's devices get
+    trip.itinerary_ready once it is saved, or trip.itinerary_failed if the model could
+    not produce one (the draft stays). A draft edited since draft_version is kept as is.
+    """
+    try:
+        days = await generate_trip_itinerary(
+            trip_id,
+            user_id,
+            chat_session_id,
+            expected_version=draft_version,
+            fallback_to_draft=False,
+        )
+    except NotFoundError:
+        logger.info(f"Skipping itinerary refinement for missing trip {trip_id}")
+        return
+    except Exception as e:
+        logger.error(f"Itinerary refinement failed for trip {trip_id}: {e}")
+        await connection_manager.publish(
+            user_id, {"type": "trip.itinerary_failed", "trip_id": str(trip_id)}
+        )
+        return
+    if days is None:
+        logger.info(f"Keeping the edited draft itinerary of trip {trip_id}")
+        return
+
+    await connection_manager.publish(
+        user_id, {"type": "trip.itinerary_ready", "trip_id": str(trip_id)}
+    )
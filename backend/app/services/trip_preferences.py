@@ -0,0 +1,179 @@
+"""
+Trip Preferences
+Incremental extraction of structured travel preferences from planning chat messages
+"""
+
+import re
+from typing import Iterable, List, Optional
+
+# Caps keep the stored structure, and the itinerary prompt built from it, bounded
+MAX_MUST_SEE = 10
+MAX_PLACE_LENGTH = 60
+
+PACE_PATTERNS = [
+    # Checked in order: "not too busy" must win over "busy"
+    (
+        "relaxed",
+        r"\b(relax(ed|ing)?|slow[- ]?paced|slow|laid[- ]back|easy[- ]?going|leisurely|chill"
+        r"|not too (busy|rushed|packed|hectic))\b",
+    ),
+    ("packed", r"\b(packed|busy|fast[- ]paced|hectic|see as much as|action[- ]packed)\b"),
+    ("moderate", r"\b(moderate|balanced)\b"),
+]
+
+DIETARY_PATTERNS = {
+    "vegan": r"\bvegan\b",
+    "vegetarian": r"\bvegetarian\b|\bveggie\b",
+    "pescatarian": r"\bpescatarian\b",
+    "gluten-free": r"\bgluten[- ]free\b|\bcoeliac\b|\bceliac\b",
+    "dairy-free": r"\bdairy[- ]free\b|\blactose\b",
+    "halal": r"\bhalal\b",
+    "kosher": r"\bkosher\b",
+    "nut allergy": r"\b(nut|peanut) allerg",
+    "shellfish allergy": r"\bshellfish allerg",
+}
+
+MUST_SEE_PATTERN = re.compile(
+    r"\b(?:must[- ]see|must visit|want to (?:see|visit)|have to (?:see|visit)"
+    r"|definitely (?:see|visit)|can'?t miss|don'?t want to miss|bucket list(?: is)?)"
+    r"\s*:?\s+(?:the\s+)?([^.!?;\n]+)",
+    re.IGNORECASE,
+)
+PLACE_SEPARATOR = re.compile(r",|\band\b|&", re.IGNORECASE)
+# Where a place name ends and the rest of the sentence starts
+PLACE_END = re.compile(r"\s+(?:while|when|if|because|but|since|on day|during|so)\b.*", re.I)
+LEADING_ARTICLE = re.compile(r"^(?:the|a|an)\s+", re.IGNORECASE)
+
+BUDGET_CONTEXT = re.compile(r"\b(budget|spend|spending|afford|total|max(imum)?)\b", re.I)
+AMOUNT_PATTERNS = [
+    re.compile(r"([$€£])\s?(\d[\d,]*(?:\.\d+)?)\s?(k)?\b", re.IGNORECASE),
+    re.compile(
+        r"\b(\d[\d,]*(?:\.\d+)?)\s?(k)?\s?(usd|eur|gbp|dollars|euros|pounds)\b", re.IGNORECASE
+    ),
+]
+CURRENCIES = {
+    "$": "USD",
+    "€": "EUR",
+    "£": "GBP",
+    "usd": "USD",
+    "dollars": "USD",
+    "eur": "EUR",
+    "euros": "EUR",
+    "gbp": "GBP",
+    "pounds": "GBP",
+}
+BUDGET_LEVELS = [
+    (
+        "budget",
+        r"\b(cheap|budget[- ]friendly|on a (tight )?budget|shoestring|backpack\w*|affordable)\b",
+    ),
+    ("luxury", r"\b(luxury|luxurious|splurge|high[- ]end|five[- ]star|5[- ]star)\b"),
+]
+
+
+def _amount(text: str) -> Optional[dict]:
+    if not BUDGET_CONTEXT.search(text):
+        return None
+    for pattern in AMOUNT_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        if pattern is AMOUNT_PATTERNS[0]:
+            symbol, number, thousands = match.groups()
+        else:
+            number, thousands, symbol = match.groups()
+        amount = float(number.replace(",", "")) * (1000 if thousands else 1)
+        return {"amount": amount, "currency": CURRENCIES[symbol.lower()]}
+    return None
+
+
+def _places(text: str) -> List[str]:
+    places = []
+    for match in MUST_SEE_PATTERN.finditer(text):
+        for place in PLACE_SEPARATOR.split(PLACE_END.sub("", match.group(1))):
+            place = LEADING_ARTICLE.sub("", place.strip(" '\""))
+            if place:
+                places.append(place[:MAX_PLACE_LENGTH])
+    return places
+
+
+def extract_preferences(text: str) -> dict:
+    """Preferences stated in one message; keys are only present when mentioned"""
+    found: dict = {}
+    lowered = text.casefold()
+
+    for pace, pattern in PACE_PATTERNS:
+        if re.search(pattern, lowered):
+            found["pace"] = pace
+            break
+
+    dietary = [name for name, pattern in DIETARY_PATTERNS.items() if re.search(pattern, lowered)]
+    if dietary:
+        found["dietary"] = dietary
+
+    places = _places(text)
+    if places:
+        found["must_see"] = places
+
+    budget = _amount(text) or {}
+    for level, pattern in BUDGET_LEVELS:
+        if re.search(pattern, lowered):
+            budget["level"] = level
+            break
+    if budget:
+        found["budget"] = budget
+
+    return found
+
+
+def _union(existing: Iterable[str], new: Iterable[str], limit: int) -> List[str]:
+    merged: List[str] = []
+    seen = set()
+    for item in [*existing, *new]:
+        if item.casefold() not in seen:
+            seen.add(item.casefold())
+            merged.append(item)
+    # Keep the most recent mentions when over the cap
+    return merged[-limit:]
+
+
+def merge_preferences(current: Optional[dict], update: dict) -> dict:
+    """Fold a message's preferences into the session's; later statements win"""
+    merged = dict(current or {})
+    if "pace" in update:
+        merged["pace"] = update["pace"]
+    if "dietary" in update:
+        merged["dietary"] = _union(
+            merged.get("dietary", []), update["dietary"], len(DIETARY_PATTERNS)
+        )
+    if "must_see" in update:
+        merged["must_see"] = _union(merged.get("must_see", []), update["must_see"], MAX_MUST_SEE)
+    if "budget" in update:
+        merged["budget"] = {**merged.get("budget", {}), **update["budget"]}
+    return merged
+
+
+def preferences_from_messages(messages: Iterable[str]) -> dict:
+    preferences: dict = {}
+    for text in messages:
+        preferences = merge_preferences(preferences, extract_preferences(text))
+    return preferences
+
+
+def format_preferences(preferences: Optional[dict]) -> str:
+    """Compact prompt text for the itinerary model, e.g. "Pace: relaxed. Must see: Colosseum." """
+    if not preferences:
+        return ""
+    parts = []
+    if preferences.get("pace"):
+        parts.append(f"Pace: {preferences['pace']}")
+    if preferences.get("dietary"):
+        parts.append(f"Dietary needs: {', '.join(preferences['dietary'])}")
+    if preferences.get("must_see"):
+        parts.append(f"Must see: {', '.join(preferences['must_see'])}")
+    budget = preferences.get("budget") or {}
+    if budget.get("amount"):
+        parts.append(f"Budget mentioned: {budget['currency']} {budget['amount']:g}")
+    if budget.get("level"):
+        parts.append(f"Budget style: {budget['level']}")
+    return ". ".join(parts) + "." if parts else ""
@@ -43,3 +43,16 @@ class ValidationError(AppException):
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             details=details,
         )
+
+
+class ServiceUnavailableError(AppException):
+    """Temporary overload or outage (503); clients should retry after `retry_after` seconds"""
+
+    def __init__(self, message: str = "Service temporarily unavailable", retry_after: int = 5):
+        super().__init__(
+            code="SERVICE_UNAVAILABLE",
+            message=message,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            details={"retry_after": retry_after},
+        )
+        self.retry_after = retry_after
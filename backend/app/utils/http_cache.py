@@ -0,0 +1,73 @@
+"""
+HTTP Response Caching
+Serialized responses cached per data version, served with ETag and Cache-Control
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+from cachetools import TTLCache
+from fastapi import Request, Response
+
+from app.utils.metrics import metrics
+
+cache_requests = metrics.counter(
+    "http_response_cache_requests_total", "Cached public responses by cache and result"
+)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check; weak validators compare equal to strong ones (RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+class VersionedResponseCache:
+    """
+    Response bodies keyed by request parameters, valid for one data version
+
+    A new version empties the cache, so a bump takes effect on the next request.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._version: Optional[int] = None
+
+    def get(self, version: Optional[int], key: Hashable) -> Optional[CachedResponse]:
+        if version != self._version:
+            self._cache.clear()
+            self._version = version
+        cached = self._cache.get(key)
+        cache_requests.inc(cache=self.name, result="hit" if cached else "miss")
+        return cached
+
+    def put(self, version: Optional[int], key: Hashable, body: bytes) -> CachedResponse:
+        cached = CachedResponse(body, make_etag(body))
+        # Don't store data read under an older version than the one now being served
+        if version == self._version:
+            self._cache[key] = cached
+        return cached
+
+
+def cacheable_response(request: Request, cached: CachedResponse, max_age: int) -> Response:
+    """JSON response with validators, or 304 if the client already has this body"""
+    headers = {"ETag": cached.etag, "Cache-Control": f"public, max-age={max_age}"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -0,0 +1,275 @@
+"""
+Resilience primitives for calls to external APIs
+Token bucket pacing, circuit breaking, deadlines, retries and hedging, with state
+exported as metrics
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+import httpx
+
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+breaker_state = metrics.gauge(
+    "circuit_breaker_state", "Circuit breaker state (0=closed, 1=half_open, 2=open)"
+)
+breaker_transitions = metrics.counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes by target state"
+)
+retries = metrics.counter("retries_total", "Retried upstream calls by caller")
+hedges = metrics.counter(
+    "hedged_requests_total", "Hedged second requests sent, and how many of them won"
+)
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Paces calls to `rate` per second with bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, timeout: float = 0.0) -> bool:
+        """
+        Take one token, waiting up to `timeout` seconds for it
+
+        Returns False without waiting if the token would not be available in time.
+        Waiters are served in arrival order: each one reserves its token up front (the
+        balance may go negative) and then sleeps until it is due, so one waiter never
+        delays the decision of the next.
+        """
+        # No await before the reservation, so concurrent callers can't interleave here
+        self._refill()
+        wait = 0.0
+        if self.tokens < 1:
+            wait = (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+            if wait > timeout:
+                return False
+        self.tokens -= 1
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                self.tokens += 1  # cancelled while waiting: give the reservation back
+                raise
+        return True
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker
+
+    Opens after `failure_threshold` consecutive failures (or when tripped explicitly),
+    lets a single probe through after `recovery_timeout`, and closes again when the
+    probe succeeds.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self._state = self.CLOSED
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        breaker_state.set(0, name=name)
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        logger.warning(f"Circuit breaker '{self.name}': {self._state} -> {state}")
+        self._state = state
+        breaker_state.set(self._STATE_VALUES[state], name=self.name)
+        breaker_transitions.inc(name=self.name, state=state)
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() >= self._open_until:
+            self._probe_in_flight = False
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe that ended without an outcome (e.g. cancelled)"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probe_in_flight = False
+        self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self, duration: Optional[float] = None) -> None:
+        """Open the breaker for `duration` seconds (default: recovery_timeout)"""
+        self._open_until = time.monotonic() + (
+            self.recovery_timeout if duration is None else duration
+        )
+        self._probe_in_flight = False
+        self._transition(self.OPEN)
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a probe through"""
+        return max(0.0, self._open_until - time.monotonic()) if self.state == self.OPEN else 0.0
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while a breaker is open"""
+
+
+# HTTP statuses worth retrying: timeouts, throttling and server-side failures
+TRANSIENT_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def is_transient_error(e: BaseException) -> bool:
+    """Timeouts, connection failures and retryable HTTP statuses from any client library"""
+    if isinstance(e, (asyncio.TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    code = getattr(e, "code", None) or getattr(e, "status_code", None)
+    try:
+        return int(code) in TRANSIENT_STATUS_CODES  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return False
+
+
+class Deadline:
+    """Time budget shared by every attempt of one logical call"""
+
+    def __init__(self, budget: float):
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-quantile (0..1) of the window, or None until enough samples exist"""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry"""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+async def retry_async(
+    name: str,
+    fn: Callable[[], Awaitable[T]],
+    deadline: Deadline,
+    attempts: int,
+    attempt_timeout: float,
+    base_delay: float = 0.5,
+    max_delay: float = 4.0,
+    is_retryable: Callable[[BaseException], bool] = is_transient_error,
+) -> T:
+    """
+    Call `fn` until it succeeds, with jittered backoff between retryable failures
+
+    Each attempt gets at most `attempt_timeout` seconds and never outlives the
+    deadline; no retry is started if its backoff would run past the deadline.
+    """
+    for attempt in range(attempts):
+        timeout = min(attempt_timeout, deadline.remaining())
+        if timeout <= 0:
+            raise asyncio.TimeoutError(f"{name}: deadline exceeded")
+        try:
+            async with asyncio.timeout(timeout):
+                return await fn()
+        except Exception as e:
+            if attempt == attempts - 1 or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            if delay >= deadline.remaining():
+                raise
+            logger.info(f"{name}: retrying in {delay:.2f}s after {type(e).__name__}: {e}")
+            retries.inc(name=name)
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def hedged(name: str, fn: Callable[[], Awaitable[T]], delay: Optional[float]) -> T:
+    """
+    Call `fn`; if it hasn't finished after `delay` seconds, start a second copy
+
+    The first copy to succeed wins and the other is cancelled. With no delay
+    (e.g. not enough latency samples yet) this is a plain call.
+    """
+    if delay is None:
+        return await fn()
+
+    first = asyncio.ensure_future(fn())
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return first.result()
+
+        hedges.inc(name=name, outcome="sent")
+        tasks.append(asyncio.ensure_future(fn()))
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        hedges.inc(name=name, outcome="won")
+                    return task.result()
+                error = task.exception()
+        raise error  # type: ignore[misc]
+    finally:
+        for task in tasks:
+            task.cancel()
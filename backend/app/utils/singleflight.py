@@ -0,0 +1,49 @@
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key share one in-flight coroutine
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from app.utils.metrics import metrics
+
+T = TypeVar("T")
+
+coalesced_calls = metrics.counter(
+    "singleflight_coalesced_total", "Calls that joined an in-flight call instead of starting one"
+)
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls per key within one worker"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() for key, or wait for the call already running for key
+
+        The shared call runs in its own task, so a caller being cancelled (e.g. a client
+        disconnect) does not cancel the work the other callers are waiting on.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            coalesced_calls.inc(name=self.name)
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
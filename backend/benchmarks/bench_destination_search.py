@@ -0,0 +1,115 @@
+"""
+Benchmark: ILIKE destination search vs ranked full-text + trigram search
+
+Loads a synthetic catalog (100k rows by default) into the destinations table of
+DATABASE_URL inside a transaction, times both queries for a set of search terms, then
+rolls everything back. Requires migration 006 (search_vector column and GIN indexes).
+
+Run from the backend directory:
+    python benchmarks/bench_destination_search.py --rows 100000 --repeat 20
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.destination import Destination
+from app.services.destination_search import ranked_search
+
+TERMS = ["rome", "barcelna", "san", "coastal beaches", "norway", "mount"]
+
+SEED_SQL = text(
+    """
+    INSERT INTO destinations (id, name, country, description, budget, attractions, created_at)
+    SELECT
+        gen_random_uuid(),
+        initcap(
+            (ARRAY['san', 'port', 'new', 'lake', 'mount', 'bel', 'cor', 'ville'])[1 + i % 8]
+            || substr(md5(i::text), 1, 6)
+        ),
+        (ARRAY['Italy', 'Spain', 'Japan', 'Mexico', 'Kenya', 'Peru', 'Norway', 'Vietnam'])
+            [1 + (i / 8) % 8],
+        'A ' || (ARRAY['coastal', 'historic', 'mountain', 'vibrant', 'quiet', 'desert'])
+            [1 + i % 6]
+        || ' town known for its '
+        || (ARRAY['beaches', 'food', 'museums', 'nightlife', 'hiking', 'markets'])
+            [1 + (i / 6) % 6],
+        50 + i % 200,
+        '[]'::json,
+        now()
+    FROM generate_series(1, :rows) AS i
+    ON CONFLICT DO NOTHING
+    """
+)
+
+
+def legacy_search(db: Session, query: str, limit: int) -> List[Destination]:
+    """The previous implementation: unindexable ILIKE '%q%' over three columns"""
+    search_filter = f"%{query}%"
+    return (
+        db.query(Destination)
+        .filter(
+            (Destination.name.ilike(search_filter))
+            | (Destination.country.ilike(search_filter))
+            | (Destination.description.ilike(search_filter))
+        )
+        .limit(limit)
+        .all()
+    )
+
+
+def measure(fn: Callable[[], list], repeat: int) -> tuple[List[float], int]:
+    samples = []
+    found = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = len(fn())
+        samples.append(time.perf_counter() - start)
+    return samples, found
+
+
+def summarize(name: str, samples: List[float], found: int) -> None:
+    samples_ms = sorted(s * 1000 for s in samples)
+    p95 = samples_ms[max(int(len(samples_ms) * 0.95) - 1, 0)]
+    print(
+        f"  {name:<8} mean={statistics.mean(samples_ms):8.2f}ms "
+        f"p50={statistics.median(samples_ms):8.2f}ms p95={p95:8.2f}ms results={found}"
+    )
+
+
+def run(rows: int, repeat: int, limit: int) -> None:
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        db = Session(bind=conn)
+        try:
+            start = time.perf_counter()
+            conn.execute(SEED_SQL, {"rows": rows})
+            conn.execute(text("ANALYZE destinations"))
+            print(f"Seeded {rows} destinations in {time.perf_counter() - start:.1f}s")
+
+            for term in TERMS:
+                print(f"query={term!r}")
+                summarize("ilike", *measure(lambda: legacy_search(db, term, limit), repeat))
+                summarize("ranked", *measure(lambda: ranked_search(db, term, limit), repeat))
+        finally:
+            db.close()
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic destinations")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query and mode")
+    parser.add_argument("--limit", type=int, default=20, help="Results per search")
+    args = parser.parse_args()
+    run(args.rows, args.repeat, args.limit)
@@ -0,0 +1,73 @@
+"""
+Benchmark: per-request LLM setup vs the process-wide Gemini client and itinerary chain
+
+Measures only the setup work done before any network call:
+  - chat:      genai.Client construction (old) vs the shared gemini_service client
+  - itinerary: ChatGoogleGenerativeAI + with_structured_output + ChatPromptTemplate
+               parsing per call (old) vs the shared itinerary_service chain
+
+No API calls are made; a dummy key is used if GEMINI_API_KEY is unset.
+
+Run from the backend directory:
+    python benchmarks/bench_llm_setup.py --iterations 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-dummy-key")
+
+from google import genai
+
+from app.config import settings
+from app.services.gemini_service import gemini_service
+from app.services.itinerary_service import ItineraryService, itinerary_service
+
+
+def measure(fn: Callable[[], object], iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(name: str, samples: List[float]) -> None:
+    samples_ms = sorted(s * 1000 for s in samples)
+    p95 = samples_ms[int(len(samples_ms) * 0.95) - 1]
+    print(
+        f"{name:<24} mean={statistics.mean(samples_ms):8.3f}ms "
+        f"p50={statistics.median(samples_ms):8.3f}ms p95={p95:8.3f}ms"
+    )
+
+
+def run(iterations: int) -> None:
+    print(f"Per-request setup overhead over {iterations} iterations")
+
+    summarize(
+        "chat per-request",
+        measure(lambda: genai.Client(api_key=settings.GEMINI_API_KEY), iterations),
+    )
+    summarize("chat shared", measure(lambda: gemini_service.client, iterations))
+
+    summarize(
+        "itinerary per-request",
+        measure(lambda: ItineraryService()._build_chain(), iterations),
+    )
+    summarize("itinerary shared", measure(lambda: itinerary_service.chain, iterations))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=100, help="Setups per mode")
+    args = parser.parse_args()
+    run(args.iterations)
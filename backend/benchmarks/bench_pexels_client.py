@@ -0,0 +1,129 @@
+"""
+Benchmark: per-call httpx client vs the shared pooled PexelsService client
+
+Starts a local stub of the Pexels search endpoint and measures latency per call for:
+  - per-call: a new httpx.AsyncClient per request (the old PexelsService behaviour)
+  - pooled:   PexelsService with its shared keep-alive client
+
+Run from the backend directory:
+    python benchmarks/bench_pexels_client.py --calls 500
+
+Note: the stub is plain HTTP, so connections stay on HTTP/1.1 and the numbers only show
+the saved TCP handshakes. Against api.pexels.com the pooled client also skips the TLS
+handshake and multiplexes requests over HTTP/2, so real savings are larger.
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+import uvicorn
+
+from app.services.pexels_service import PexelsService
+
+STUB_PAYLOAD = json.dumps(
+    {
+        "photos": [
+            {
+                "url": "https://www.pexels.com/photo/1/",
+                "photographer": "Stub Photographer",
+                "photographer_url": "https://www.pexels.com/@stub",
+                "avg_color": "#7E8C8D",
+                "src": {"large": "https://images.pexels.com/photos/1/large.jpeg"},
+            }
+        ]
+    }
+).encode()
+
+
+async def stub_app(scope, receive, send):
+    """Minimal ASGI app answering every request like Pexels /search"""
+    if scope["type"] != "http":
+        return
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"x-ratelimit-remaining", b"19999"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": STUB_PAYLOAD})
+
+
+def start_stub_server() -> tuple[uvicorn.Server, str]:
+    """Run the stub server in a background thread and return its base URL"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(
+        uvicorn.Config(stub_app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}/v1"
+
+
+async def per_call_client(base_url: str, query: str) -> None:
+    """Old behaviour: open and close a client for every request"""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(
+            f"{base_url}/search", params={"query": query, "per_page": 1}, timeout=10.0
+        )
+        response.raise_for_status()
+
+
+def summarize(name: str, samples: list[float]) -> None:
+    samples_ms = sorted(s * 1000 for s in samples)
+    p95 = samples_ms[int(len(samples_ms) * 0.95) - 1]
+    print(
+        f"{name:<10} mean={statistics.mean(samples_ms):7.3f}ms "
+        f"p50={statistics.median(samples_ms):7.3f}ms p95={p95:7.3f}ms"
+    )
+
+
+async def run(calls: int) -> None:
+    server, base_url = start_stub_server()
+
+    per_call: list[float] = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await per_call_client(base_url, f"city {i}")
+        per_call.append(time.perf_counter() - start)
+
+    service = PexelsService()
+    service.base_url = base_url
+    await service.startup()
+    pooled: list[float] = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await service.search_photos(f"city {i}")
+        pooled.append(time.perf_counter() - start)
+    await service.aclose()
+
+    print(f"Latency per call over {calls} sequential calls to {base_url}")
+    summarize("per-call", per_call)
+    summarize("pooled", pooled)
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200, help="Number of calls per mode")
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
@@ -0,0 +1,400 @@
+"""
+Load test: replay mobile app sessions against the API and gate on latency baselines
+
+Each virtual user runs the session a phone makes when planning a trip:
+  login -> list trips -> create a trip -> open it and its itinerary -> chat about it
+  -> generate the itinerary -> reopen the itinerary -> add expenses -> check the summary
+
+The app runs in-process under uvicorn against the database in DATABASE_URL (use a local
+Postgres, never production). Gemini and Pexels are replaced by the fake providers
+(LLM_PROVIDER=fake, PEXELS_PROVIDER=fake), whose latency and error rates are set with the
+FAKE_* environment variables. Firebase is bypassed: requests carry an X-Loadtest-User
+header that maps to a throwaway user, and every user created by the run is deleted at
+the end (cascading to their trips, chats and expenses) unless --keep-data is given.
+
+Throughput and p50/p95/p99 latency are reported per endpoint template. With a baseline
+file present, the run fails (exit code 1) when p95 or p99 of an endpoint grows beyond
+the tolerance, throughput drops beyond it, or the error rate exceeds --max-error-rate.
+
+Run from the backend directory:
+    python loadtest/run_load_test.py --users 20 --sessions 5
+    python loadtest/run_load_test.py --users 20 --sessions 5 --update-baselines
+
+Baselines are only comparable on the same machine with the same options and FAKE_*
+settings; refresh them with --update-baselines after an intended performance change.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Must be set before the app reads its settings: a load test never calls the real APIs
+os.environ["LLM_PROVIDER"] = "fake"
+os.environ["PEXELS_PROVIDER"] = "fake"
+os.environ.setdefault("GEMINI_API_KEY", "loadtest-dummy-key")
+os.environ.setdefault("PEXELS_API_KEY", "loadtest-dummy-key")
+
+import httpx
+import uvicorn
+from fastapi import Depends, Header
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, get_db
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.middleware.rate_limit import rate_limiter
+from app.models.user import User
+
+DEFAULT_BASELINES = Path(__file__).parent / "baselines.json"
+USER_HEADER = "X-Loadtest-User"
+
+DESTINATIONS = ["Lisbon", "Kyoto", "Mexico City", "Cape Town", "Reykjavik", "Hanoi"]
+CHAT_PROMPTS = [
+    "What's the best time to visit {destination}?",
+    "What should I eat in {destination}?",
+    "I'd like a relaxed pace with a museum or two and good coffee in {destination}",
+    "Which neighbourhood should I stay in for {destination} on a mid-range budget?",
+    "Any day trips from {destination} you'd recommend?",
+]
+EXPENSE_CATEGORIES = ["food", "transport", "accommodation", "activities"]
+
+
+def loadtest_user(
+    x_loadtest_user: str = Header(...),
+    db: Session = Depends(get_db),
+) -> User:
+    """Stand-in for Firebase auth: get or create the user named by the header"""
+    user = db.query(User).filter(User.firebase_uid == x_loadtest_user).first()
+    if not user:
+        user = User(
+            firebase_uid=x_loadtest_user,
+            email=f"{x_loadtest_user}@loadtest.invalid",
+            display_name=x_loadtest_user,
+            preferences={"interests": ["food", "museums", "walking"]},
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    return user
+
+
+@dataclass
+class Results:
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    failed_sessions: int = 0
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(1, min(len(sorted_samples), round(q * len(sorted_samples))))
+    return sorted_samples[rank - 1]
+
+
+class VirtualUser:
+    """One phone running sessions back to back, with think time between screens"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        uid: str,
+        results: Results,
+        rng: random.Random,
+        think_time: float,
+    ):
+        self.client = client
+        self.headers = {USER_HEADER: uid}
+        self.results = results
+        self.rng = rng
+        self.think_time = think_time
+
+    async def request(
+        self, endpoint: str, method: str, url: str, json_body: Optional[dict] = None
+    ) -> httpx.Response:
+        """Time one call and record it under its endpoint template (e.g. /v1/trips/{trip_id})"""
+        if self.think_time:
+            await asyncio.sleep(self.rng.expovariate(1 / self.think_time))
+        start = time.perf_counter()
+        response = await self.client.request(method, url, json=json_body, headers=self.headers)
+        self.results.record(endpoint, time.perf_counter() - start, response.is_success)
+        response.raise_for_status()
+        return response
+
+    async def session(self) -> None:
+        destination = self.rng.choice(DESTINATIONS)
+        start_date = date.today() + timedelta(days=self.rng.randint(14, 120))
+        end_date = start_date + timedelta(days=self.rng.randint(2, 6))
+        budget = float(self.rng.randrange(800, 4000, 100))
+
+        await self.request("GET /v1/auth/me", "GET", "/v1/auth/me")
+        await self.request("GET /v1/trips/", "GET", "/v1/trips/")
+        trip = (
+            await self.request(
+                "POST /v1/trips/",
+                "POST",
+                "/v1/trips/",
+                {
+                    "title": f"{destination} getaway",
+                    "destination": destination,
+                    "start_date": start_date.isoformat(),
+                    "end_date": end_date.isoformat(),
+                    "budget": budget,
+                },
+            )
+        ).json()
+        trip_url = f"/v1/trips/{trip['id']}"
+        await self.request("GET /v1/trips/{trip_id}", "GET", trip_url)
+        await self.request("GET /v1/trips/{trip_id}/itinerary", "GET", f"{trip_url}/itinerary")
+
+        session_id = str(uuid.uuid4())
+        for prompt in self.rng.sample(CHAT_PROMPTS, 2):
+            await self.request(
+                "POST /v1/chat/",
+                "POST",
+                "/v1/chat/",
+                {"message": prompt.format(destination=destination), "session_id": session_id},
+            )
+
+        await self.request(
+            "POST /v1/trips/{trip_id}/itinerary",
+            "POST",
+            f"{trip_url}/itinerary",
+            {"chat_session_id": session_id},
+        )
+        await self.request("GET /v1/trips/{trip_id}/itinerary", "GET", f"{trip_url}/itinerary")
+
+        expenses_url = f"/v1/expenses/{trip['id']}/expenses"
+        for category in self.rng.sample(EXPENSE_CATEGORIES, 2):
+            await self.request(
+                "POST /v1/expenses/{trip_id}/expenses",
+                "POST",
+                expenses_url,
+                {
+                    "category": category,
+                    "amount": round(self.rng.uniform(5, 150), 2),
+                    "currency": "USD",
+                    "date": start_date.isoformat(),
+                    "description": f"Load test {category}",
+                },
+            )
+        await self.request(
+            "GET /v1/expenses/{trip_id}/expenses/summary", "GET", f"{expenses_url}/summary"
+        )
+
+    async def run(self, sessions: int) -> None:
+        for _ in range(sessions):
+            try:
+                await self.session()
+            except httpx.HTTPError:
+                # The failed call is already counted; start the next session from login
+                self.results.failed_sessions += 1
+
+
+def start_server(port: int) -> uvicorn.Server:
+    """Run the app in a background thread, lifespan included"""
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def delete_users(prefix: str) -> int:
+    """Remove the run's users; their trips, chats and expenses cascade"""
+    db = SessionLocal()
+    try:
+        deleted = (
+            db.query(User)
+            .filter(User.firebase_uid.like(f"{prefix}%"))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+
+def summarize(results: Results, elapsed: float) -> dict:
+    endpoints = {}
+    for endpoint, samples in sorted(results.latencies.items()):
+        samples_ms = sorted(s * 1000 for s in samples)
+        endpoints[endpoint] = {
+            "requests": len(samples_ms),
+            "errors": results.errors.get(endpoint, 0),
+            "rps": round(len(samples_ms) / elapsed, 2),
+            "p50_ms": round(percentile(samples_ms, 0.50), 2),
+            "p95_ms": round(percentile(samples_ms, 0.95), 2),
+            "p99_ms": round(percentile(samples_ms, 0.99), 2),
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "failed_sessions": results.failed_sessions,
+        "throughput_rps": round(total / elapsed, 2),
+        "endpoints": endpoints,
+    }
+
+
+def print_report(summary: dict) -> None:
+    print(
+        f"{summary['requests']} requests in {summary['elapsed_s']}s: "
+        f"{summary['throughput_rps']} req/s, {summary['errors']} errors, "
+        f"{summary['failed_sessions']} failed sessions"
+    )
+    print(f"{'endpoint':<46} {'reqs':>6} {'err':>4} {'req/s':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for endpoint, stats in summary["endpoints"].items():
+        print(
+            f"{endpoint:<46} {stats['requests']:>6} {stats['errors']:>4} {stats['rps']:>7.2f} "
+            f"{stats['p50_ms']:>7.1f}ms {stats['p95_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms"
+        )
+
+
+def check_baselines(
+    summary: dict, baselines: dict, tolerance: float, slack_ms: float, max_error_rate: float
+) -> List[str]:
+    """Regressions against the stored run; empty when the gate passes"""
+    failures = []
+    if summary["errors"] > max_error_rate * summary["requests"]:
+        failures.append(
+            f"error rate {summary['errors']}/{summary['requests']} exceeds {max_error_rate:.1%}"
+        )
+
+    floor = baselines["throughput_rps"] * (1 - tolerance)
+    if summary["throughput_rps"] < floor:
+        failures.append(
+            f"throughput {summary['throughput_rps']} req/s below {floor:.2f} "
+            f"(baseline {baselines['throughput_rps']})"
+        )
+
+    for endpoint, base in baselines["endpoints"].items():
+        stats = summary["endpoints"].get(endpoint)
+        if stats is None:
+            failures.append(f"{endpoint}: no requests recorded")
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            # The absolute slack keeps millisecond-scale endpoints from failing on noise
+            limit = base[key] * (1 + tolerance) + slack_ms
+            if stats[key] > limit:
+                failures.append(
+                    f"{endpoint}: {key[:3]} {stats[key]}ms exceeds {limit:.1f}ms "
+                    f"(baseline {base[key]}ms)"
+                )
+    return failures
+
+
+async def run(args: argparse.Namespace) -> int:
+    # The limiter keys on client IP, and every virtual user shares 127.0.0.1
+    rate_limiter.requests_per_minute = sys.maxsize
+    app.dependency_overrides[get_current_user] = loadtest_user
+
+    port = free_port()
+    server = start_server(port)
+    prefix = f"loadtest-{uuid.uuid4().hex[:8]}-"
+    results = Results()
+    rng = random.Random(args.seed)
+
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=args.timeout
+    ) as client:
+        users = [
+            VirtualUser(
+                client, f"{prefix}{i}", results, random.Random(rng.random()), args.think_time
+            )
+            for i in range(args.users)
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*(user.run(args.sessions) for user in users))
+        elapsed = time.perf_counter() - start
+
+    server.should_exit = True
+    if not args.keep_data:
+        delete_users(prefix)
+
+    summary = summarize(results, elapsed)
+    summary["config"] = {
+        "users": args.users,
+        "sessions": args.sessions,
+        "think_time": args.think_time,
+        "seed": args.seed,
+    }
+    print(f"{args.users} users x {args.sessions} sessions")
+    print_report(summary)
+
+    if args.update_baselines:
+        args.baselines.write_text(json.dumps(summary, indent=2) + "\n")
+        print(f"Baselines written to {args.baselines}")
+        return 0
+
+    if not args.baselines.exists():
+        print(f"No baselines at {args.baselines}; run with --update-baselines to record them")
+        return 0
+
+    baselines = json.loads(args.baselines.read_text())
+    if baselines.get("config") != summary["config"]:
+        print(f"Warning: baselines were recorded with {baselines.get('config')}")
+    failures = check_baselines(
+        summary, baselines, args.tolerance, args.slack_ms, args.max_error_rate
+    )
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    print("FAIL" if failures else "PASS")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--sessions", type=int, default=3, help="Sessions per user")
+    parser.add_argument(
+        "--think-time", type=float, default=0.0, help="Mean pause between calls in seconds"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the session mix")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout")
+    parser.add_argument("--baselines", type=Path, default=DEFAULT_BASELINES)
+    parser.add_argument(
+        "--update-baselines", action="store_true", help="Store this run as the baseline"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed relative regression"
+    )
+    parser.add_argument(
+        "--slack-ms", type=float, default=5.0, help="Allowed absolute latency regression"
+    )
+    parser.add_argument(
+        "--max-error-rate", type=float, default=0.01, help="Allowed share of failed calls"
+    )
+    parser.add_argument(
+        "--keep-data", action="store_true", help="Keep the users and trips the run created"
+    )
+    sys.exit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,170 @@
+"""
+Bulk import a destination catalog
+
+Streams a JSONL or CSV file (optionally gzipped) of destinations, upserting batches on
+(name, country) with COPY + INSERT ... ON CONFLICT. Each batch commits on its own and
+is recorded in a checkpoint file, so an interrupted import resumes where it stopped;
+re-running a finished import only touches rows whose values changed. Requires
+migration 008 (unique name/country key).
+
+Records are objects with "name" (required), "country", "description", "budget",
+"image_url" and "attractions" (a list, or "A|B|C" in CSV). Missing fields keep the
+stored value of an existing destination.
+
+The catalog version is bumped once, when the whole file has been imported and only if
+rows changed (not per batch, and not by an interrupted run), so API workers reload
+their snapshot once per import. Each reload streams id, name and country of every
+destination (a few seconds of reading per worker at 500k rows) but keeps only the
+CATALOG_INDEX_MAX_DESTINATIONS most travelled in memory (tens of MB at the default
+50k); see DestinationCatalog.
+
+Usage (from the backend directory):
+    python scripts/import_destinations.py data/destinations.jsonl.gz --batch-size 5000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app.services.catalog_import import (
+    Checkpoint,
+    ImportStats,
+    InvalidRecord,
+    detect_format,
+    iter_rows,
+    normalize_record,
+    open_catalog,
+    upsert_destinations,
+)
+from app.services.destination_catalog import bump_catalog_version
+
+MAX_REPORTED_INVALID = 10  # invalid records printed individually; the rest are counted
+
+
+def report(stats: ImportStats, rate: float, position: int, size: int) -> None:
+    percent = f"{100 * position / size:5.1f}%" if size else "  n/a"
+    print(
+        f"  {percent} {stats.records:>9} records ({rate:,.0f}/s) "
+        f"inserted={stats.inserted} updated={stats.updated} unchanged={stats.unchanged} "
+        f"invalid={stats.invalid}",
+        flush=True,
+    )
+
+
+def import_destinations(
+    path: Path,
+    fmt: Optional[str],
+    batch_size: int,
+    checkpoint_path: Path,
+    restart: bool,
+) -> ImportStats:
+    """Import the catalog at path, resuming from checkpoint_path unless restart is set"""
+    fmt = fmt or detect_format(path)
+    checkpoint = None if restart else Checkpoint.load(checkpoint_path)
+    if checkpoint and not checkpoint.matches(path):
+        print("⚠️  Checkpoint is for a different or modified file; starting over")
+        checkpoint = None
+    checkpoint = checkpoint or Checkpoint.start(path)
+    total = checkpoint.stats
+    skip = total.records
+    if skip:
+        print(f"Resuming after {skip} records")
+
+    stream, raw = open_catalog(path)
+    size = path.stat().st_size
+    started = time.monotonic()
+    processed = 0  # by this run, for the rate
+    with stream, engine.connect() as conn:
+        batch = []
+        batch_stats = ImportStats()
+
+        def flush() -> None:
+            nonlocal processed
+            with conn.begin():
+                result = upsert_destinations(conn, batch)
+            # Counted only once committed, so a crash replays at most this batch
+            result.records = batch_stats.records
+            result.invalid = batch_stats.invalid
+            total.add(result)
+            checkpoint.save(checkpoint_path)
+            processed += result.records
+            rate = processed / max(time.monotonic() - started, 1e-9)
+            report(total, rate, raw.tell(), size)
+            batch.clear()
+            batch_stats.records = batch_stats.invalid = 0
+
+        for number, row in enumerate(iter_rows(stream, fmt), start=1):
+            if number <= skip:
+                continue
+            batch_stats.records += 1
+            try:
+                if isinstance(row, InvalidRecord):
+                    raise row
+                batch.append(normalize_record(row))
+            except InvalidRecord as e:
+                batch_stats.invalid += 1
+                if total.invalid + batch_stats.invalid <= MAX_REPORTED_INVALID:
+                    print(f"⚠️  Record {number} skipped: {e}")
+            if batch_stats.records >= batch_size:
+                flush()
+        if batch_stats.records:
+            flush()
+
+        # Fresh planner statistics after a bulk load
+        conn.execute(text("ANALYZE destinations"))
+        conn.commit()
+
+    # Once per import, and only if it changed anything (resumed runs included): API
+    # workers reload their catalog snapshot on the next check
+    if total.inserted or total.updated:
+        db = SessionLocal()
+        try:
+            bump_catalog_version(db)
+            db.commit()
+        finally:
+            db.close()
+    checkpoint_path.unlink(missing_ok=True)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import a destination catalog")
+    parser.add_argument("input", type=Path, help="JSONL or CSV file, optionally .gz")
+    parser.add_argument(
+        "--format", choices=["jsonl", "csv"], help="Input format (default: from the extension)"
+    )
+    parser.add_argument("--batch-size", type=int, default=5000, help="Records per transaction")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="Progress file used to resume (default: <input>.checkpoint)",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore any checkpoint and start from the top"
+    )
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+
+    print(f"Importing destinations from {args.input}...")
+    started = time.monotonic()
+    stats = import_destinations(
+        args.input,
+        args.format,
+        args.batch_size,
+        args.checkpoint or args.input.with_name(args.input.name + ".checkpoint"),
+        args.restart,
+    )
+    print(
+        f"✅ Imported {stats.records} records in {time.monotonic() - started:.1f}s: "
+        f"{stats.inserted} inserted, {stats.updated} updated, {stats.unchanged} unchanged, "
+        f"{stats.invalid} invalid"
+    )
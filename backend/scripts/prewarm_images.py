@@ -0,0 +1,197 @@
+"""
+Pre-warm the destination image cache
+
+Looks up Pexels images for every destination in the catalog and for the most
+frequent trip destinations, so the shared (Redis) cache is warm before traffic
+arrives after a deploy or cache flush. Optionally backfills Destination.image_url
+and trips that have no image yet.
+
+Usage (from the backend directory):
+    python scripts/prewarm_images.py --top-trips 200 --concurrency 4 --backfill
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import func
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.destination import Destination
+from app.models.trip import Trip
+from app.services.image_cache import MISS, normalize_destination
+from app.services.pexels_service import pexels_service
+from app.services.redis_service import redis_service
+from app.services.trip_image_service import IMAGE_STATUS_READY
+from app.utils.resilience import CircuitBreaker
+
+
+def collect_queries(db, top_trips: int) -> Dict[str, str]:
+    """Catalog names plus the top-N trip destinations, deduplicated by cache key"""
+    queries: Dict[str, str] = {}
+
+    for (name,) in db.query(Destination.name).all():
+        queries.setdefault(normalize_destination(name), name)
+
+    popular = (
+        db.query(Trip.destination, func.count(Trip.id).label("trips"))
+        .filter(Trip.destination.isnot(None), Trip.destination != "")
+        .group_by(Trip.destination)
+        .order_by(func.count(Trip.id).desc())
+        .limit(top_trips)
+        .all()
+    )
+    for destination, _ in popular:
+        queries.setdefault(normalize_destination(destination), destination)
+
+    # Trips missing an image are always included so they can be backfilled
+    missing = (
+        db.query(Trip.destination)
+        .filter(Trip.destination.isnot(None), Trip.destination != "", Trip.image_url.is_(None))
+        .distinct()
+        .all()
+    )
+    for (destination,) in missing:
+        queries.setdefault(normalize_destination(destination), destination)
+
+    return queries
+
+
+async def warm(
+    queries: Dict[str, str], concurrency: int
+) -> Tuple[Dict[str, Optional[dict]], int]:
+    """
+    Look up every query with bounded concurrency; stop early if Pexels stops answering
+
+    Returns the cached results and how many lookups were skipped with the breaker open.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results: Dict[str, Optional[dict]] = {}
+    done = 0
+    skipped = 0
+
+    async def lookup(key: str, query: str) -> None:
+        nonlocal done, skipped
+        async with semaphore:
+            if pexels_service.breaker.state == CircuitBreaker.OPEN:
+                skipped += 1
+            else:
+                image = await pexels_service.get_destination_image(query)
+                # Only trust results that made it into the cache (not curated fallbacks)
+                _, cached = await pexels_service.cache.get(query)  # type: ignore[union-attr]
+                if cached is not MISS:
+                    results[key] = image
+            done += 1
+            if done % 25 == 0 or done == len(queries):
+                print(
+                    f"  {done}/{len(queries)} destinations processed "
+                    f"({len(results)} warmed, {skipped} skipped)"
+                )
+
+    await asyncio.gather(*(lookup(key, query) for key, query in queries.items()))
+    return results, skipped
+
+
+def backfill(db, results: Dict[str, Optional[dict]]) -> None:
+    """Store warmed images on destinations and trips that don't have one"""
+    destinations = 0
+    for destination in db.query(Destination).filter(Destination.image_url.is_(None)).all():
+        image = results.get(normalize_destination(destination.name))
+        if image:
+            destination.image_url = image["image_url"]
+            destinations += 1
+
+    trips = 0
+    missing: List[str] = [
+        d
+        for (d,) in db.query(Trip.destination)
+        .filter(Trip.destination.isnot(None), Trip.image_url.is_(None))
+        .distinct()
+        .all()
+    ]
+    for destination in missing:
+        image = results.get(normalize_destination(destination))
+        if not image:
+            continue
+        trips += (
+            db.query(Trip)
+            .filter(Trip.destination == destination, Trip.image_url.is_(None))
+            .update(
+                {
+                    Trip.image_url: image["image_url"],
+                    Trip.photographer: image["photographer"],
+                    Trip.photographer_url: image["photographer_url"],
+                    Trip.image_status: IMAGE_STATUS_READY,
+                },
+                synchronize_session=False,
+            )
+        )
+
+    db.commit()
+    print(f"✅ Backfilled {destinations} destinations and {trips} trips")
+
+
+async def prewarm_images(top_trips: int, concurrency: int, do_backfill: bool, max_wait: float):
+    """Warm the image cache and optionally backfill missing images"""
+    # A batch job should wait for rate-limit tokens instead of falling back
+    settings.PEXELS_MAX_QUEUE_WAIT = max_wait
+
+    db = SessionLocal()
+    try:
+        queries = collect_queries(db, top_trips)
+        print(f"Pre-warming images for {len(queries)} destinations...")
+
+        started = time.monotonic()
+        await pexels_service.startup()
+        results, skipped = await warm(queries, concurrency)
+        elapsed = time.monotonic() - started
+
+        found = sum(1 for image in results.values() if image)
+        print(
+            f"✅ Warmed {len(results)}/{len(queries)} destinations "
+            f"({found} with images) in {elapsed:.1f}s"
+        )
+        unwarmed = len(queries) - len(results) - skipped
+        if skipped:
+            print(
+                f"⚠️  Skipped {skipped} lookups: Pexels is unavailable or the quota is nearly "
+                "spent (circuit breaker open)"
+            )
+        if unwarmed:
+            print(f"⚠️  {unwarmed} lookups fell back without caching (rate limit or errors)")
+
+        if do_backfill:
+            backfill(db, results)
+    finally:
+        db.close()
+        await pexels_service.aclose()
+        await redis_service.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-warm the destination image cache")
+    parser.add_argument(
+        "--top-trips", type=int, default=100, help="Number of most frequent trip destinations"
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel Pexels lookups")
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Store images on destinations and trips that have none",
+    )
+    parser.add_argument(
+        "--max-wait",
+        type=float,
+        default=600.0,
+        help="Seconds to wait for a rate-limit token before skipping a lookup",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(prewarm_images(args.top_trips, args.concurrency, args.backfill, args.max_wait))
@@ -5,22 +5,16 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.database import SessionLocal, engine, Base
-from app.models.destination import Destination
-from decimal import Decimal
+from app.models.destination import Destination  # noqa: F401
+from app.services.catalog_import import normalize_record, upsert_destinations
+from app.services.destination_catalog import bump_catalog_version
 
 
 def seed_destinations():
-    """Seed sample destinations into database"""
+    """Seed sample destinations into database (safe to re-run: existing rows are updated)"""
     Base.metadata.create_all(bind=engine)  # Ensure tables exist
     db = SessionLocal()
 
-    # Check if destinations already exist
-    existing = db.query(Destination).first()
-    if existing:
-        print("Destinations already seeded!")
-        db.close()
-        return
-
     destinations_data = [
         {
             "name": "Rome",
@@ -108,14 +102,18 @@ def seed_destinations():
         },
     ]
 
-    for dest_data in destinations_data:
-        # Convert budget to Decimal for database storage
-        dest_data["budget"] = Decimal(dest_data["budget"])
-        destination = Destination(**dest_data)
-        db.add(destination)
+    records = [normalize_record(dest_data) for dest_data in destinations_data]
+    stats = upsert_destinations(db.connection(), records)
 
+    # Running API workers pick up the new catalog on their next version check; an
+    # unchanged catalog doesn't make them reload
+    if stats.inserted or stats.updated:
+        bump_catalog_version(db)
     db.commit()
-    print(f"✅ Successfully seeded {len(destinations_data)} destinations!")
+    print(
+        f"✅ Successfully seeded {len(destinations_data)} destinations! "
+        f"({stats.inserted} new, {stats.updated} updated)"
+    )
     db.close()
 
 
@@ -57,6 +57,8 @@ async def test_pexels():
     else:
         print("✗ Could not fetch rate limit")
 
+    await service.aclose()
+
     print("\n" + "=" * 60)
     print("✓ All tests completed!")
     print("=" * 60)
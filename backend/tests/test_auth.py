@@ -1,4 +1,7 @@
+from unittest.mock import patch
+
 from fastapi.testclient import TestClient
+from app.config import settings
 from app.main import app
 
 # Create a test client pointing to your main app instance
@@ -18,3 +21,17 @@ def test_root_endpoint():
     assert response.status_code == 200
     assert "message" in response.json()
     # Note: Full authentication tests require mocking Firebase, which is more complex.
+
+
+def test_metrics_endpoint_gated_by_settings():
+    """/metrics is hidden unless enabled, and requires the bearer token when one is set"""
+    with patch.object(settings, "METRICS_ENABLED", False):
+        assert client.get("/metrics").status_code == 404
+
+    with patch.object(settings, "METRICS_ENABLED", True), patch.object(
+        settings, "METRICS_TOKEN", "s3cret"
+    ):
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 401
+        response = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+        assert response.status_code == 200
@@ -0,0 +1,178 @@
+import csv
+import gzip
+import io
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from app.services.catalog_import import (
+    Checkpoint,
+    ImportStats,
+    InvalidRecord,
+    _copy_rows,
+    detect_format,
+    iter_rows,
+    merge_duplicates,
+    normalize_record,
+    open_catalog,
+)
+
+
+def test_detects_format_from_extension():
+    assert detect_format(Path("catalog.jsonl")) == "jsonl"
+    assert detect_format(Path("catalog.ndjson.gz")) == "jsonl"
+    assert detect_format(Path("pois.CSV")) == "csv"
+    assert detect_format(Path("pois.csv.gz")) == "csv"
+    with pytest.raises(ValueError):
+        detect_format(Path("catalog.xml"))
+
+
+def test_jsonl_rows_keep_bad_lines_in_place():
+    stream = io.StringIO('{"name": "Rome"}\n\nnot json\n[1, 2]\n{"name": "Oslo"}\n')
+
+    rows = list(iter_rows(stream, "jsonl"))
+
+    assert rows[0] == {"name": "Rome"}
+    assert isinstance(rows[1], InvalidRecord)
+    assert isinstance(rows[2], InvalidRecord)
+    assert rows[3] == {"name": "Oslo"}
+
+
+def test_csv_rows():
+    stream = io.StringIO(
+        'name,country,attractions\nRome,Italy,"Colosseum|Pantheon"\nOslo,Norway,x,extra\n'
+    )
+
+    rows = list(iter_rows(stream, "csv"))
+
+    assert rows[0] == {"name": "Rome", "country": "Italy", "attractions": "Colosseum|Pantheon"}
+    assert isinstance(rows[1], InvalidRecord)
+
+
+def test_reads_gzipped_catalogs(tmp_path):
+    path = tmp_path / "catalog.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write('{"name": "Kyoto", "country": "Japan"}\n')
+
+    stream, raw = open_catalog(path)
+    with stream:
+        rows = list(iter_rows(stream, detect_format(path)))
+        assert raw.tell() == path.stat().st_size
+
+    assert rows == [{"name": "Kyoto", "country": "Japan"}]
+
+
+def test_normalizes_records():
+    record = normalize_record(
+        {
+            "name": "  Rome ",
+            "country": "Italy",
+            "description": "",
+            "budget": "140",
+            "attractions": "Colosseum | Pantheon||Colosseum",
+            "rating": 4.8,
+        }
+    )
+
+    assert record == {
+        "name": "Rome",
+        "country": "Italy",
+        "description": None,
+        "budget": Decimal("140.00"),
+        "image_url": None,
+        "attractions": ["Colosseum", "Pantheon"],
+    }
+
+
+def test_attractions_accept_lists_and_json_arrays():
+    assert normalize_record({"name": "Rome", "attractions": ["Colosseum", " ", None]})[
+        "attractions"
+    ] == ["Colosseum"]
+    assert normalize_record({"name": "Rome", "attractions": '["Colosseum", "Pantheon"]'})[
+        "attractions"
+    ] == ["Colosseum", "Pantheon"]
+    # Nothing to set: the stored attractions are kept
+    assert normalize_record({"name": "Rome", "attractions": []})["attractions"] is None
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        {"country": "Italy"},
+        {"name": "   "},
+        {"name": "Rome", "budget": "cheap"},
+        {"name": "Rome", "budget": -5},
+        {"name": "Rome", "budget": 1e12},
+        {"name": "Rome", "budget": "NaN"},
+        {"name": "Rome", "attractions": "[broken"},
+        {"name": "Rome", "attractions": {"a": 1}},
+        {"name": "Ro\x00me"},
+    ],
+)
+def test_rejects_invalid_records(raw):
+    with pytest.raises(InvalidRecord):
+        normalize_record(raw)
+
+
+def test_copy_rows_write_nulls_as_empty_cells():
+    records = [
+        normalize_record({"name": 'The "Big" Apple', "country": "USA", "attractions": "A|B"}),
+        normalize_record({"name": "Oslo", "budget": 90}),
+    ]
+
+    rows = list(csv.reader(_copy_rows(records)))
+
+    assert rows[0] == ["0", 'The "Big" Apple', "USA", "", "", "", '["A", "B"]']
+    assert rows[1] == ["1", "Oslo", "", "", "90.00", "", ""]
+
+
+def test_duplicates_in_one_batch_are_merged_like_separate_batches():
+    records = [
+        normalize_record({"name": "Rome", "country": "Italy", "description": "Eternal City"}),
+        normalize_record({"name": "Oslo", "budget": 90}),
+        normalize_record({"name": "Rome", "country": "Italy", "budget": 140, "attractions": "A"}),
+        normalize_record({"name": "Rome", "country": "Italy", "budget": 150}),
+        normalize_record({"name": "Oslo", "country": "Norway"}),
+    ]
+
+    merged = merge_duplicates(records)
+
+    assert merged == [
+        {
+            "name": "Rome",
+            "country": "Italy",
+            "description": "Eternal City",
+            "budget": Decimal("150.00"),
+            "image_url": None,
+            "attractions": ["A"],
+        },
+        records[1],
+        records[4],
+    ]
+
+
+def test_checkpoint_round_trip(tmp_path):
+    catalog = tmp_path / "catalog.jsonl"
+    catalog.write_text(json.dumps({"name": "Rome"}) + "\n")
+    path = tmp_path / "catalog.jsonl.checkpoint"
+
+    checkpoint = Checkpoint.start(catalog)
+    checkpoint.stats.add(ImportStats(records=1, inserted=1))
+    checkpoint.save(path)
+
+    loaded = Checkpoint.load(path)
+    assert loaded.matches(catalog)
+    assert loaded.stats == ImportStats(records=1, inserted=1)
+
+    catalog.write_text(json.dumps({"name": "Rome"}) + "\n" + json.dumps({"name": "Oslo"}) + "\n")
+    assert not loaded.matches(catalog)
+
+
+def test_missing_or_corrupt_checkpoints_are_ignored(tmp_path):
+    path = tmp_path / "catalog.checkpoint"
+    assert Checkpoint.load(path) is None
+
+    path.write_text("{not json")
+    assert Checkpoint.load(path) is None
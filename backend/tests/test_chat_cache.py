@@ -0,0 +1,52 @@
+from app.services.chat_cache import ChatResponseCache, normalize_prompt
+
+REPLY = "Spring (late March to early May) and autumn are the best times to visit Kyoto."
+
+
+def make_cache(**kwargs) -> ChatResponseCache:
+    options = {"maxsize": 16, "ttl": 3600, "threshold": 0.7, "dim": 1024}
+    options.update(kwargs)
+    return ChatResponseCache(**options)
+
+
+def test_normalize_prompt():
+    """Case, punctuation and whitespace differences share one exact key"""
+    assert normalize_prompt("  Best time to visit KYOTO?! ") == "best time to visit kyoto"
+
+
+def test_exact_hit():
+    cache = make_cache()
+    cache.put("Best time to visit Kyoto?", [], REPLY)
+    assert cache.get("best time to visit kyoto") == REPLY
+
+
+def test_semantic_hit_for_rephrased_prompt():
+    cache = make_cache()
+    cache.put("Best time to visit Kyoto?", [], REPLY)
+    assert cache.get("When is the best time to go to Kyoto") == REPLY
+
+
+def test_semantic_tier_keeps_destinations_apart():
+    """Prompts that differ in a destination never share a reply"""
+    cache = make_cache()
+    cache.put("Best time to visit Kyoto?", [], REPLY)
+    assert cache.get("Best time to visit Osaka?") is None
+
+
+def test_prompts_with_context_are_not_cached():
+    cache = make_cache()
+    context = [{"role": "user", "content": "I'm going to Japan in May"}]
+    cache.put("Best time to visit Kyoto?", context, REPLY)
+    assert cache.get("Best time to visit Kyoto?", context) is None
+    assert cache.get("Best time to visit Kyoto?") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(maxsize=2)
+    cache.put("Best time to visit Kyoto?", [], REPLY)
+    cache.put("Top sights in Lisbon", [], "Belem Tower")
+    cache.get("Best time to visit Kyoto?")
+    cache.put("Street food in Bangkok", [], "Pad thai")
+
+    assert cache.get("Best time to visit Kyoto?") == REPLY
+    assert cache.get("Top sights in Lisbon") is None
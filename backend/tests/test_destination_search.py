@@ -0,0 +1,14 @@
+from app.services.destination_search import MAX_TERMS, prefix_tsquery
+
+
+def test_prefix_tsquery_matches_every_word_as_prefix():
+    assert prefix_tsquery("New Yo") == "new:* & yo:*"
+
+
+def test_prefix_tsquery_drops_tsquery_syntax():
+    assert prefix_tsquery("rome & !(paris) | 'x'") == "rome:* & paris:* & x:*"
+    assert prefix_tsquery("  ?! ") is None
+
+
+def test_prefix_tsquery_caps_terms():
+    assert prefix_tsquery(" ".join(["a"] * 20)).count(":*") == MAX_TERMS
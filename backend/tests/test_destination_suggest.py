@@ -0,0 +1,75 @@
+from app.services.destination_suggest import (
+    KIND_ATTRACTION,
+    KIND_COUNTRY,
+    KIND_DESTINATION,
+    build_suggestions,
+    fold,
+)
+
+DESTINATIONS = [
+    {
+        "id": "1",
+        "name": "Barcelona",
+        "country": "Spain",
+        "attractions": ["Park Güell", "Gothic Quarter"],
+    },
+    {"id": "2", "name": "Bangkok", "country": "Thailand", "attractions": ["Grand Palace"]},
+    {"id": "3", "name": "Bali", "country": "Indonesia", "attractions": []},
+    {"id": "4", "name": "Seville", "country": "Spain", "attractions": []},
+]
+TRIPS = {"bangkok": 12, "barcelona": 30, "bali": 5}
+
+
+def texts(results):
+    return [s.text for s in results]
+
+
+def test_fold_ignores_case_and_accents():
+    assert fold("  Park  GÜELL ") == "park guell"
+
+
+def test_ranks_prefix_matches_by_trip_count():
+    index = build_suggestions(DESTINATIONS, TRIPS)
+
+    assert texts(index.suggest("ba")) == ["Barcelona", "Bangkok", "Bali"]
+    assert texts(index.suggest("ban")) == ["Bangkok"]
+
+
+def test_matches_any_word_of_an_attraction():
+    index = build_suggestions(DESTINATIONS, TRIPS)
+
+    [result] = index.suggest("quar")
+    assert result.text == "Gothic Quarter"
+    assert result.kind == KIND_ATTRACTION
+    assert result.destination == "Barcelona"
+    assert result.destination_id == "1"
+
+
+def test_accent_insensitive_prefix():
+    index = build_suggestions(DESTINATIONS, TRIPS)
+
+    assert texts(index.suggest("park gue")) == ["Park Güell"]
+
+
+def test_countries_sum_their_destinations_trips():
+    index = build_suggestions(DESTINATIONS, TRIPS)
+
+    spain = index.suggest("spa")[0]
+    assert spain.kind == KIND_COUNTRY
+    assert spain.popularity == 30
+
+
+def test_destination_ranks_before_its_attractions_on_ties():
+    index = build_suggestions(
+        [{"id": "1", "name": "Grand Canyon", "country": None, "attractions": ["Grand View"]}], {}
+    )
+
+    assert [s.kind for s in index.suggest("grand")] == [KIND_DESTINATION, KIND_ATTRACTION]
+
+
+def test_limit_and_empty_prefix():
+    index = build_suggestions(DESTINATIONS, TRIPS)
+
+    assert len(index.suggest("b", limit=2)) == 2
+    assert index.suggest("  ") == []
+    assert index.suggest("zzz") == []
@@ -0,0 +1,66 @@
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.services.fake_providers import (
+    FakeGenaiClient,
+    FakeProviderError,
+    fake_itinerary,
+    fake_pexels_transport,
+)
+from app.services.gemini_service import GeminiService
+from app.services.pexels_service import PexelsService
+
+NO_LATENCY = patch("app.services.fake_providers.settings.FAKE_LATENCY_MEDIAN", 0)
+
+
+def test_fake_itinerary_covers_dates_within_budget():
+    inputs = {
+        "destination": "Lisbon",
+        "start_date": "2026-05-01",
+        "end_date": "2026-05-04",
+        "budget": 800.0,
+    }
+    plan = fake_itinerary(inputs)
+
+    assert len(plan.days) == 4
+    assert sum(a.cost for day in plan.days for a in day.activities) <= 800.0
+    assert plan == fake_itinerary(inputs)
+
+
+@pytest.mark.asyncio
+async def test_fake_gemini_replies_deterministically():
+    service = GeminiService()
+    service._client = FakeGenaiClient()  # type: ignore[assignment]
+    # With context the reply is not cached, so both calls reach the fake
+    context = [{"role": "user", "content": "I'm spending a week in Italy"}]
+
+    with NO_LATENCY:
+        first = await service.generate_response("Where should I eat in Rome?", context)
+        second = await service.generate_response("Where should I eat in Rome?", context)
+
+    assert first == second
+    assert "Rome" in first
+
+
+@pytest.mark.asyncio
+async def test_fake_pexels_serves_photos():
+    client = httpx.AsyncClient(transport=fake_pexels_transport())
+    service = PexelsService(client=client, cache=None)
+
+    with NO_LATENCY:
+        data = await service.search_photos("Kyoto")
+
+    assert data["photos"][0]["src"]["large"].startswith("https://images.pexels.com/")
+    assert service.quota.remaining is not None
+
+
+@pytest.mark.asyncio
+async def test_fault_injection_raises_rate_limit_errors():
+    client = FakeGenaiClient()
+
+    with NO_LATENCY, patch("app.services.fake_providers.settings.FAKE_RATE_LIMIT_RATE", 1.0):
+        with pytest.raises(FakeProviderError) as exc_info:
+            await client.aio.models.generate_content(model="fake", contents=[])
+
+    assert exc_info.value.code == 429
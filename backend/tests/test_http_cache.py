@@ -0,0 +1,39 @@
+from app.utils.http_cache import VersionedResponseCache, etag_matches, make_etag
+
+
+def test_cache_hit_within_version():
+    cache = VersionedResponseCache("test", maxsize=8, ttl=60)
+    assert cache.get(1, "key") is None
+
+    stored = cache.put(1, "key", b"[]")
+
+    assert cache.get(1, "key") == stored
+    assert stored.etag == make_etag(b"[]")
+
+
+def test_version_bump_clears_cache():
+    cache = VersionedResponseCache("test", maxsize=8, ttl=60)
+    cache.get(1, "key")
+    cache.put(1, "key", b"old")
+
+    assert cache.get(2, "key") is None
+
+
+def test_data_read_under_old_version_is_not_stored():
+    cache = VersionedResponseCache("test", maxsize=8, ttl=60)
+    cache.get(1, "key")
+    cache.get(2, "other")  # another request saw the bump meanwhile
+
+    cache.put(1, "key", b"old")
+
+    assert cache.get(2, "key") is None
+
+
+def test_etag_matching():
+    etag = make_etag(b"body")
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
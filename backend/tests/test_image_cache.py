@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from app.services.image_cache import MISS, DestinationImageCache, normalize_destination
+from app.services.pexels_service import PexelsService
+
+IMAGE = {
+    "image_url": "https://images.pexels.com/photos/1/large.jpeg",
+    "photographer": "Jane Doe",
+    "photographer_url": "https://www.pexels.com/@jane",
+}
+
+
+def test_normalize_destination():
+    """Case, punctuation and whitespace differences share one cache key"""
+    assert normalize_destination("Paris, France") == "paris france"
+    assert normalize_destination("  PARIS   france ") == "paris france"
+
+
+@pytest.mark.asyncio
+async def test_local_tier_caches_hits_and_negatives():
+    """Positive and negative results are both served from the local tier"""
+    cache = DestinationImageCache(redis=None)
+
+    key, value = await cache.get("Tokyo")
+    assert value is MISS
+
+    await cache.set(key, IMAGE)
+    await cache.set(normalize_destination("Atlantis"), None)
+
+    assert (await cache.get("tokyo"))[1] == IMAGE
+    assert (await cache.get("Atlantis"))[1] is None
+
+
+@pytest.mark.asyncio
+async def test_get_destination_image_uses_cache():
+    """A second lookup for the same destination does not call Pexels"""
+    service = PexelsService(cache=DestinationImageCache(redis=None))
+    service.search_photos = AsyncMock(  # type: ignore[method-assign]
+        return_value={
+            "photos": [
+                {
+                    "src": {"large": IMAGE["image_url"]},
+                    "photographer": IMAGE["photographer"],
+                    "photographer_url": IMAGE["photographer_url"],
+                    "url": "https://www.pexels.com/photo/1/",
+                }
+            ]
+        }
+    )
+
+    first = await service.get_destination_image("Kyoto, Japan")
+    second = await service.get_destination_image("kyoto japan")
+
+    assert first == second
+    assert service.search_photos.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_search_is_not_cached():
+    """Upstream errors are retried on the next lookup instead of cached"""
+    service = PexelsService(cache=DestinationImageCache(redis=None))
+    service.search_photos = AsyncMock(return_value=None)  # type: ignore[method-assign]
+
+    assert await service.get_destination_image("Lisbon") is None
+    assert await service.get_destination_image("Lisbon") is None
+    assert service.search_photos.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_upstream_call():
+    """Concurrent misses for the same destination are coalesced"""
+    service = PexelsService(cache=DestinationImageCache(redis=None))
+
+    async def slow_search(query, orientation="landscape"):
+        await asyncio.sleep(0.05)
+        return {"photos": []}
+
+    service.search_photos = AsyncMock(side_effect=slow_search)  # type: ignore[method-assign]
+
+    results = await asyncio.gather(*(service.get_destination_image("Bali") for _ in range(10)))
+
+    assert results == [None] * 10
+    # One destination search plus one fallback query for all ten callers
+    assert service.search_photos.await_count == 2
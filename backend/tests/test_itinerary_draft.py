@@ -0,0 +1,117 @@
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.destination_catalog import DestinationCatalog, DestinationProfile
+from app.services.itinerary_draft import draft_itinerary
+from app.services.itinerary_service import ItineraryService
+from app.services.trip_itinerary import refine_trip_itinerary
+from app.utils.resilience import CircuitOpenError
+
+ROME = DestinationProfile(
+    name="Rome",
+    country="Italy",
+    description="The Eternal City",
+    daily_budget=140.0,
+    attractions=["Colosseum", "Vatican City", "Trevi Fountain"],
+)
+
+
+def all_activities(plan):
+    return [a for day in plan["days"] for a in day["activities"]]
+
+
+def test_draft_covers_trip_dates():
+    plan = draft_itinerary("Rome", "2026-05-01", "2026-05-04", 1000.0, profile=ROME)
+
+    assert len(plan["days"]) == 4
+    assert plan["days"][0]["title"] == "Day 1: Arrival in Rome"
+    assert plan["days"][-1]["title"].endswith("& Departure")
+
+
+def test_draft_uses_catalog_attractions_then_interests():
+    plan = draft_itinerary(
+        "Rome", "2026-05-01", "2026-05-04", 1000.0, interests=["food tours"], profile=ROME
+    )
+
+    titles = [a["title"] for a in all_activities(plan) if a["category"] == "sightseeing"]
+    assert titles[1:5] == ["Colosseum", "Vatican City", "Trevi Fountain", "Food tours in Rome"]
+
+
+def test_draft_stays_within_budget():
+    plan = draft_itinerary("Rome", "2026-05-01", "2026-05-07", 300.0, profile=ROME)
+
+    assert sum(a["cost"] for a in all_activities(plan)) <= 300.0
+
+
+def test_draft_without_catalog_entry_or_dates():
+    plan = draft_itinerary("Atlantis")
+
+    assert len(plan["days"]) == 3
+    assert all("Atlantis" in a["location"] for a in all_activities(plan))
+
+
+def test_draft_is_deterministic():
+    args = ("Rome", "2026-05-01", "2026-05-03", 800.0, ["art"], ROME)
+
+    assert draft_itinerary(*args) == draft_itinerary(*args)
+
+
+def test_catalog_matches_free_text_destinations():
+    catalog = DestinationCatalog()
+    catalog._ids_by_name = {"rome": "1", "mexico city": "2"}
+    profiles = {"1": ROME, "2": DestinationProfile(name="Mexico City")}
+
+    with patch.object(catalog, "_fetch_profile", side_effect=profiles.get) as fetch:
+        assert catalog.find("Rome") is ROME
+        assert catalog.find("rome, Italy") is ROME
+        assert catalog.find("A week in Mexico City").name == "Mexico City"
+        assert catalog.find("Lisbon") is None
+        assert catalog.find(None) is None
+
+    # Details are fetched once per destination, then served from the cache
+    assert fetch.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_falls_back_to_draft_unless_disabled():
+    """Callers that already saved the draft get an error instead of the same draft"""
+    service = ItineraryService()
+    service.breaker.trip()
+    args = ("Rome", "2026-05-01", "2026-05-03", 600.0, [])
+
+    plan = await service.generate_itinerary(*args)
+    assert len(plan["days"]) == 3
+
+    with pytest.raises(CircuitOpenError):
+        await service.generate_itinerary(*args, fallback_to_draft=False)
+
+
+@pytest.mark.asyncio
+async def test_refinement_failure_keeps_draft_and_notifies():
+    trip_id, user_id = uuid.uuid4(), uuid.uuid4()
+    with patch(
+        "app.services.trip_itinerary.generate_trip_itinerary",
+        AsyncMock(side_effect=CircuitOpenError("open")),
+    ) as generate, patch(
+        "app.services.trip_itinerary.connection_manager.publish", AsyncMock()
+    ) as publish:
+        await refine_trip_itinerary(trip_id, user_id, "session", draft_version=3)
+
+    assert generate.await_args.kwargs["fallback_to_draft"] is False
+    assert generate.await_args.kwargs["expected_version"] == 3
+    publish.assert_awaited_once_with(
+        user_id, {"type": "trip.itinerary_failed", "trip_id": str(trip_id)}
+    )
+
+
+@pytest.mark.asyncio
+async def test_refinement_skips_edited_draft():
+    """generate_trip_itinerary returns None when the draft changed: nothing is announced"""
+    with patch(
+        "app.services.trip_itinerary.generate_trip_itinerary", AsyncMock(return_value=None)
+    ), patch("app.services.trip_itinerary.connection_manager.publish", AsyncMock()) as publish:
+        await refine_trip_itinerary(uuid.uuid4(), uuid.uuid4(), "session", draft_version=1)
+
+    publish.assert_not_awaited()
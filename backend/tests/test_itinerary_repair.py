@@ -0,0 +1,144 @@
+from app.services.itinerary_repair import parse_time, repair_itinerary, select_within_budget
+
+
+def activity(title, time, duration=60, cost=0.0, category="sightseeing"):
+    return {
+        "title": title,
+        "description": "",
+        "time": time,
+        "duration": duration,
+        "cost": cost,
+        "category": category,
+        "location": "",
+    }
+
+
+def titles(day):
+    return [a["title"] for a in day["activities"]]
+
+
+def test_parse_time_formats():
+    assert parse_time("08:30") == 8 * 60 + 30
+    assert parse_time("9:05") == 9 * 60 + 5
+    assert parse_time("7 pm") == 19 * 60
+    assert parse_time("12:15 AM") == 15
+    assert parse_time("25:00") is None
+    assert parse_time("morning") is None
+
+
+def test_sorts_activities_chronologically():
+    plan = {
+        "days": [
+            {
+                "title": "Day 1",
+                "activities": [activity("Dinner", "19:00"), activity("Breakfast", "08:00")],
+            }
+        ]
+    }
+
+    repaired = repair_itinerary(plan)
+
+    assert titles(repaired["days"][0]) == ["Breakfast", "Dinner"]
+
+
+def test_shifts_overlapping_activities():
+    plan = {
+        "days": [
+            {
+                "title": "Day 1",
+                "activities": [activity("Museum", "10:00", 120), activity("Lunch", "11:00", 60)],
+            }
+        ]
+    }
+
+    lunch = repair_itinerary(plan)["days"][0]["activities"][1]
+
+    assert lunch["time"] == "12:00"
+
+
+def test_drops_activities_pushed_past_midnight():
+    plan = {
+        "days": [
+            {
+                "title": "Day 1",
+                "activities": [activity("Night tour", "22:00", 180), activity("Bar", "23:00")],
+            }
+        ]
+    }
+
+    day = repair_itinerary(plan)["days"][0]
+
+    assert titles(day) == ["Night tour"]
+    assert day["activities"][0]["duration"] == 120
+
+
+def test_day_count_matches_trip_dates():
+    day = {"title": "Day", "activities": [activity("Walk", "10:00")]}
+
+    longer = repair_itinerary({"days": [day]}, "2026-05-01", "2026-05-03")
+    shorter = repair_itinerary({"days": [day] * 4}, "2026-05-01", "2026-05-02")
+
+    assert len(longer["days"]) == 3
+    assert longer["days"][2]["title"] == "Day 3: Free day"
+    assert len(shorter["days"]) == 2
+
+
+def test_enforces_budget_keeping_most_valuable_activities():
+    plan = {
+        "days": [
+            {
+                "title": "Day 1",
+                "activities": [
+                    activity("Lunch", "12:00", 60, 30.0, "food"),
+                    activity("Short show", "14:00", 30, 60.0),
+                    activity("Day trip", "15:00", 240, 70.0),
+                ],
+            }
+        ]
+    }
+
+    day = repair_itinerary(plan, budget=100.0)["days"][0]
+
+    assert titles(day) == ["Lunch", "Day trip"]
+    assert sum(a["cost"] for a in day["activities"]) <= 100.0
+
+
+def test_within_budget_plan_is_unchanged():
+    plan = {
+        "days": [
+            {
+                "title": "Day 1",
+                "activities": [activity("Breakfast", "08:00", 60, 10.0, "food")],
+            }
+        ]
+    }
+
+    assert repair_itinerary(plan, "2026-05-01", "2026-05-01", 50.0) == plan
+
+
+def test_select_within_budget_never_exceeds_budget():
+    costs = [33.34, 33.33, 33.33, 0.0]
+
+    chosen = select_within_budget(costs, [1.0, 1.0, 1.0, 1.0], 100.0)
+
+    assert sum(costs[i] for i in chosen) <= 100.0
+    assert 3 in chosen
+
+
+def test_tolerates_malformed_fields():
+    plan = {
+        "days": [
+            {
+                "title": "",
+                "activities": [
+                    {"title": "Somewhere", "time": "later", "duration": None, "cost": "n/a"}
+                ],
+            }
+        ]
+    }
+
+    day = repair_itinerary(plan, budget=0.0)["days"][0]
+
+    assert day["title"] == "Day 1"
+    assert day["activities"][0]["time"] == "09:00"
+    assert day["activities"][0]["cost"] == 0.0
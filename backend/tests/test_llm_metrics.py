@@ -0,0 +1,41 @@
+import pytest
+
+from app.services.llm_metrics import current_route, instrument, llm_calls, llm_fallbacks
+from app.utils.exceptions import ServiceUnavailableError
+
+
+def calls(outcome: str, route: str) -> float:
+    return llm_calls.value(route=route, task="chat", model="m", outcome=outcome)
+
+
+def test_successful_call_is_counted_as_ok():
+    current_route.set("/v1/chat/")
+    with instrument("chat") as call:
+        call.model = "m"
+    assert calls("ok", "/v1/chat/") == 1
+
+
+def test_fallback_is_counted_separately():
+    """A canned reply must not look like a healthy call"""
+    current_route.set("/v1/chat/fallback")
+    with instrument("chat") as call:
+        call.model = "m"
+        call.fallback("TimeoutError")
+
+    assert calls("ok", "/v1/chat/fallback") == 0
+    assert calls("fallback", "/v1/chat/fallback") == 1
+    assert (
+        llm_fallbacks.value(
+            route="/v1/chat/fallback", task="chat", model="m", reason="TimeoutError"
+        )
+        == 1
+    )
+
+
+def test_rejected_call_is_counted():
+    current_route.set("/v1/chat/busy")
+    with pytest.raises(ServiceUnavailableError):
+        with instrument("chat") as call:
+            call.model = "m"
+            raise ServiceUnavailableError()
+    assert calls("rejected", "/v1/chat/busy") == 1
@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+
+from app.services.llm_scheduler import FairScheduler
+from app.utils.exceptions import ServiceUnavailableError
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped():
+    scheduler = FairScheduler("test", max_concurrency=2, max_wait=5.0, max_queue=10)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with scheduler.slot("user"):
+            peak = max(peak, scheduler.active)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak == 2
+    assert scheduler.active == 0 and scheduler.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_slots_rotate_across_users():
+    """A user with a backlog doesn't hold up a user who arrives later"""
+    scheduler = FairScheduler("test", max_concurrency=1, max_wait=5.0, max_queue=10)
+    order = []
+
+    async def call(user: str):
+        async with scheduler.slot(user):
+            order.append(user)
+            await asyncio.sleep(0.01)
+
+    tasks = [asyncio.create_task(call("heavy")) for _ in range(4)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(call("light")))
+    await asyncio.gather(*tasks)
+
+    assert order.index("light") <= 2
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_wait_would_exceed_deadline():
+    scheduler = FairScheduler("test", max_concurrency=1, max_wait=0.05, max_queue=10)
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("a"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceUnavailableError) as exc_info:
+        async with scheduler.slot("b"):
+            pass
+    assert exc_info.value.retry_after >= 1
+
+    release.set()
+    await holder
+    assert scheduler.active == 0 and scheduler.waiting == 0
@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+from app.services.model_router import TASK_CHAT, ModelRouter
+
+MODELS = "fast-model,strong-model"
+
+
+@patch("app.services.model_router.settings.LLM_CHAT_MODELS", MODELS)
+def test_prefers_first_configured_model():
+    assert ModelRouter().pick(TASK_CHAT) == "fast-model"
+
+
+@patch("app.services.model_router.settings.LLM_CHAT_MODELS", MODELS)
+def test_skips_model_with_high_error_rate():
+    router = ModelRouter()
+    for _ in range(3):
+        router.record("fast-model", error=True)
+
+    assert router.pick(TASK_CHAT) == "strong-model"
+
+
+@patch("app.services.model_router.settings.LLM_CHAT_MODELS", MODELS)
+def test_shifts_to_faster_model_when_preferred_degrades():
+    router = ModelRouter()
+    router.record("fast-model", latency=6.0)
+    router.record("strong-model", latency=1.0)
+
+    assert router.pick(TASK_CHAT) == "strong-model"
+
+
+@patch("app.services.model_router.settings.LLM_CHAT_MODELS", MODELS)
+def test_error_rate_recovers_over_time():
+    router = ModelRouter()
+    for _ in range(3):
+        router.record("fast-model", error=True)
+
+    stats = router.stats("fast-model")
+    stats.updated -= 10 * 60  # ten minutes without calls
+    assert router.pick(TASK_CHAT) == "fast-model"
+
+
+@patch("app.services.model_router.settings.LLM_CHAT_MODELS", MODELS)
+def test_slow_model_is_remeasured_and_recovers():
+    router = ModelRouter()
+    router.record("fast-model", latency=6.0)
+    router.record("strong-model", latency=1.0)
+    assert router.pick(TASK_CHAT) == "strong-model"
+
+    router.stats("fast-model").latency_updated -= 10 * 60  # sidelined for ten minutes
+    assert router.pick(TASK_CHAT) == "fast-model"
+
+    router.record("fast-model", latency=0.8)
+    assert router.pick(TASK_CHAT) == "fast-model"
@@ -0,0 +1,18 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2026, 5, 1, 12, 30, 15, 123456)
+    row_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(timestamp, row_id)) == (timestamp, row_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "WyJ4Il0"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
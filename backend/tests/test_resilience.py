@@ -0,0 +1,237 @@
+import asyncio
+import time
+import httpx
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.services.gemini_service import GeminiService
+from app.services.itinerary_service import ItineraryService
+from app.services.pexels_service import PexelsService, PexelsUnavailableError
+from app.utils.resilience import (
+    CircuitBreaker,
+    Deadline,
+    TokenBucket,
+    hedged,
+    is_transient_error,
+    retry_async,
+)
+
+
+class UpstreamError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_burst_then_refuses():
+    """A full bucket serves its capacity immediately, then refuses without waiting"""
+    bucket = TokenBucket(rate=0.001, capacity=3)
+
+    assert [await bucket.acquire() for _ in range(3)] == [True, True, True]
+    assert await bucket.acquire(timeout=0.1) is False
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill():
+    """Callers wait for a token when it arrives within their timeout"""
+    bucket = TokenBucket(rate=100, capacity=1)
+
+    assert await bucket.acquire()
+    assert await bucket.acquire(timeout=0.5)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_timeout_is_not_delayed_by_other_waiters():
+    """Callers that can't wait get their answer at once, even while others are queued"""
+    bucket = TokenBucket(rate=2, capacity=1)
+    assert await bucket.acquire()
+    waiters = [asyncio.create_task(bucket.acquire(timeout=5)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(bucket.acquire(timeout=0) for _ in range(3)))
+
+    assert results == [False, False, False]
+    assert time.monotonic() - start < 0.1
+    assert await asyncio.gather(*waiters) == [True, True]
+
+
+def test_circuit_breaker_opens_after_threshold():
+    """Consecutive failures open the breaker"""
+    breaker = CircuitBreaker("test-open", failure_threshold=2, recovery_timeout=60)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_circuit_breaker_half_open_probe():
+    """After the recovery timeout one probe is allowed; success closes the breaker"""
+    breaker = CircuitBreaker("test-probe", failure_threshold=1, recovery_timeout=10)
+
+    with patch("app.utils.resilience.time.monotonic", return_value=1000.0):
+        breaker.record_failure()
+    with patch("app.utils.resilience.time.monotonic", return_value=1011.0):
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_is_transient_error():
+    assert is_transient_error(UpstreamError(503))
+    assert is_transient_error(UpstreamError(429))
+    assert is_transient_error(asyncio.TimeoutError())
+    assert not is_transient_error(UpstreamError(400))
+    assert not is_transient_error(ValueError("bad output"))
+
+
+@pytest.mark.asyncio
+async def test_retry_async_retries_transient_errors():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise UpstreamError(503)
+        return "ok"
+
+    result = await retry_async(
+        "test", flaky, Deadline(5), attempts=3, attempt_timeout=1, base_delay=0.001
+    )
+    assert result == "ok"
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_async_does_not_retry_permanent_errors():
+    calls = []
+
+    async def bad_request():
+        calls.append(1)
+        raise UpstreamError(400)
+
+    with pytest.raises(UpstreamError):
+        await retry_async("test", bad_request, Deadline(5), attempts=3, attempt_timeout=1)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_async_respects_deadline():
+    """A hung call is cut off by the deadline even if the attempt timeout is longer"""
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await retry_async("test", hang, Deadline(0.05), attempts=3, attempt_timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_hedged_returns_the_faster_copy():
+    delays = [1.0, 0.0]
+
+    async def call():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return delay
+
+    assert await asyncio.wait_for(hedged("test", call, delay=0.01), timeout=0.5) == 0.0
+
+
+def _pexels_service(handler) -> PexelsService:
+    service = PexelsService(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), cache=None
+    )
+    service.bucket = TokenBucket(rate=0.001, capacity=1)
+    service.breaker.trip(duration=0)  # recovery already elapsed: next call is the probe
+    return service
+
+
+@pytest.mark.asyncio
+async def test_pexels_probe_rejected_by_bucket_does_not_wedge_breaker():
+    """A half-open probe that never went out leaves the probe slot free"""
+    service = _pexels_service(lambda request: httpx.Response(200, json={"photos": []}))
+    service.bucket.tokens = 0
+
+    with pytest.raises(PexelsUnavailableError):
+        await service._get("/search", {"query": "Rome"})
+    assert service.breaker.state == CircuitBreaker.HALF_OPEN
+
+    service.bucket.tokens = 1
+    response = await service._get("/search", {"query": "Rome"})
+
+    assert response.status_code == 200
+    assert service.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_pexels_probe_released_on_unexpected_error():
+    """A probe that fails without a verdict on Pexels lets the next call probe again"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return httpx.Response(200, json={"photos": []})
+
+    service = _pexels_service(handler)
+
+    with pytest.raises(RuntimeError):
+        await service._get("/search", {"query": "Rome"})
+    service.bucket.tokens = 1
+    await service._get("/search", {"query": "Rome"})
+
+    assert len(calls) == 2
+    assert service.breaker.state == CircuitBreaker.CLOSED
+
+
+async def _hang(**kwargs):
+    await asyncio.Event().wait()
+
+
+async def _cancel_probe(breaker: CircuitBreaker, call) -> None:
+    """Cancel call while it is the half-open probe"""
+    breaker.trip(duration=0)
+    task = asyncio.create_task(call())
+    while not breaker._probe_in_flight:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_cancelled_chat_probe_lets_the_next_call_probe():
+    service = GeminiService()
+    service._client = SimpleNamespace(  # type: ignore[assignment]
+        aio=SimpleNamespace(models=SimpleNamespace(generate_content=_hang))
+    )
+
+    await _cancel_probe(service.breaker, lambda: service.generate_response("Rome in May?"))
+
+    assert service.breaker.state == CircuitBreaker.HALF_OPEN
+    assert service.breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_itinerary_probe_lets_the_next_call_probe():
+    service = ItineraryService()
+    service.chain_for = lambda model: SimpleNamespace(  # type: ignore[method-assign]
+        ainvoke=lambda inputs: _hang()
+    )
+
+    await _cancel_probe(
+        service.breaker,
+        lambda: service.generate_itinerary("Rome", "2026-05-01", "2026-05-03", 500.0, []),
+    )
+
+    assert service.breaker.state == CircuitBreaker.HALF_OPEN
+    assert service.breaker.allow()
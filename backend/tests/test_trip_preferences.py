@@ -0,0 +1,88 @@
+from app.services.trip_preferences import (
+    MAX_MUST_SEE,
+    extract_preferences,
+    format_preferences,
+    merge_preferences,
+    preferences_from_messages,
+)
+
+
+def test_extracts_pace():
+    assert extract_preferences("We like a relaxed trip")["pace"] == "relaxed"
+    assert extract_preferences("Nothing too busy please, not too packed")["pace"] == "relaxed"
+    packed = extract_preferences("Make it packed, we want to see as much as possible")
+    assert packed["pace"] == "packed"
+
+
+def test_extracts_dietary_needs():
+    prefs = extract_preferences("I'm vegetarian and my partner has a peanut allergy")
+
+    assert prefs["dietary"] == ["vegetarian", "nut allergy"]
+
+
+def test_extracts_must_see_places():
+    prefs = extract_preferences(
+        "We definitely want to see the Colosseum and the Vatican Museums while we're there."
+    )
+
+    assert prefs["must_see"] == ["Colosseum", "Vatican Museums"]
+
+
+def test_extracts_budget_amount_and_level():
+    assert extract_preferences("Our total budget is $2,500")["budget"] == {
+        "amount": 2500.0,
+        "currency": "USD",
+    }
+    assert extract_preferences("We can spend 3k euros")["budget"]["amount"] == 3000.0
+    assert extract_preferences("We're on a tight budget")["budget"] == {"level": "budget"}
+
+
+def test_prices_without_budget_context_are_ignored():
+    assert "budget" not in extract_preferences("Is $15 a lot for pasta in Rome?")
+
+
+def test_message_without_preferences():
+    assert extract_preferences("Hi! What's the weather like in May?") == {}
+
+
+def test_later_statements_win_and_lists_accumulate():
+    prefs = preferences_from_messages(
+        [
+            "We want a packed schedule. Must see: Louvre",
+            "Actually let's keep it relaxed. We also have to see the Eiffel Tower",
+            "I'm vegan",
+        ]
+    )
+
+    assert prefs == {
+        "pace": "relaxed",
+        "must_see": ["Louvre", "Eiffel Tower"],
+        "dietary": ["vegan"],
+    }
+
+
+def test_must_see_is_capped_to_most_recent():
+    prefs = {}
+    for i in range(MAX_MUST_SEE + 3):
+        prefs = merge_preferences(prefs, {"must_see": [f"Place {i}"]})
+
+    assert len(prefs["must_see"]) == MAX_MUST_SEE
+    assert prefs["must_see"][-1] == f"Place {MAX_MUST_SEE + 2}"
+
+
+def test_format_preferences_is_compact():
+    text = format_preferences(
+        {
+            "pace": "relaxed",
+            "dietary": ["vegan"],
+            "must_see": ["Louvre"],
+            "budget": {"amount": 2000.0, "currency": "EUR", "level": "budget"},
+        }
+    )
+
+    assert text == (
+        "Pace: relaxed. Dietary needs: vegan. Must see: Louvre. "
+        "Budget mentioned: EUR 2000. Budget style: budget."
+    )
+    assert format_preferences({}) == ""
+    assert format_preferences(None) == ""
@@ -86,3 +86,16 @@ def test_create_trip(test_client):
     response_data = response.json()
     assert response_data["title"] == "Tokyo Adventure"
     assert response_data["destination"] == "Tokyo"
+
+
+def test_create_trip_does_not_wait_for_image(test_client):
+    """Trip is returned immediately with the image enrichment still pending"""
+    trip_data = {"title": "Lisbon Weekend", "destination": "Lisbon"}
+
+    response = test_client.post(
+        "/v1/trips/", json=trip_data, headers={"Authorization": "Bearer test-token"}
+    )
+
+    assert response.status_code == 201, f"Got {response.status_code}: {response.text}"
+    assert response.json()["image_status"] == "pending"
+    assert response.json()["image_url"] is None